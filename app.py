@@ -19,9 +19,10 @@ from unidades_config import UNIDADES_ORDEN, UNIDADES_NOMBRES
 
 # Importar módulos modularizados
 from ui_styles import aplicar_estilos, mostrar_encabezado, mostrar_seccion, mostrar_error
-from ui_components import mostrar_fecha_actual, selector_archivo, opciones_organizacion, mostrar_vista_previa_datos, seccion_generacion_pdf, mostrar_pie_pagina
+from ui_components import mostrar_fecha_actual, selector_archivo, opciones_organizacion, opciones_duplicados, opciones_conflictos, mostrar_resultado_duplicados, crear_indicador_progreso, mostrar_vista_previa_datos, mostrar_resumen_lote, mostrar_csv_en_curso, mostrar_comparacion_motores, seccion_generacion_pdf, mostrar_pie_pagina
 from sidebar import configurar_sidebar
-from data_processing import procesar_archivo_excel
+from data_processing import procesar_archivo, procesar_lote_archivos, procesar_csv_en_curso, depurar_filas_duplicadas
+from ingestion.csv_reader import es_archivo_csv
 
 # Configuración de la página de Streamlit
 st.set_page_config(
@@ -43,23 +44,74 @@ mostrar_encabezado()
 # Mostrar la fecha actual
 mostrar_fecha_actual()
 
-# Sección 1: Cargar archivo Excel
-mostrar_seccion("Cargar archivo Excel", 1)
+# Sección 1: Cargar archivo Excel o CSV
+mostrar_seccion("Cargar archivo Excel o CSV", 1)
 uploaded_file = selector_archivo()
 
 # Sección 2: Opciones de organización
 mostrar_seccion("Opciones de organización", 2)
-organizar_por_unidad, reporte_cumplimiento, mes_seleccionado, año_seleccionado = opciones_organizacion()
+organizar_por_unidad, reporte_cumplimiento, mes_seleccionado, año_seleccionado, mes_completo = opciones_organizacion()
+accion_duplicados = opciones_duplicados()
+conflictos_matriculas = opciones_conflictos()
+
+# Con la carga de varios archivos se recibe una lista (vacía si aún no hay archivos)
+es_lote = isinstance(uploaded_file, list)
+if es_lote and not uploaded_file:
+    uploaded_file = None
+# Al seguir un CSV en disco se recibe su ruta
+es_en_curso = isinstance(uploaded_file, str)
 
 # Procesar el archivo si se ha cargado
 if uploaded_file is not None:
-    # Procesar el archivo Excel
-    df, mensaje_error = procesar_archivo_excel(uploaded_file, EXCEL_SHEETS)
+    resumen_lote = None
+    agregados_en_curso = None
+    es_csv = es_en_curso or (not es_lote and es_archivo_csv(uploaded_file))
+    
+    if es_en_curso:
+        # Solo se leen las filas agregadas desde la actualización anterior
+        df, agregados_en_curso, filas_nuevas, mensaje_error = procesar_csv_en_curso(
+            uploaded_file,
+            modo="cumplimiento" if reporte_cumplimiento else "tablas",
+            matriculas=conflictos_matriculas
+        )
+    elif es_lote:
+        # Procesar todos los archivos en paralelo y unirlos con su archivo de origen
+        df, resumen_lote, mensaje_error = procesar_lote_archivos(
+            uploaded_file,
+            progreso=crear_indicador_progreso("Leyendo archivos...", "Archivo {elemento} leído ({completadas}/{total})"),
+            modo="cumplimiento" if reporte_cumplimiento else "tablas",
+            matriculas=conflictos_matriculas
+        )
+    else:
+        # Procesar el archivo (CSV, una hoja Excel o todas las hojas diarias del mes)
+        mes_completo = mes_completo and not es_csv
+        # Solo se leen las columnas que usa el tipo de reporte elegido
+        df, mensaje_error = procesar_archivo(
+            uploaded_file,
+            EXCEL_SHEETS,
+            modo="cumplimiento" if reporte_cumplimiento else "tablas",
+            matriculas=conflictos_matriculas,
+            mes_completo=mes_completo,
+            mes=mes_seleccionado,
+            año=año_seleccionado,
+            progreso=crear_indicador_progreso() if mes_completo else None
+        )
+    
+    # Las diferencias de esquema se muestran aunque ningún archivo sea válido
+    mostrar_resumen_lote(resumen_lote)
     
     if df is not None:
+        # Los operativos repetidos (hojas copiadas, archivos reenviados) no deben sumar dos veces
+        df, duplicadas, recarga = depurar_filas_duplicadas(df, uploaded_file, accion_duplicados)
+        
         # Sección 3: Vista previa de los datos
         mostrar_seccion("Vista previa de los datos", 3)
-        mostrar_vista_previa_datos(df)
+        mostrar_resultado_duplicados(duplicadas, accion_duplicados, recarga)
+        if es_en_curso:
+            mostrar_csv_en_curso(filas_nuevas, agregados_en_curso)
+        mostrar_vista_previa_datos(df, conflictos_matriculas)
+        if not es_csv and not es_lote:
+            mostrar_comparacion_motores(uploaded_file)
         
         # Sección 4: Generar y descargar PDF
         mostrar_seccion("Generar y descargar PDF", 4)
@@ -69,7 +121,8 @@ if uploaded_file is not None:
             reporte_cumplimiento, 
             mes_seleccionado, 
             año_seleccionado, 
-            PDF_FILENAME
+            PDF_FILENAME,
+            conflictos_matriculas
         )
     else:
         # Mostrar mensaje de error
@@ -4,6 +4,7 @@ import io
 import os
 from fpdf import FPDF
 from unidades_config import UNIDADES_ORDEN, UNIDADES_NOMBRES
+from ingestion.csv_reader import leer_tabla_csv
 
 # Configuración de la página de Streamlit
 st.set_page_config(
@@ -18,7 +19,7 @@ st.markdown("Esta aplicación permite cargar un archivo CSV con información de
 
 # Sección para cargar el archivo CSV
 st.header("1. Cargar archivo CSV")
-uploaded_file = st.file_uploader("Seleccione el archivo CSV con los datos de despliegues operativos", type=['csv'])
+uploaded_file = st.file_uploader("Seleccione el archivo CSV con los datos de despliegues operativos", type=['csv', 'tsv', 'txt'])
 
 # Sección de opciones de organización
 st.header("2. Opciones de organización")
@@ -26,13 +27,10 @@ st.subheader("Organizar por:")
 organizar_por_unidad = st.checkbox("Unidad", value=True, help="Organiza las tablas por unidad")
 
 # Función para procesar el CSV y generar el PDF
-def generar_pdf_optimizado(csv_data, organizar_por_unidad):
+def generar_pdf_optimizado(df, organizar_por_unidad):
     # Crear un buffer para el PDF
     buffer = io.BytesIO()
     
-    # Leer el CSV
-    df = pd.read_csv(io.StringIO(csv_data.decode('utf-8')), delimiter='\t')
-    
     # Configurar el PDF
     pdf = FPDF(orientation='L', unit='mm', format='A4')
     pdf.add_page()
@@ -80,12 +78,11 @@ def generar_pdf_optimizado(csv_data, organizar_por_unidad):
 
 if uploaded_file is not None:
     try:
-        # Leer el contenido del archivo
-        csv_data = uploaded_file.getvalue()
+        # Leer el archivo una sola vez (codificación y separador detectados)
+        df = leer_tabla_csv(uploaded_file.getvalue())
         
         # Mostrar los datos cargados
         st.header("3. Vista previa de los datos")
-        df = pd.read_csv(io.StringIO(csv_data.decode('utf-8')), delimiter='\t')
         st.dataframe(df.head(10))  # Mostrar solo las primeras 10 filas
         
         # Botón para generar y descargar el PDF
@@ -93,7 +90,7 @@ if uploaded_file is not None:
         if st.button("Generar PDF"):
             with st.spinner("Generando PDF..."):
                 # Generar PDF según las opciones seleccionadas
-                pdf_bytes = generar_pdf_optimizado(csv_data, organizar_por_unidad=organizar_por_unidad)
+                pdf_bytes = generar_pdf_optimizado(df, organizar_por_unidad=organizar_por_unidad)
                 
                 # Proporcionar el PDF para descarga
                 st.download_button(
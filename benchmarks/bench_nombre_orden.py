@@ -0,0 +1,105 @@
+"""
+Mide el cálculo del NOMBRE ORDEN combinado (data_utils._combinar_nombres_orden).
+
+Compara, sobre datos sintéticos con la forma de una planilla real (pocas
+combinaciones distintas, faltantes y textos vacíos), tres variantes:
+
+- iloc: el bucle fila por fila original de preparar_dataframe.
+- por fila: la regla _combinar_nombre aplicada a cada fila.
+- vectorizado: _combinar_nombres_orden (una evaluación por combinación).
+
+Uso (desde la raíz del repositorio):
+
+    python benchmarks/bench_nombre_orden.py
+    python benchmarks/bench_nombre_orden.py --filas 10000 100000 --repeticiones 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Los módulos de la aplicación se importan desde la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_utils import _combinar_nombre, _combinar_nombres_orden
+
+def generar_datos(filas, semilla=0):
+    """
+    Genera las tres columnas de entrada con faltantes (20%) y textos vacíos (10%).
+
+    Args:
+        filas (int): Número de filas.
+        semilla (int, optional): Semilla del generador. Defaults to 0.
+
+    Returns:
+        pandas.DataFrame: Columnas TIPO OPERATIVO, NOMBRE OPERATIVO y NOMBRE ORDEN.
+    """
+    rng = np.random.default_rng(semilla)
+    catalogos = {
+        "TIPO OPERATIVO": [f"TIPO {i}" for i in range(12)],
+        "NOMBRE OPERATIVO": [f"OPERATIVO {i}" for i in range(150)],
+        "NOMBRE ORDEN": [f"ORDEN {i}" for i in range(400)],
+    }
+    datos = {}
+    for columna, catalogo in catalogos.items():
+        valores = np.asarray(catalogo, dtype=object)[rng.integers(0, len(catalogo), filas)]
+        azar = rng.random(filas)
+        valores[azar < 0.2] = np.nan
+        valores[(azar >= 0.2) & (azar < 0.3)] = ""
+        datos[columna] = valores
+    return pd.DataFrame(datos)
+
+def por_iloc(df):
+    """Bucle original: una fila de pandas por iteración."""
+    nueva_columna = []
+    for i in range(len(df)):
+        fila = df.iloc[i]
+        nueva_columna.append(_combinar_nombre(fila['TIPO OPERATIVO'], fila['NOMBRE OPERATIVO'], fila['NOMBRE ORDEN']))
+    return nueva_columna
+
+def por_fila(df):
+    """Regla por fila sobre las columnas ya extraídas."""
+    return [
+        _combinar_nombre(*fila)
+        for fila in zip(df['TIPO OPERATIVO'], df['NOMBRE OPERATIVO'], df['NOMBRE ORDEN'])
+    ]
+
+def vectorizado(df):
+    """Una evaluación por combinación distinta, expandida por código."""
+    return _combinar_nombres_orden(df['TIPO OPERATIVO'], df['NOMBRE OPERATIVO'], df['NOMBRE ORDEN'])
+
+def medir(funcion, df, repeticiones):
+    """Mejor tiempo (segundos) y resultado de varias ejecuciones."""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(df)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filas", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'filas':>8} {'iloc (s)':>10} {'por fila (s)':>13} {'vectorizado (s)':>16} {'vs iloc':>8} {'vs por fila':>12}")
+    for filas in args.filas:
+        df = generar_datos(filas)
+        # El bucle iloc es muy lento: una sola ejecución basta
+        t_iloc, esperado = medir(por_iloc, df, 1)
+        t_fila, por_filas = medir(por_fila, df, args.repeticiones)
+        t_vector, combinado = medir(vectorizado, df, args.repeticiones)
+
+        if list(combinado.astype(object)) != esperado or por_filas != esperado:
+            raise AssertionError(f"Los resultados no coinciden con {filas} filas")
+
+        print(f"{filas:>8} {t_iloc:>10.3f} {t_fila:>13.3f} {t_vector:>16.4f} "
+              f"{t_iloc / t_vector:>7.0f}x {t_fila / t_vector:>11.0f}x")
+
+if __name__ == "__main__":
+    main()
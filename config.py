@@ -2,6 +2,9 @@
 Configuraciones y constantes para la aplicación de conversión de Excel a PDF.
 """
 
+import os
+import tempfile
+
 # Configuración de la aplicación
 APP_TITLE = "Conversor de Despliegues Operativos Excel a PDF"
 APP_ICON = "📊"
@@ -49,6 +52,37 @@ EXPECTED_COLUMNS = [
     "PORCENTAJE"
 ]
 
+# Nombres alternativos de columnas que se aceptan en los archivos
+# (se comparan sin acentos, mayúsculas ni espacios sobrantes)
+ALIAS_COLUMNAS = {
+    "N° ORDEN": "NUMERO ORDEN",
+    "NRO ORDEN": "NUMERO ORDEN",
+    "NUMERO DE ORDEN": "NUMERO ORDEN",
+    "NOMBRE DE ORDEN": "NOMBRE ORDEN",
+    "NOMBRE DEL OPERATIVO": "NOMBRE OPERATIVO",
+    "TIPO DE ORDEN": "TIPO ORDEN",
+    "TIPO DE OPERATIVO": "TIPO OPERATIVO",
+    "HORA DE INICIO": "HORA INICIO",
+    "INICIO": "HORA INICIO",
+    "HORA DE FIN": "HORA FIN",
+    "HORA FINAL": "HORA FIN",
+    "FIN": "HORA FIN",
+    "MOVIL": "MOVILES",
+    "MOTO": "MOTOS",
+    "HIPOS": "HIPO",
+    "PP.SS. EN MOVIL": "PP.SS EN MOVIL",
+    "PP.SS. PIE TIERRA": "PP.SS PIE TIERRA",
+    "PP.SS. TOTAL": "PP.SS TOTAL",
+    "TOTAL PP.SS": "PP.SS TOTAL",
+    "CHOQUE EN ALERTA": "CHOQUE ALERTA",
+    "GEO EN ALERTA": "GEO ALERTA",
+    "SECC": "SECC.",
+    "SECCIONAL": "SECC.",
+    "SECCIONALES": "SECC.",
+    **{f"MATRICULA{i}": f"MATRICULA {i}" for i in range(1, 11)},
+    **{f"MAT. {i}": f"MATRICULA {i}" for i in range(1, 11)}
+}
+
 # Hojas esperadas en el archivo Excel
 EXCEL_SHEETS = {
     "OPERATIVOS": "Hoja con información de despliegues operativos",
@@ -85,6 +119,89 @@ EXCEL_SHEETS = {
     "31": "Día 31 del mes"
 }
 
+# Meses en español, en orden (índice 0 = Enero)
+MESES = [
+    "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
+    "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"
+]
+
+# Número máximo de procesos para leer hojas en paralelo (None = núcleos disponibles)
+MAX_PROCESOS_INGESTA = None
+
+# Tamaño a partir del cual los xlsx se leen primero con el motor rápido (calamine)
+UMBRAL_MOTOR_RAPIDO = 1024 * 1024  # 1 MB
+
+# Tamaño a partir del cual la hoja de un xlsx se lee, formatea y valida por
+# bloques (memoria acotada por el bloque, a costa de una lectura más lenta)
+UMBRAL_LECTURA_POR_BLOQUES = 8 * 1024 * 1024  # 8 MB (unas 100.000 filas)
+
+# Caché de ingesta en disco (archivos Arrow compartidos entre sesiones y procesos)
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "despliegues_cache")
+CACHE_LIMITE_BYTES = 512 * 1024 * 1024  # 512 MB
+
+# Libros (por nombre de archivo) cuyas hojas diarias se conservan en memoria
+# para volver a analizar solo las hojas modificadas al subirlos de nuevo
+MAX_LIBROS_INCREMENTALES = 4
+
+# Archivos CSV en curso (que se van ampliando) cuyo punto de control y datos
+# se conservan en memoria para leer solo las filas agregadas
+MAX_CSV_EN_CURSO = 4
+
+# Directorio donde el sistema de planificación deja los CSV en curso; solo se
+# pueden seguir archivos dentro de él
+DIRECTORIO_CSV_EN_CURSO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "exportaciones")
+
+# Columnas que se suman por unidad en los totales acumulados de un CSV en curso
+COLUMNAS_AGREGADOS = [
+    "PP.SS TOTAL",
+    "MOVILES",
+    "MOTOS"
+]
+
+# Recursos cuya cobertura por hora del día se calcula en el reporte de cumplimiento
+COLUMNAS_COBERTURA = [
+    "PP.SS TOTAL",
+    "MOVILES",
+    "MOTOS"
+]
+
+# Cargas (por contenido) cuyos datos preparados para el PDF se conservan en
+# memoria, para reutilizarlos al cambiar de tipo de reporte o regenerar el PDF
+MAX_DATASETS_PREPARADOS = 4
+
+# Columnas que identifican un operativo al buscar filas repetidas; la fecha
+# es FECHA (mes completo) o, si no existe, DIA. Las ausentes se omiten. Los
+# recursos forman parte de la clave: el mismo operativo y horario puede
+# desplegarse varias veces con distinto personal
+COLUMNAS_CLAVE_DUPLICADOS = [
+    "UNIDAD",
+    "NUMERO ORDEN",
+    "NOMBRE OPERATIVO",
+    "HORA INICIO",
+    "HORA FIN",
+    "FECHA",
+    "MOVILES",
+    "SS.OO",
+    "MOTOS",
+    "HIPO",
+    "PP.SS EN MOVIL",
+    "PP.SS PIE TIERRA",
+    "CHOQUE APOSTADO",
+    "CHOQUE ALERTA",
+    "GEO APOSTADO",
+    "GEO ALERTA",
+    "PP.SS TOTAL"
+]
+
+# Columna con la marca de fila duplicada
+COLUMNA_DUPLICADO = "DUPLICADO"
+
+# Índice persistente de las filas ya cargadas (hashes de 64 bits en disco) y
+# dimensionado de su filtro de Bloom (filas previstas y falsos positivos)
+INDICE_DUPLICADOS_DIR = os.path.join(CACHE_DIR, "duplicados")
+CAPACIDAD_INDICE_DUPLICADOS = 1_000_000
+FALSOS_POSITIVOS_BLOOM = 0.01
+
 # Información para la barra lateral
 SIDEBAR_INFO = f"""
 Esta aplicación permite convertir archivos Excel con información de despliegues operativos a formato PDF.
@@ -115,10 +232,111 @@ NUMERIC_COLUMNS = [
     "PORCENTAJE"
 ]
 
+# Componentes cuya suma debe coincidir con PP.SS TOTAL (validación de calidad)
+COMPONENTES_PPSS_TOTAL = [
+    "MOTOS",
+    "HIPO",
+    "PP.SS EN MOVIL",
+    "PP.SS PIE TIERRA",
+    "CHOQUE APOSTADO",
+    "CHOQUE ALERTA",
+    "GEO APOSTADO",
+    "GEO ALERTA"
+]
+
+# Columnas de hora (se guardan como minutos desde la medianoche)
+COLUMNAS_HORA = [
+    "HORA INICIO",
+    "HORA FIN"
+]
+
+# Columna que identifica el archivo de origen al cargar varios archivos
+COLUMNA_ORIGEN = "ARCHIVO_ORIGEN"
+
+# Columnas de etiquetas repetidas que se guardan como categorías
+COLUMNAS_CATEGORICAS = [
+    "UNIDAD",
+    "TIPO ORDEN",
+    "TIPO OPERATIVO",
+    COLUMNA_ORIGEN
+]
+
+# Proporción mínima de ceros para guardar un conteo como columna dispersa
+UMBRAL_DISPERSO = 0.9
+
+# Filas iniciales en las que se busca el encabezado (hojas con títulos arriba)
+FILAS_BUSQUEDA_ENCABEZADO = 20
+
+# Columnas esperadas que debe reconocer una fila para tomarla como encabezado
+MIN_COLUMNAS_ENCABEZADO = 3
+
+# Columnas que suelen venir combinadas verticalmente en Excel (la celda
+# combinada solo tiene valor en su primera fila). TIPO ORDEN y NUMERO ORDEN
+# no se incluyen porque pueden estar vacías a propósito
+COLUMNAS_COMBINADAS = [
+    "UNIDAD"
+]
+
 # Columnas que pueden contener múltiples valores separados por comas
 MULTI_VALUE_COLUMNS = [
     "SECC."
 ]
 
+# Columnas que usa cada modo de reporte. Al leer un archivo solo se analizan
+# estas columnas y las de la vista previa; el resto (porcentaje, despliegue,
+# etc.) no se convierte ni se guarda en memoria
+COLUMNAS_POR_MODO = {
+    # Tablas por unidad o tabla general (pdf_config.COLUMNAS_PDF más las
+    # columnas con las que se arma NOMBRE ORDEN)
+    "tablas": [
+        "UNIDAD",
+        "TIPO OPERATIVO",
+        "NOMBRE OPERATIVO",
+        "NOMBRE ORDEN",
+        "MOVILES",
+        "SS.OO",
+        "MOTOS",
+        "HIPO",
+        "PP.SS PIE TIERRA",
+        "CHOQUE APOSTADO",
+        "PP.SS TOTAL",
+        "HORA INICIO",
+        "HORA FIN",
+        "SECC."
+    ],
+    # Reporte de cumplimiento de servicios (report_services)
+    "cumplimiento": [
+        "UNIDAD",
+        "TIPO OPERATIVO",
+        "NOMBRE OPERATIVO",
+        "NOMBRE ORDEN",
+        "MOVILES",
+        "SS.OO",
+        "MOTOS",
+        "HIPO",
+        "PP.SS EN MOVIL",
+        "PP.SS PIE TIERRA",
+        "CHOQUE APOSTADO",
+        "CHOQUE ALERTA",
+        "GEO APOSTADO",
+        "GEO ALERTA",
+        "PP.SS TOTAL",
+        "HORA INICIO",
+        "HORA FIN",
+        "SECC."
+    ]
+}
+
+# Columnas con las matrículas (personal o vehículos) asignadas a cada servicio
+COLUMNAS_MATRICULA = [col for col in EXPECTED_COLUMNS if col.startswith("MATRICULA ")]
+
+# Columnas que necesita la vista previa en cualquier modo (reglas de calidad
+# y clave de duplicados). Las de matrículas solo se leen si se piden los
+# conflictos de matrículas (ver columnas_necesarias)
+COLUMNAS_VISTA_PREVIA = list(dict.fromkeys(
+    ["UNIDAD", "PP.SS TOTAL"] + COLUMNAS_HORA + COMPONENTES_PPSS_TOTAL
+    + [col for col in COLUMNAS_CLAVE_DUPLICADOS if col in EXPECTED_COLUMNS]
+))
+
 # Copyright
 COPYRIGHT = "© 2025 - Aplicación de Despliegues Operativos"
@@ -3,24 +3,67 @@ Módulo para el procesamiento de datos de la aplicación.
 """
 
 import pandas as pd
-from utils import leer_excel, formatear_datos, obtener_hojas_excel
+from config import UMBRAL_LECTURA_POR_BLOQUES, COLUMNA_ORIGEN
+from utils import leer_excel, leer_excel_streaming, leer_csv, formatear_datos, obtener_hojas_excel
+from ingestion import abrir_libro, leer_mes_excel, leer_bytes_archivo
+from ingestion.csv_reader import es_archivo_csv
+from ingestion.schema import mapear_columnas, columnas_necesarias
+from ingestion.cache import obtener_cache, clave_contenido
+from ingestion.compact import compactar_dataframe
+from ingestion.batch import leer_lote_archivos, nombres_lote
+from ingestion.dedup import depurar_duplicados, obtener_indice_duplicados, huella_archivo
+from ingestion.tail import leer_csv_en_curso, resolver_ruta_en_curso
 from ui_styles import mostrar_error
 
-def procesar_archivo_excel(uploaded_file, EXCEL_SHEETS):
+def procesar_archivo_excel(uploaded_file, EXCEL_SHEETS, mes_completo=False, mes=None, año=None, progreso=None, columnas=None):
     """
     Procesa un archivo Excel subido y valida su estructura.
     
     Args:
         uploaded_file: Archivo Excel subido.
         EXCEL_SHEETS (list): Lista de nombres de hojas esperadas.
+        mes_completo (bool, optional): Si es True, se leen todas las hojas diarias
+            (01-31) y se unen en un solo DataFrame con la columna FECHA. Defaults to False.
+        mes (str, optional): Mes de los datos, necesario si mes_completo es True. Defaults to None.
+        año (int, optional): Año de los datos, necesario si mes_completo es True. Defaults to None.
+        progreso (callable, optional): Función llamada como progreso(hoja, completadas, total)
+            al terminar de leer cada hoja diaria. Defaults to None.
+        columnas (tuple, optional): Columnas esperadas a leer (ver columnas_necesarias);
+            el resto no se analiza ni se guarda. Defaults to None (todas).
         
     Returns:
         tuple: (df, mensaje_error) donde df es el DataFrame procesado o None si hay error,
                y mensaje_error es el mensaje de error o None si no hay error.
     """
     try:
+        # Abrir el libro una sola vez; todas las lecturas comparten este manejador
+        libro = abrir_libro(uploaded_file) if uploaded_file is not None else None
+        
+        # Si el mismo archivo ya se procesó (en cualquier sesión), usar la caché
+        cache = obtener_cache()
+        clave = None
+        if libro is not None:
+            # El mes y el año solo cambian el resultado al leer el mes completo
+            clave = clave_contenido(
+                libro.contenido,
+                mes_completo=mes_completo,
+                mes=mes if mes_completo else None,
+                año=año if mes_completo else None,
+                columnas=columnas
+            )
+            df = cache.obtener(clave)
+            if df is not None:
+                return compactar_dataframe(df), None
+        
+        # Sondeo rápido (solo workbook.xml y encabezados): rechaza archivos
+        # dañados sin cargarlos; los .xls se abren con pandas
+        if libro is not None:
+            sondeo, es_valido, mensaje_error = libro.sondear()
+            if not es_valido:
+                return None, mensaje_error
+        
         # Obtener las hojas disponibles en el archivo Excel
-        hojas_disponibles, es_valido, mensaje_error = obtener_hojas_excel(uploaded_file)
+        hojas_disponibles, es_valido, mensaje_error = obtener_hojas_excel(libro)
         
         if not es_valido:
             return None, mensaje_error
@@ -55,15 +98,24 @@ def procesar_archivo_excel(uploaded_file, EXCEL_SHEETS):
             )
             return None, mensaje_error_hojas
         
-        # Leer el archivo Excel
+        # Leer el archivo Excel (una hoja o el mes completo)
         try:
-            df, es_valido, mensaje_error = leer_excel(uploaded_file)
+            if mes_completo:
+                df, es_valido, mensaje_error = leer_mes_excel(libro, mes, año, progreso=progreso, columnas=columnas)
+            elif libro.es_xlsx and len(libro.contenido) >= UMBRAL_LECTURA_POR_BLOQUES:
+                # Libros grandes: lectura, formato y validación bloque a bloque
+                df, es_valido, mensaje_error = leer_excel_streaming(libro, columnas=columnas)
+            else:
+                df, es_valido, mensaje_error = leer_excel(libro, columnas=columnas)
             
             if not es_valido:
                 return None, mensaje_error
             
-            # Formatear los datos
-            df = formatear_datos(df)
+            # Representación compacta: categorías, enteros pequeños y columnas dispersas
+            df = compactar_dataframe(df)
+            
+            # Guardar el resultado normalizado para próximas cargas
+            cache.guardar(clave, df)
             
             return df, None
             
@@ -75,6 +127,162 @@ def procesar_archivo_excel(uploaded_file, EXCEL_SHEETS):
         mensaje_error = f"Error al procesar el archivo: {str(e)}"
         return None, mensaje_error
 
+def procesar_archivo_csv(uploaded_file, columnas=None):
+    """
+    Procesa un archivo CSV/TSV subido y valida su estructura.
+    
+    La codificación (UTF-8 o Latin-1) y el separador se detectan en una sola
+    muestra; los campos entre comillas pueden contener saltos de línea.
+    
+    Args:
+        uploaded_file: Archivo CSV subido (o ruta a un archivo CSV).
+        columnas (tuple, optional): Columnas esperadas a leer. Defaults to None (todas).
+        
+    Returns:
+        tuple: (df, mensaje_error) donde df es el DataFrame procesado o None si hay error,
+               y mensaje_error es el mensaje de error o None si no hay error.
+    """
+    try:
+        contenido = leer_bytes_archivo(uploaded_file)
+        
+        # Si el mismo archivo ya se procesó (en cualquier sesión), usar la caché
+        cache = obtener_cache()
+        clave = clave_contenido(contenido, formato="csv", columnas=columnas)
+        df = cache.obtener(clave)
+        if df is not None:
+            return compactar_dataframe(df), None
+        
+        # Una ruta se lee mapeando el archivo en memoria; un archivo subido, desde sus bytes
+        df, es_valido, mensaje_error = leer_csv(uploaded_file if isinstance(uploaded_file, str) else contenido, columnas=columnas)
+        
+        if df is None:
+            return None, mensaje_error
+        
+        if not es_valido:
+            # Sin ninguna columna reconocida el archivo no es una planilla de despliegues
+            if not mapear_columnas(df.columns):
+                return None, mensaje_error
+            # Igual que en las hojas Excel, las columnas que faltan se agregan vacías
+            print(f"Advertencia: {mensaje_error}. Se agregarán vacías.")
+        
+        df = compactar_dataframe(formatear_datos(df, columnas))
+        
+        # Guardar el resultado normalizado para próximas cargas
+        cache.guardar(clave, df)
+        
+        return df, None
+        
+    except Exception as e:
+        mensaje_error = f"Error al procesar el archivo: {str(e)}"
+        return None, mensaje_error
+
+def procesar_csv_en_curso(ruta, modo=None, matriculas=False):
+    """
+    Procesa un CSV en disco que el sistema de planificación sigue ampliando.
+    
+    Solo se analizan las filas agregadas desde la lectura anterior; si el
+    archivo se reescribió se vuelve a leer completo. Solo se aceptan archivos
+    del directorio DIRECTORIO_CSV_EN_CURSO.
+    
+    Args:
+        ruta (str): Nombre del archivo CSV dentro de DIRECTORIO_CSV_EN_CURSO.
+        modo (str, optional): Modo de reporte (clave de COLUMNAS_POR_MODO). Defaults to None.
+        matriculas (bool, optional): Si es True, también se leen las columnas de
+            matrículas (conflictos de matrículas). Defaults to False.
+        
+    Returns:
+        tuple: (df, agregados, filas_nuevas, mensaje_error) donde agregados son los
+               totales por unidad y filas_nuevas las filas leídas en esta carga.
+    """
+    try:
+        ruta = resolver_ruta_en_curso(ruta)
+        df, agregados, filas_nuevas, _ = leer_csv_en_curso(ruta, columnas_necesarias(modo, matriculas))
+        return df, agregados, filas_nuevas, None
+    except Exception as e:
+        return None, None, 0, f"Error al procesar el archivo: {str(e)}"
+
+def procesar_archivo(uploaded_file, EXCEL_SHEETS, modo=None, matriculas=False, **opciones):
+    """
+    Procesa un archivo subido eligiendo la ruta de lectura según su tipo.
+    
+    Args:
+        uploaded_file: Archivo Excel o CSV/TSV subido.
+        EXCEL_SHEETS (list): Lista de nombres de hojas esperadas (solo Excel).
+        modo (str, optional): Modo de reporte (clave de COLUMNAS_POR_MODO); solo
+            se leen las columnas que usa. Defaults to None (todas las columnas).
+        matriculas (bool, optional): Si es True, también se leen las columnas de
+            matrículas (conflictos de matrículas). Defaults to False.
+        **opciones: Opciones de procesar_archivo_excel (mes_completo, mes, año, progreso).
+        
+    Returns:
+        tuple: (df, mensaje_error) como en procesar_archivo_excel.
+    """
+    columnas = columnas_necesarias(modo, matriculas)
+    if es_archivo_csv(uploaded_file):
+        return procesar_archivo_csv(uploaded_file, columnas=columnas)
+    return procesar_archivo_excel(uploaded_file, EXCEL_SHEETS, columnas=columnas, **opciones)
+
+def procesar_lote_archivos(uploaded_files, progreso=None, modo=None, matriculas=False):
+    """
+    Procesa varios archivos subidos (uno por dirección) y los une en un solo DataFrame.
+    
+    Args:
+        uploaded_files (list): Archivos Excel o CSV subidos.
+        progreso (callable, optional): Función llamada como progreso(archivo, completados, total)
+            al terminar de leer cada archivo. Defaults to None.
+        modo (str, optional): Modo de reporte (clave de COLUMNAS_POR_MODO); solo
+            se leen las columnas que usa. Defaults to None (todas las columnas).
+        matriculas (bool, optional): Si es True, también se leen las columnas de
+            matrículas (conflictos de matrículas). Defaults to False.
+        
+    Returns:
+        tuple: (df, resumen, mensaje_error) donde df es el DataFrame unido (con la columna
+               ARCHIVO_ORIGEN) o None si hay error, resumen es el DataFrame con las diferencias
+               de esquema de cada archivo y mensaje_error es el mensaje de error o None.
+    """
+    df, resumen, es_valido, mensaje_error = leer_lote_archivos(
+        uploaded_files, progreso=progreso, columnas=columnas_necesarias(modo, matriculas)
+    )
+    
+    if not es_valido:
+        return None, resumen, mensaje_error
+    
+    return compactar_dataframe(df), resumen, None
+
+def depurar_filas_duplicadas(df, uploaded_file, accion="marcar"):
+    """
+    Elimina o marca los operativos repetidos de una carga.
+    
+    Además de los repetidos dentro de la carga, se detectan las filas con
+    fecha que ya llegaron en cargas anteriores desde otro archivo (índice
+    persistente compartido entre sesiones). Los archivos se distinguen por
+    su contenido, no por su nombre.
+    
+    Args:
+        df (pandas.DataFrame): Datos cargados.
+        uploaded_file: Archivo subido, ruta de un CSV en curso o lista de archivos
+            en una carga por lotes.
+        accion (str, optional): "marcar" o "eliminar". Defaults to "marcar".
+        
+    Returns:
+        tuple: (df, cantidad, recarga) con los datos depurados, el número de filas
+            duplicadas y True si toda la carga ya había llegado antes (no se depura).
+    """
+    try:
+        if isinstance(uploaded_file, list):
+            # Cada fila indica su archivo en ARCHIVO_ORIGEN; se traduce a la huella de ese archivo
+            huellas = dict(zip(nombres_lote(uploaded_file), map(huella_archivo, uploaded_file)))
+            origen = df[COLUMNA_ORIGEN].astype(str).map(huellas).to_numpy()
+        elif isinstance(uploaded_file, str):
+            # Un CSV en curso crece entre lecturas: se identifica por su ruta
+            origen = uploaded_file
+        else:
+            origen = huella_archivo(uploaded_file)
+        return depurar_duplicados(df, accion, indice=obtener_indice_duplicados(), origen=origen)
+    except Exception as e:
+        print(f"Advertencia: no se pudieron buscar filas duplicadas: {str(e)}")
+        return df, 0, False
+
 def generar_parametros_pdf(organizar_por_unidad, reporte_cumplimiento, mes_seleccionado=None, año_seleccionado=None):
     """
     Genera los parámetros para la generación del PDF.
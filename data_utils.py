@@ -2,8 +2,66 @@
 Utilidades para la preparación y manipulación de datos para la generación de PDFs.
 """
 
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
+from config import MAX_DATASETS_PREPARADOS
 from pdf_config import COLUMNAS_PDF
+from utils import formatear_horas_para_mostrar
+from ingestion.compact import densificar_dataframe
+
+# Columnas que los reportes de cumplimiento suman (los valores no numéricos cuentan como 0)
+COLUMNAS_NUMERICAS = ['PP.SS TOTAL', 'MOVILES', 'MOTOS', 'PERSONAL', 'SS.OO', 'HIPO',
+                      'PP.SS EN MOVIL', 'PP.SS PIE TIERRA', 'CHOQUE APOSTADO',
+                      'CHOQUE ALERTA', 'GEO APOSTADO', 'GEO ALERTA']
+
+def _combinar_nombre(tipo_op, nombre_op, nombre_orden):
+    """
+    Combina TIPO OPERATIVO y NOMBRE OPERATIVO de una fila; si falta uno se usa
+    el otro y, si faltan ambos, el nombre de la orden.
+    """
+    tipo_op = str(tipo_op) if pd.notna(tipo_op) else ''
+    nombre_op = str(nombre_op) if pd.notna(nombre_op) else ''
+    if tipo_op and nombre_op:
+        return f"{tipo_op} {nombre_op}"
+    return tipo_op or nombre_op or (str(nombre_orden) if pd.notna(nombre_orden) else '')
+
+def _combinar_nombres_orden(tipo_op, nombre_op, nombre_orden):
+    """
+    Calcula el NOMBRE ORDEN combinado de todas las filas.
+    
+    La regla se evalúa una vez por cada combinación distinta de las tres
+    columnas y el resultado se expande por código, como categoría: no se
+    crea un texto por fila.
+    
+    Returns:
+        pandas.Categorical: NOMBRE ORDEN combinado de cada fila.
+    """
+    codigos, distintos = zip(*(pd.factorize(serie) for serie in (tipo_op, nombre_op, nombre_orden)))
+    # Código único de cada combinación (los faltantes, -1, pasan a 0)
+    clave = np.ravel_multi_index(
+        [c.astype(np.int64) + 1 for c in codigos], [len(d) + 1 for d in distintos]
+    )
+    codigos_fila, claves = pd.factorize(clave)
+    partes = np.unravel_index(claves, [len(d) + 1 for d in distintos])
+    valores = [
+        np.append(np.array([np.nan], dtype=object), np.asarray(d, dtype=object))[p]
+        for d, p in zip(distintos, partes)
+    ]
+    nombres = [_combinar_nombre(*combinacion) for combinacion in zip(*valores)]
+    # Combinaciones distintas pueden dar el mismo nombre
+    codigos_nombre, categorias = pd.factorize(pd.Index(nombres, dtype=object))
+    return pd.Categorical.from_codes(codigos_nombre[codigos_fila], categories=categorias)
+
+def _como_texto(serie):
+    """Convierte una columna a texto conservando los faltantes; las categorías siguen siéndolo."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        categorias = serie.cat.categories.astype(str)
+        if categorias.is_unique:
+            return serie.cat.rename_categories(categorias)
+    return serie.astype(str)
 
 def preparar_dataframe(df):
     """
@@ -30,9 +88,11 @@ def preparar_dataframe(df):
         if df.empty:
             return df.copy(), pd.DataFrame(), []
         
-        # Crear una copia explícita del DataFrame original para no modificarlo
-        # Usamos reset_index para evitar problemas con índices
-        df_completo = df.copy(deep=True).reset_index(drop=True)
+        # El DataFrame original no se modifica: con copy-on-write los datos se
+        # comparten y solo se crean las columnas nuevas. Usamos reset_index para
+        # evitar problemas con índices; las columnas dispersas se convierten a
+        # normales para las tablas y gráficas del PDF
+        df_completo = densificar_dataframe(df).reset_index(drop=True)
         
         # Verificar si existen las columnas necesarias
         columnas_df = list(df_completo.columns)  # Convertir a lista para evitar problemas con índices
@@ -42,47 +102,27 @@ def preparar_dataframe(df):
         
         # Si existen las columnas necesarias, modificar la columna NOMBRE ORDEN para incluir ambos valores
         if tiene_tipo_operativo and tiene_nombre_operativo and tiene_nombre_orden:
-            # Guardar una copia de la columna original por si acaso
-            df_completo['NOMBRE_ORDEN_ORIGINAL'] = df_completo['NOMBRE ORDEN'].astype(str)
-            
-            # Crear una nueva columna con la combinación de TIPO OPERATIVO y NOMBRE OPERATIVO
-            nueva_columna = []
-            for i in range(len(df_completo)):
-                fila = df_completo.iloc[i]
-                tipo_op = str(fila['TIPO OPERATIVO']) if pd.notna(fila['TIPO OPERATIVO']) else ''
-                nombre_op = str(fila['NOMBRE OPERATIVO']) if pd.notna(fila['NOMBRE OPERATIVO']) else ''
-                nombre_orden = str(fila['NOMBRE ORDEN']) if pd.notna(fila['NOMBRE ORDEN']) else ''
-                
-                if tipo_op and nombre_op:
-                    nueva_columna.append(f"{tipo_op} {nombre_op}")
-                elif tipo_op:
-                    nueva_columna.append(tipo_op)
-                elif nombre_op:
-                    nueva_columna.append(nombre_op)
-                else:
-                    nueva_columna.append(nombre_orden)
-            
-            # Asignar la nueva columna al DataFrame
-            df_completo['NOMBRE ORDEN'] = nueva_columna
+            df_completo = df_completo.assign(**{
+                # Conservar la columna original por si acaso
+                'NOMBRE_ORDEN_ORIGINAL': _como_texto(df_completo['NOMBRE ORDEN']),
+                'NOMBRE ORDEN': _combinar_nombres_orden(
+                    df_completo['TIPO OPERATIVO'], df_completo['NOMBRE OPERATIVO'], df_completo['NOMBRE ORDEN']
+                )
+            })
         
         # Filtrar columnas para el PDF, asegurándose de que existan en el DataFrame
-        columnas_disponibles = []
-        for col in COLUMNAS_PDF:
-            if col in columnas_df:
-                columnas_disponibles.append(col)
+        columnas_disponibles = [col for col in COLUMNAS_PDF if col in columnas_df]
         
         # Crear el DataFrame filtrado con las columnas necesarias
         if columnas_disponibles:
-            # Crear un nuevo DataFrame vacío
-            df_filtrado = pd.DataFrame()
-            
-            # Copiar cada columna individualmente
-            for col in columnas_disponibles:
-                df_filtrado[col] = df_completo[col].copy()
+            df_filtrado = df_completo[columnas_disponibles]
         else:
             # Si no hay columnas disponibles, devolver un DataFrame vacío con las mismas filas
             df_filtrado = pd.DataFrame(index=range(len(df_completo)))
         
+        # Las horas (minutos desde la medianoche) se muestran en el PDF como "HH:MM"
+        df_filtrado = formatear_horas_para_mostrar(df_filtrado)
+        
         return df_completo, df_filtrado, columnas_disponibles
         
     except Exception as e:
@@ -102,7 +142,7 @@ def clasificar_datos_por_unidad(df_completo, df_filtrado):
         dict: Diccionario con las unidades como claves y los DataFrames filtrados como valores.
     """
     try:
-        from unidades_config import UNIDADES_ORDEN, clasificar_unidad
+        from unidades_config import UNIDADES_ORDEN, clasificar_columna_unidades
         
         # Verificar que ambos argumentos sean DataFrames válidos
         if df_completo is None or df_filtrado is None:
@@ -123,62 +163,203 @@ def clasificar_datos_por_unidad(df_completo, df_filtrado):
             print("Advertencia: La columna 'UNIDAD' no existe en el DataFrame")
             return {}
         
-        # Crear una copia para evitar modificar el original y resetear índices
-        df_trabajo = df_completo.copy(deep=True).reset_index(drop=True)
-        df_filtrado_reset = df_filtrado.copy(deep=True).reset_index(drop=True)
+        # Trabajar por posición (sin copiar los datos)
+        df_filtrado_reset = df_filtrado.reset_index(drop=True)
+        unidades = df_completo['UNIDAD']
         
         # Asegurarse de que ambos DataFrames tengan el mismo número de filas
-        if len(df_trabajo) != len(df_filtrado_reset):
-            print(f"Advertencia: Los DataFrames tienen diferente número de filas: {len(df_trabajo)} vs {len(df_filtrado_reset)}")
+        if len(df_completo) != len(df_filtrado_reset):
+            print(f"Advertencia: Los DataFrames tienen diferente número de filas: {len(df_completo)} vs {len(df_filtrado_reset)}")
             # Ajustar el tamaño si es necesario
-            min_filas = min(len(df_trabajo), len(df_filtrado_reset))
-            df_trabajo = df_trabajo.iloc[0:min_filas].copy()
-            df_filtrado_reset = df_filtrado_reset.iloc[0:min_filas].copy()
-        
-        # Clasificar cada fila según su unidad usando método seguro
-        unidades_clasificadas = []
-        for i in range(len(df_trabajo)):
-            try:
-                unidad = df_trabajo.iloc[i]['UNIDAD']
-                unidad_clasificada = clasificar_unidad(unidad)
-                unidades_clasificadas.append(unidad_clasificada)
-            except Exception as e:
-                print(f"Error al clasificar unidad en fila {i}: {str(e)}")
-                unidades_clasificadas.append(None)
-        
-        # Agregar la columna de unidades clasificadas
-        df_trabajo['UNIDAD_CLASIFICADA'] = unidades_clasificadas
-        
-        # Diccionario para almacenar los DataFrames por unidad
-        dfs_por_unidad = {}
+            min_filas = min(len(df_completo), len(df_filtrado_reset))
+            unidades = unidades.iloc[0:min_filas]
+            df_filtrado_reset = df_filtrado_reset.iloc[0:min_filas]
         
-        # Para cada unidad en el orden definido
-        for unidad in UNIDADES_ORDEN:
-            try:
-                # Crear un nuevo DataFrame para esta unidad
-                filas_unidad = []
-                
-                # Recorrer todas las filas y seleccionar las que corresponden a esta unidad
-                for i in range(len(df_trabajo)):
-                    if df_trabajo.iloc[i]['UNIDAD_CLASIFICADA'] == unidad:
-                        # Obtener la fila correspondiente del DataFrame filtrado
-                        fila_filtrada = df_filtrado_reset.iloc[i]
-                        filas_unidad.append(fila_filtrada)
-                
-                # Si hay filas para esta unidad, crear un DataFrame
-                if filas_unidad:
-                    # Crear un nuevo DataFrame con las filas seleccionadas
-                    df_unidad = pd.DataFrame(filas_unidad)
-                    
-                    # Agregar al diccionario si no está vacío
-                    if not df_unidad.empty:
-                        dfs_por_unidad[unidad] = df_unidad
-            except Exception as e:
-                print(f"Error al procesar la unidad {unidad}: {str(e)}")
-                continue
+        # Cada unidad distinta se clasifica una sola vez; el código de cada
+        # fila es la posición de su unidad en UNIDADES_ORDEN
+        codigos_unidad = clasificar_columna_unidades(unidades).codes
+        
+        # Un ordenamiento estable deja las filas de cada unidad contiguas y en
+        # su orden original; cada unidad es luego un tramo del resultado
+        orden = np.argsort(codigos_unidad, kind="stable")
+        df_ordenado = df_filtrado_reset.take(orden)
+        limites = np.searchsorted(codigos_unidad[orden], np.arange(len(UNIDADES_ORDEN) + 1))
+        
+        # Diccionario con los DataFrames de cada unidad, en el orden definido
+        dfs_por_unidad = {}
+        for i, unidad in enumerate(UNIDADES_ORDEN):
+            inicio, fin = limites[i], limites[i + 1]
+            if fin > inicio:
+                dfs_por_unidad[unidad] = df_ordenado.iloc[inicio:fin]
         
         return dfs_por_unidad
         
     except Exception as e:
         print(f"Error general en clasificar_datos_por_unidad: {str(e)}")
         return {}
+
+class DatasetPreparado:
+    """
+    Datos de una carga preparados una sola vez para todos los tipos de reporte.
+    
+    Los artefactos derivados (datos combinados y filtrados, partición por
+    unidad, columnas numéricas y agregados) se calculan la primera vez que se
+    piden y se conservan, de modo que cambiar entre el reporte por unidades,
+    el general y el de cumplimiento, o volver a generar el PDF, no repite el
+    trabajo. Ningún artefacto se modifica después de calculado: los reportes
+    solo los leen (con copy-on-write, cualquier cambio de un llamador recae
+    en una copia propia).
+    """
+    
+    def __init__(self, df):
+        """
+        Args:
+            df (pandas.DataFrame): Datos cargados (compactos o no).
+        """
+        self._df = df
+        self._artefactos = {}
+        self._bloqueo = threading.RLock()
+    
+    @classmethod
+    def desde_dataframe(cls, datos):
+        """
+        Crea el conjunto preparado de un DataFrame (o devuelve el mismo conjunto).
+        
+        Args:
+            datos: DataFrame cargado o DatasetPreparado existente.
+            
+        Returns:
+            DatasetPreparado: Conjunto listo para los reportes.
+        """
+        if isinstance(datos, cls):
+            return datos
+        return cls(datos)
+    
+    def memorizar(self, clave, calcular):
+        """
+        Devuelve el artefacto `clave`, calculándolo la primera vez.
+        
+        Los análisis de report_services lo usan para conservar sus propios
+        resultados junto a los datos.
+        
+        Args:
+            clave (hashable): Identificador del artefacto.
+            calcular (callable): Función sin argumentos que lo calcula.
+            
+        Returns:
+            object: Artefacto memorizado.
+        """
+        with self._bloqueo:
+            if clave not in self._artefactos:
+                self._artefactos[clave] = calcular()
+            return self._artefactos[clave]
+    
+    @property
+    def original(self):
+        """pandas.DataFrame: Datos tal como se cargaron."""
+        return self._df
+    
+    @property
+    def empty(self):
+        """bool: True si la carga no tiene filas."""
+        return self._df.empty
+    
+    @property
+    def columns(self):
+        """pandas.Index: Columnas de la carga."""
+        return self._df.columns
+    
+    def _preparado(self):
+        return self.memorizar('preparado', lambda: preparar_dataframe(self._df))
+    
+    @property
+    def df_completo(self):
+        """pandas.DataFrame: Todas las columnas, con NOMBRE ORDEN combinado."""
+        return self._preparado()[0]
+    
+    @property
+    def df_filtrado(self):
+        """pandas.DataFrame: Solo las columnas del PDF, con las horas como texto."""
+        return self._preparado()[1]
+    
+    @property
+    def columnas_disponibles(self):
+        """list: Columnas de COLUMNAS_PDF presentes en los datos."""
+        return self._preparado()[2]
+    
+    @property
+    def por_unidad(self):
+        """dict: Filas de df_filtrado de cada unidad, en el orden de UNIDADES_ORDEN."""
+        return self.memorizar('por_unidad', lambda: clasificar_datos_por_unidad(self.df_completo, self.df_filtrado))
+    
+    @property
+    def numerico(self):
+        """
+        pandas.DataFrame: df_completo con COLUMNAS_NUMERICAS convertidas a
+        números (0 si no lo son) y FECHA como fecha.
+        """
+        def calcular():
+            df = self.df_completo
+            conversiones = {
+                col: pd.to_numeric(df[col], errors='coerce').fillna(0)
+                for col in COLUMNAS_NUMERICAS if col in df.columns
+            }
+            if 'FECHA' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['FECHA']):
+                conversiones['FECHA'] = pd.to_datetime(df['FECHA'], errors='coerce')
+            return df.assign(**conversiones)
+        return self.memorizar('numerico', calcular)
+    
+    def agregado(self, clave, agregaciones):
+        """
+        Agrupa los datos numéricos por una columna (resultado memorizado).
+        
+        Args:
+            clave (str): Columna por la que se agrupa; FECHA se agrupa por día.
+            agregaciones (dict): {columna: función} como en DataFrame.agg.
+            
+        Returns:
+            pandas.DataFrame: Una fila por grupo, con la clave como columna.
+        """
+        def calcular():
+            df = self.numerico
+            grupos = df['FECHA'].dt.date if clave == 'FECHA' else clave
+            return df.groupby(grupos, observed=True).agg(agregaciones).reset_index()
+        return self.memorizar(('agregado', clave, tuple(agregaciones.items())), calcular)
+
+# Conjuntos preparados por contenido, del menos al más usado recientemente
+_datasets = OrderedDict()
+_bloqueo_datasets = threading.Lock()
+
+def _huella_dataframe(df):
+    """Identifica el contenido de un DataFrame (columnas, filas y valores)."""
+    valores = pd.util.hash_pandas_object(densificar_dataframe(df), index=False).to_numpy()
+    return tuple(df.columns), hashlib.sha1(valores.tobytes()).hexdigest()
+
+def obtener_dataset_preparado(df):
+    """
+    Obtiene el conjunto preparado de una carga, reutilizándolo si ya existe.
+    
+    Streamlit vuelve a ejecutar la aplicación en cada interacción; el
+    conjunto se conserva por contenido para que los reportes de la misma
+    carga compartan los artefactos ya calculados.
+    
+    Args:
+        df (pandas.DataFrame): Datos cargados.
+        
+    Returns:
+        DatasetPreparado: Conjunto preparado (nuevo o reutilizado).
+    """
+    try:
+        clave = _huella_dataframe(df)
+    except Exception as e:
+        print(f"Advertencia: no se pudo identificar el contenido de los datos ({str(e)}). Se prepararán de nuevo.")
+        return DatasetPreparado(df)
+    
+    with _bloqueo_datasets:
+        datos = _datasets.get(clave)
+        if datos is None:
+            datos = _datasets[clave] = DatasetPreparado(df)
+        _datasets.move_to_end(clave)
+        while len(_datasets) > MAX_DATASETS_PREPARADOS:
+            _datasets.popitem(last=False)
+    return datos
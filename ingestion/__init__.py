@@ -0,0 +1,25 @@
+"""
+Paquete para la ingesta de archivos de despliegues operativos.
+"""
+
+from ingestion.workbook import LibroExcel, abrir_libro, leer_bytes_archivo
+from ingestion.month import leer_mes_excel, numero_mes
+from ingestion.engines import MOTORES_EXCEL, seleccionar_motores, comparar_motores
+from ingestion.compact import compactar_dataframe, densificar_dataframe, informe_memoria
+from ingestion.dedup import depurar_duplicados, obtener_indice_duplicados
+
+__all__ = [
+    'LibroExcel',
+    'abrir_libro',
+    'leer_bytes_archivo',
+    'leer_mes_excel',
+    'numero_mes',
+    'MOTORES_EXCEL',
+    'seleccionar_motores',
+    'comparar_motores',
+    'compactar_dataframe',
+    'densificar_dataframe',
+    'informe_memoria',
+    'depurar_duplicados',
+    'obtener_indice_duplicados'
+]
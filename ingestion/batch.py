@@ -0,0 +1,185 @@
+"""
+Ingesta por lotes: varios libros (uno por dirección) leídos en paralelo.
+
+Cada archivo se lee en un proceso distinto; los resultados se unen en un
+único DataFrame con la columna ARCHIVO_ORIGEN y las diferencias de esquema
+entre archivos se informan en un resumen consolidado.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+
+from config import EXPECTED_COLUMNS, MAX_PROCESOS_INGESTA, COLUMNA_ORIGEN
+from ingestion.workbook import LibroExcel, leer_bytes_archivo
+from ingestion.csv_reader import es_archivo_csv, leer_tabla_csv, detectar_formato_csv, encabezado_csv, TAMAÑO_MUESTRA
+from ingestion.schema import diferencias_esquema, selector_columnas
+
+# Columnas del resumen de esquemas
+COLUMNAS_RESUMEN = ["ARCHIVO", "FILAS", "COLUMNAS FALTANTES", "COLUMNAS ADICIONALES", "ERROR"]
+
+def _leer_archivo_lote(contenido, nombre, es_csv, columnas=None):
+    """
+    Lee, normaliza y formatea un archivo del lote (Excel o CSV).
+    
+    Args:
+        contenido (bytes): Contenido del archivo.
+        nombre (str): Nombre del archivo dentro del lote.
+        es_csv (bool): True si el archivo es CSV/TSV.
+        columnas (tuple, optional): Columnas esperadas a leer (ver
+            columnas_necesarias); el resto no se analiza. Defaults to None (todas).
+    
+    Returns:
+        dict: Claves 'archivo', 'df', 'faltantes', 'adicionales' y 'error'.
+    """
+    from utils import formatear_datos
+    from ingestion.schema import normalizar_columnas
+    from ingestion.layout import leer_hoja_tolerante, encabezado_hoja
+
+    resultado = {'archivo': nombre, 'df': None, 'faltantes': [], 'adicionales': [], 'error': ""}
+    try:
+        # Con columnas seleccionadas, el resumen de esquema se arma con el
+        # encabezado completo (las columnas no leídas no faltan en el archivo)
+        if es_csv:
+            codificacion, separador = detectar_formato_csv(contenido[:TAMAÑO_MUESTRA])
+            usecols = selector_columnas(tuple(columnas)) if columnas is not None else None
+            crudo = leer_tabla_csv(contenido, separador=separador, codificacion=codificacion, usecols=usecols)
+            encabezados = (
+                crudo.columns if columnas is None
+                else encabezado_csv(contenido[:TAMAÑO_MUESTRA], separador, codificacion)
+            )
+        else:
+            libro = LibroExcel(contenido, nombre=nombre)
+            hoja = 'OPERATIVOS' if 'OPERATIVOS' in libro.hojas else libro.hojas[0]
+            crudo = leer_hoja_tolerante(libro, hoja, columnas)
+            encabezados = crudo.columns if columnas is None else encabezado_hoja(libro, hoja)
+
+        resultado['faltantes'], resultado['adicionales'] = diferencias_esquema(encabezados)
+        if len(resultado['faltantes']) == len(EXPECTED_COLUMNS):
+            resultado['error'] = "No contiene ninguna de las columnas esperadas"
+        else:
+            resultado['df'] = formatear_datos(normalizar_columnas(crudo), columnas)
+    except Exception as e:
+        resultado['error'] = str(e)
+
+    return resultado
+
+def _leer_lote_secuencial(archivos, progreso):
+    """Lee los archivos uno a uno en el proceso actual."""
+    for i, (contenido, nombre, es_csv, columnas) in enumerate(archivos, start=1):
+        resultado = _leer_archivo_lote(contenido, nombre, es_csv, columnas)
+        if progreso:
+            progreso(nombre, i, len(archivos))
+        yield resultado
+
+def _leer_lote_en_paralelo(archivos, progreso, max_procesos):
+    """
+    Lee los archivos en un pool de procesos, informando el avance por archivo.
+
+    Si el pool no puede crearse se recurre a la lectura secuencial.
+    """
+    if len(archivos) <= 1 or max_procesos == 1:
+        yield from _leer_lote_secuencial(archivos, progreso)
+        return
+
+    try:
+        with ProcessPoolExecutor(max_workers=max_procesos) as pool:
+            futuros = [pool.submit(_leer_archivo_lote, *entrada) for entrada in archivos]
+            resultados = []
+            for i, futuro in enumerate(as_completed(futuros), start=1):
+                resultado = futuro.result()
+                resultados.append(resultado)
+                if progreso:
+                    progreso(resultado['archivo'], i, len(archivos))
+    except Exception as e:
+        print(f"Advertencia: no se pudo leer en paralelo ({str(e)}). Se leerá de forma secuencial.")
+        yield from _leer_lote_secuencial(archivos, progreso)
+        return
+
+    yield from resultados
+
+def resumen_esquemas(resultados):
+    """
+    Construye el resumen consolidado de esquemas de un lote.
+
+    Args:
+        resultados (list): Resultados de _leer_archivo_lote, en orden de carga.
+
+    Returns:
+        pandas.DataFrame: Una fila por archivo con las columnas de COLUMNAS_RESUMEN.
+    """
+    filas = [{
+        "ARCHIVO": r['archivo'],
+        "FILAS": len(r['df']) if r['df'] is not None else 0,
+        "COLUMNAS FALTANTES": ", ".join(r['faltantes']),
+        "COLUMNAS ADICIONALES": ", ".join(r['adicionales']),
+        "ERROR": r['error']
+    } for r in resultados]
+    return pd.DataFrame(filas, columns=COLUMNAS_RESUMEN)
+
+def nombres_lote(archivos):
+    """
+    Obtiene el nombre con el que cada archivo de un lote figura en ARCHIVO_ORIGEN.
+
+    Los nombres repetidos se desambiguan ("x.xlsx (2)") para que cada fila
+    tenga un origen único.
+
+    Args:
+        archivos (list): Archivos subidos por el usuario.
+
+    Returns:
+        list: Un nombre por archivo, en el orden de carga.
+    """
+    nombres = []
+    vistos = {}
+    for i, archivo in enumerate(archivos, start=1):
+        nombre = getattr(archivo, 'name', None) or f"archivo_{i}"
+        vistos[nombre] = vistos.get(nombre, 0) + 1
+        if vistos[nombre] > 1:
+            nombre = f"{nombre} ({vistos[nombre]})"
+        nombres.append(nombre)
+    return nombres
+
+def leer_lote_archivos(archivos, progreso=None, max_procesos=MAX_PROCESOS_INGESTA, columnas=None):
+    """
+    Lee varios archivos de despliegues en paralelo y los une en un DataFrame.
+
+    Args:
+        archivos (list): Archivos subidos por el usuario (Excel o CSV).
+        progreso (callable, optional): Función llamada como
+            progreso(archivo, completados, total) al terminar cada archivo.
+        max_procesos (int, optional): Número máximo de procesos.
+        columnas (tuple, optional): Columnas esperadas a leer de cada archivo
+            (ver columnas_necesarias). Defaults to None (todas).
+
+    Returns:
+        tuple: (DataFrame, DataFrame, bool, str) - (datos, resumen_esquemas,
+            es_valido, mensaje_error). Los archivos que no se pudieron leer
+            se informan en el resumen y no impiden unir los demás.
+    """
+    try:
+        entradas = [
+            (leer_bytes_archivo(archivo), nombre, es_archivo_csv(archivo), columnas)
+            for archivo, nombre in zip(archivos, nombres_lote(archivos))
+        ]
+
+        if not entradas:
+            return None, None, False, "No se seleccionó ningún archivo"
+
+        por_nombre = {r['archivo']: r for r in _leer_lote_en_paralelo(entradas, progreso, max_procesos)}
+        resultados = [por_nombre[nombre] for _, nombre, _, _ in entradas]
+        resumen = resumen_esquemas(resultados)
+
+        frames = [
+            r['df'].assign(**{COLUMNA_ORIGEN: r['archivo']})
+            for r in resultados
+            if r['df'] is not None and not r['df'].empty
+        ]
+        if not frames:
+            return None, resumen, False, "Ninguno de los archivos seleccionados contiene datos válidos"
+
+        # Unir los archivos en el orden en que se cargaron
+        df_lote = pd.concat(frames, ignore_index=True)
+        return df_lote, resumen, True, ""
+
+    except Exception as e:
+        return None, None, False, f"Error al procesar los archivos: {str(e)}"
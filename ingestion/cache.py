@@ -0,0 +1,199 @@
+"""
+Caché de ingesta direccionada por contenido, en archivos Arrow IPC en disco.
+
+Cada resultado normalizado se guarda con una clave derivada del hash de los
+bytes subidos. Cualquier sesión o proceso que reciba el mismo archivo lo carga
+mapeando el archivo en memoria, sin repetir la lectura del Excel.
+"""
+
+import os
+import uuid
+import hashlib
+import pandas as pd
+
+from config import CACHE_DIR, CACHE_LIMITE_BYTES
+from ingestion.compact import densificar_dataframe
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # pragma: no cover - pyarrow es opcional
+    pa = None
+
+# Versión del formato normalizado; cambiarla invalida las entradas anteriores
+VERSION_CACHE = "8"
+
+# Extensión de los archivos de la caché
+EXTENSION = ".arrow"
+
+def clave_contenido(contenido, **parametros):
+    """
+    Calcula la clave de caché de un archivo y sus parámetros de lectura.
+
+    Args:
+        contenido (bytes): Contenido del archivo subido.
+        **parametros: Opciones que cambian el resultado (hoja, mes, año, etc.).
+
+    Returns:
+        str: Clave hexadecimal (SHA-256).
+    """
+    h = hashlib.sha256()
+    h.update(VERSION_CACHE.encode())
+    h.update(contenido)
+    for nombre in sorted(parametros):
+        h.update(f"|{nombre}={parametros[nombre]!r}".encode())
+    return h.hexdigest()
+
+def _preparar_para_arrow(df):
+    """
+    Ajusta las columnas que Arrow no puede representar directamente.
+
+    Las columnas dispersas se guardan como columnas normales y las de tipo
+    object con valores mezclados (por ejemplo números y textos en NUMERO
+    ORDEN) se convierten a texto conservando los nulos.
+    """
+    df = densificar_dataframe(df)
+    columnas = {}
+    for col in df.columns:
+        serie = df[col]
+        if serie.dtype == object and pd.api.types.infer_dtype(serie, skipna=True).startswith('mixed'):
+            columnas[col] = serie.where(serie.isna(), serie.astype(str))
+    return df.assign(**columnas) if columnas else df
+
+class CacheIngestion:
+    """
+    Caché en disco de DataFrames normalizados, con tamaño máximo y desalojo LRU.
+
+    Los archivos se escriben sin compresión en formato Arrow IPC para poder
+    mapearlos en memoria sin copias al leerlos. La fecha de modificación de
+    cada archivo registra su último uso.
+    """
+
+    def __init__(self, directorio=CACHE_DIR, limite_bytes=CACHE_LIMITE_BYTES):
+        """
+        Args:
+            directorio (str, optional): Carpeta de la caché. Defaults to CACHE_DIR.
+            limite_bytes (int, optional): Tamaño máximo total. Defaults to CACHE_LIMITE_BYTES.
+        """
+        self.directorio = directorio
+        self.limite_bytes = limite_bytes
+
+    @property
+    def disponible(self):
+        """bool: True si pyarrow está instalado y la caché puede usarse."""
+        return pa is not None
+
+    def ruta(self, clave):
+        """
+        Obtiene la ruta del archivo de una entrada.
+
+        Args:
+            clave (str): Clave de la entrada.
+
+        Returns:
+            str: Ruta del archivo Arrow.
+        """
+        return os.path.join(self.directorio, clave + EXTENSION)
+
+    def obtener(self, clave):
+        """
+        Carga una entrada de la caché mapeando su archivo en memoria.
+
+        Args:
+            clave (str): Clave de la entrada.
+
+        Returns:
+            pandas.DataFrame: Datos guardados, o None si no existen.
+        """
+        if not self.disponible:
+            return None
+
+        ruta = self.ruta(clave)
+        try:
+            with pa.memory_map(ruta, 'r') as fuente:
+                tabla = pa.ipc.open_file(fuente).read_all()
+            # Marcar la entrada como usada recientemente
+            os.utime(ruta)
+        except (FileNotFoundError, pa.ArrowInvalid, OSError):
+            return None
+
+        # split_blocks evita consolidar columnas, de modo que las numéricas
+        # sin nulos siguen apuntando al archivo mapeado
+        return tabla.to_pandas(split_blocks=True)
+
+    def guardar(self, clave, df):
+        """
+        Guarda un DataFrame en la caché y desaloja las entradas más antiguas.
+
+        Args:
+            clave (str): Clave de la entrada.
+            df (pandas.DataFrame): Datos normalizados a guardar.
+
+        Returns:
+            bool: True si la entrada se guardó.
+        """
+        if not self.disponible:
+            return False
+
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            tabla = pa.Table.from_pandas(_preparar_para_arrow(df), preserve_index=False)
+
+            # Escribir en un archivo temporal y renombrar: otros procesos nunca
+            # ven una entrada a medio escribir
+            temporal = os.path.join(self.directorio, f".{clave}.{uuid.uuid4().hex}.tmp")
+            with pa.OSFile(temporal, 'wb') as destino:
+                with pa.ipc.new_file(destino, tabla.schema) as escritor:
+                    escritor.write_table(tabla)
+            os.replace(temporal, self.ruta(clave))
+        except Exception as e:
+            print(f"Advertencia: no se pudo guardar en la caché de ingesta: {str(e)}")
+            return False
+
+        self.desalojar()
+        return True
+
+    def desalojar(self):
+        """
+        Elimina las entradas menos usadas hasta respetar el tamaño máximo.
+
+        Returns:
+            int: Número de entradas eliminadas.
+        """
+        entradas = []
+        try:
+            with os.scandir(self.directorio) as it:
+                for entrada in it:
+                    if entrada.name.endswith(EXTENSION):
+                        info = entrada.stat()
+                        entradas.append((info.st_mtime, info.st_size, entrada.path))
+        except FileNotFoundError:
+            return 0
+
+        total = sum(tamaño for _, tamaño, _ in entradas)
+        eliminadas = 0
+        for _, tamaño, ruta in sorted(entradas):
+            if total <= self.limite_bytes:
+                break
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
+            total -= tamaño
+            eliminadas += 1
+        return eliminadas
+
+# Caché compartida por toda la aplicación
+_cache = None
+
+def obtener_cache():
+    """
+    Obtiene la caché de ingesta compartida del proceso.
+
+    Returns:
+        CacheIngestion: Caché configurada según config.py.
+    """
+    global _cache
+    if _cache is None:
+        _cache = CacheIngestion()
+    return _cache
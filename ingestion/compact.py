@@ -0,0 +1,208 @@
+"""
+Representación compacta del DataFrame de despliegues.
+
+Al final de la ingesta las etiquetas repetidas se guardan como categorías,
+los conteos con el entero sin signo más pequeño que los contiene, las horas
+como Int16 y las columnas casi siempre en cero como columnas dispersas.
+"""
+
+import numpy as np
+import pandas as pd
+
+from config import NUMERIC_COLUMNS, COLUMNAS_HORA, COLUMNAS_CATEGORICAS, UMBRAL_DISPERSO
+
+def tipo_entero_minimo(minimo, maximo):
+    """
+    Obtiene el tipo entero más pequeño que contiene un rango de valores.
+
+    Args:
+        minimo (int): Valor mínimo de la columna.
+        maximo (int): Valor máximo de la columna.
+
+    Returns:
+        numpy.dtype: uint8/uint16/uint32 si no hay negativos; en otro caso
+            int8/int16/int32/int64.
+    """
+    tipos = ("uint8", "uint16", "uint32", "uint64") if minimo >= 0 else ("int8", "int16", "int32", "int64")
+    for tipo in tipos:
+        limites = np.iinfo(tipo)
+        if limites.min <= minimo and maximo <= limites.max:
+            return np.dtype(tipo)
+    return np.dtype("int64")
+
+def _compactar_conteo(serie, dispersas):
+    """Reduce una columna de conteos enteros a su tipo mínimo (y disperso si aplica)."""
+    valores = serie.to_numpy()
+    if len(valores) == 0:
+        return serie
+
+    tipo = tipo_entero_minimo(int(valores.min()), int(valores.max()))
+    compacta = serie.astype(tipo)
+
+    if dispersas and np.count_nonzero(valores == 0) >= UMBRAL_DISPERSO * len(valores):
+        compacta = compacta.astype(pd.SparseDtype(tipo, 0))
+    return compacta
+
+def compactar_dataframe(df, dispersas=True):
+    """
+    Convierte un DataFrame formateado a su representación compacta.
+
+    Solo se transforman las columnas cuyo tipo lo permite (conteos enteros,
+    horas numéricas, etiquetas de texto), por lo que la función puede
+    aplicarse de nuevo sobre un resultado ya compacto.
+
+    Args:
+        df (pandas.DataFrame): Datos ya pasados por formatear_datos.
+        dispersas (bool, optional): Si es True, los conteos con al menos
+            UMBRAL_DISPERSO de ceros se guardan como columnas dispersas.
+            Defaults to True.
+
+    Returns:
+        pandas.DataFrame: DataFrame compacto (el original no se modifica).
+    """
+    columnas = {}
+
+    for col in COLUMNAS_CATEGORICAS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            columnas[col] = df[col].astype("category")
+
+    for col in COLUMNAS_HORA:
+        if col in df.columns and pd.api.types.is_numeric_dtype(df[col]):
+            columnas[col] = df[col].round().astype("Int16")
+
+    for col in NUMERIC_COLUMNS:
+        if col in COLUMNAS_HORA or col not in df.columns:
+            continue
+        serie = df[col]
+        if isinstance(serie.dtype, pd.SparseDtype):
+            continue
+        if pd.api.types.is_integer_dtype(serie) and not pd.api.types.is_extension_array_dtype(serie):
+            columnas[col] = _compactar_conteo(serie, dispersas)
+        elif pd.api.types.is_float_dtype(serie):
+            columnas[col] = serie.astype("float32")
+
+    return df.assign(**columnas) if columnas else df
+
+def concatenar_compactos(bloques):
+    """
+    Une bloques compactos conservando sus columnas categóricas.
+
+    pandas convierte a texto las categóricas cuyas categorías difieren entre
+    bloques; aquí se unifican antes (ordenadas, como en compactar_dataframe)
+    para que el resultado siga siendo compacto.
+
+    Args:
+        bloques (list): DataFrames compactos con las mismas columnas.
+
+    Returns:
+        pandas.DataFrame: Bloques unidos, con índice nuevo.
+    """
+    if len(bloques) == 1:
+        return bloques[0].reset_index(drop=True)
+
+    tipos = {}
+    for col in bloques[0].columns:
+        if not all(isinstance(bloque[col].dtype, pd.CategoricalDtype) for bloque in bloques):
+            continue
+        categorias = bloques[0][col].cat.categories
+        for bloque in bloques[1:]:
+            nuevas = bloque[col].cat.categories
+            categorias = categorias.append(nuevas[~nuevas.isin(categorias)])
+        try:
+            categorias = categorias.sort_values()
+        except TypeError:
+            pass
+        tipos[col] = pd.CategoricalDtype(categorias)
+
+    if tipos:
+        bloques = [bloque.astype(tipos) for bloque in bloques]
+    return pd.concat(bloques, ignore_index=True)
+
+def densificar_dataframe(df):
+    """
+    Convierte las columnas dispersas a columnas normales.
+
+    Se usa antes de entregar los datos a código que no admite tipos
+    dispersos (Arrow, Streamlit, generación del PDF).
+
+    Args:
+        df (pandas.DataFrame): DataFrame, posiblemente compacto.
+
+    Returns:
+        pandas.DataFrame: DataFrame sin columnas dispersas.
+    """
+    dispersas = {
+        col: df[col].sparse.to_dense()
+        for col in df.columns
+        if isinstance(df[col].dtype, pd.SparseDtype)
+    }
+    return df.assign(**dispersas) if dispersas else df
+
+def expandir_dataframe(df):
+    """
+    Reconstruye la representación sin compactar (int64, float64 y texto).
+
+    Args:
+        df (pandas.DataFrame): DataFrame compacto.
+
+    Returns:
+        pandas.DataFrame: DataFrame con los tipos que produce formatear_datos.
+    """
+    columnas = {}
+    for col in df.columns:
+        serie = df[col]
+        if isinstance(serie.dtype, pd.SparseDtype):
+            serie = serie.sparse.to_dense()
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            columnas[col] = serie.astype(object)
+        elif col in COLUMNAS_HORA and pd.api.types.is_numeric_dtype(serie):
+            columnas[col] = serie.astype("float64")
+        elif pd.api.types.is_integer_dtype(serie):
+            columnas[col] = serie.astype("int64")
+        elif pd.api.types.is_float_dtype(serie):
+            columnas[col] = serie.astype("float64")
+    return df.assign(**columnas) if columnas else df
+
+def uso_memoria(df):
+    """
+    Calcula la memoria total de un DataFrame, incluido el contenido de los textos.
+
+    Args:
+        df (pandas.DataFrame): DataFrame a medir.
+
+    Returns:
+        int: Bytes ocupados.
+    """
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+def informe_memoria(df):
+    """
+    Compara la memoria de un DataFrame compacto con su representación sin compactar.
+
+    Args:
+        df (pandas.DataFrame): DataFrame compacto.
+
+    Returns:
+        pandas.DataFrame: Una fila por columna con COLUMNA, TIPO ORIGINAL,
+            BYTES ORIGINAL, TIPO COMPACTO y BYTES COMPACTO, más una fila TOTAL.
+    """
+    expandido = expandir_dataframe(df)
+    bytes_original = expandido.memory_usage(index=False, deep=True)
+    bytes_compacto = df.memory_usage(index=False, deep=True)
+
+    informe = pd.DataFrame({
+        "COLUMNA": list(df.columns),
+        "TIPO ORIGINAL": [str(t) for t in expandido.dtypes],
+        "BYTES ORIGINAL": bytes_original.to_numpy(dtype="int64"),
+        "TIPO COMPACTO": [str(t) for t in df.dtypes],
+        "BYTES COMPACTO": bytes_compacto.to_numpy(dtype="int64")
+    })
+
+    total = pd.DataFrame([{
+        "COLUMNA": "TOTAL",
+        "TIPO ORIGINAL": "",
+        "BYTES ORIGINAL": int(informe["BYTES ORIGINAL"].sum()),
+        "TIPO COMPACTO": "",
+        "BYTES COMPACTO": int(informe["BYTES COMPACTO"].sum())
+    }])
+    return pd.concat([informe, total], ignore_index=True)
@@ -0,0 +1,156 @@
+"""
+Lectura rápida de archivos CSV/TSV de despliegues.
+
+Una única muestra del comienzo del archivo determina la codificación y el
+separador; luego el archivo se lee con el lector CSV multihilo de Arrow sobre
+el buffer (o el archivo mapeado en memoria), que admite campos entre comillas
+con saltos de línea. Sin pyarrow se usa pandas.read_csv con las mismas opciones.
+"""
+
+import io
+import csv
+import codecs
+import pandas as pd
+
+from ingestion.workbook import leer_bytes_archivo
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pragma: no cover - pyarrow es opcional
+    pa = None
+
+# Bytes del comienzo del archivo que se analizan para detectar el formato
+TAMAÑO_MUESTRA = 64 * 1024
+
+# Separadores candidatos, en orden de preferencia ante un empate
+SEPARADORES = [",", ";", "\t", "|"]
+
+# Codificación usada cuando el archivo no es UTF-8 (Latin-1 de Windows)
+CODIFICACION_ALTERNATIVA = "cp1252"
+
+# Extensiones de archivo que se tratan como texto delimitado
+EXTENSIONES_CSV = (".csv", ".tsv", ".txt")
+
+def es_archivo_csv(archivo):
+    """
+    Indica si un archivo subido es un CSV/TSV según su nombre.
+
+    Args:
+        archivo: Archivo subido por Streamlit o ruta.
+
+    Returns:
+        bool: True si la extensión corresponde a texto delimitado.
+    """
+    nombre = getattr(archivo, 'name', archivo if isinstance(archivo, str) else "")
+    return str(nombre).lower().endswith(EXTENSIONES_CSV)
+
+def detectar_formato_csv(muestra):
+    """
+    Detecta la codificación y el separador a partir de una muestra del archivo.
+
+    Args:
+        muestra (bytes): Primeros bytes del archivo.
+
+    Returns:
+        tuple: (codificacion, separador). La codificación es "utf-8" (con o sin
+            BOM) o CODIFICACION_ALTERNATIVA.
+    """
+    if muestra.startswith(codecs.BOM_UTF8):
+        muestra = muestra[len(codecs.BOM_UTF8):]
+
+    codificacion = "utf-8"
+    try:
+        texto = muestra.decode(codificacion)
+    except UnicodeDecodeError as e:
+        # Un carácter cortado al final de la muestra no indica otra codificación
+        if e.start >= len(muestra) - 3:
+            texto = muestra[:e.start].decode(codificacion)
+        else:
+            codificacion = CODIFICACION_ALTERNATIVA
+            texto = muestra.decode(codificacion, errors="replace")
+
+    # El separador se cuenta en la línea de encabezados, que no lleva comillas
+    encabezado = texto.splitlines()[0] if texto else ""
+    conteos = {sep: encabezado.count(sep) for sep in SEPARADORES}
+    separador = max(SEPARADORES, key=lambda sep: conteos[sep])
+    if conteos[separador] == 0:
+        separador = ","
+
+    return codificacion, separador
+
+def encabezado_csv(muestra, separador, codificacion):
+    """
+    Obtiene los nombres de columna a partir de la muestra inicial del archivo.
+
+    Args:
+        muestra (bytes): Primeros bytes del archivo.
+        separador (str): Separador de columnas.
+        codificacion (str): Codificación del texto.
+
+    Returns:
+        list: Encabezados de la primera fila.
+    """
+    texto = muestra.decode(codificacion, errors="ignore").lstrip("\ufeff")
+    return next(csv.reader(io.StringIO(texto, newline=""), delimiter=separador), [])
+
+def _leer_con_arrow(fuente, separador, codificacion, incluidas=None):
+    """Lee el CSV con pyarrow.csv y lo convierte a DataFrame."""
+    tabla = pa_csv.read_csv(
+        fuente,
+        read_options=pa_csv.ReadOptions(use_threads=True, encoding=codificacion),
+        parse_options=pa_csv.ParseOptions(delimiter=separador, newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(include_columns=incluidas) if incluidas is not None else None
+    )
+    return tabla.to_pandas()
+
+def _leer_con_pandas(contenido, separador, codificacion, usecols=None):
+    """Lee el CSV con pandas (respaldo cuando pyarrow no está disponible o falla)."""
+    return pd.read_csv(io.BytesIO(contenido), sep=separador, encoding=codificacion, usecols=usecols)
+
+def leer_tabla_csv(archivo, separador=None, codificacion=None, usecols=None):
+    """
+    Lee un archivo CSV/TSV completo a un DataFrame sin normalizar.
+
+    Args:
+        archivo: Archivo subido, objeto tipo archivo, ruta o bytes.
+        separador (str, optional): Separador de columnas. Si es None, se detecta.
+        codificacion (str, optional): Codificación del texto. Si es None, se detecta.
+        usecols (callable, optional): Función que recibe un encabezado e indica
+            si la columna se lee; las demás no se convierten. Defaults to None.
+
+    Returns:
+        pandas.DataFrame: Datos del archivo con los encabezados originales.
+    """
+    # Una ruta se mapea en memoria; un archivo subido ya está en memoria
+    mapa = None
+    if isinstance(archivo, str) and pa is not None:
+        mapa = pa.memory_map(archivo, 'r')
+        contenido = mapa.read_buffer(min(TAMAÑO_MUESTRA, mapa.size())).to_pybytes()
+        mapa.seek(0)
+    else:
+        contenido = leer_bytes_archivo(archivo)
+
+    try:
+        if separador is None or codificacion is None:
+            detectada, detectado = detectar_formato_csv(contenido[:TAMAÑO_MUESTRA])
+            codificacion = codificacion or detectada
+            separador = separador or detectado
+
+        if pa is not None:
+            try:
+                incluidas = None
+                if usecols is not None:
+                    incluidas = [c for c in encabezado_csv(contenido[:TAMAÑO_MUESTRA], separador, codificacion) if usecols(c)]
+                fuente = mapa if mapa is not None else pa.BufferReader(contenido)
+                return _leer_con_arrow(fuente, separador, codificacion, incluidas)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, LookupError) as e:
+                print(f"Advertencia: el lector CSV de Arrow no pudo leer el archivo, se usará pandas: {str(e)}")
+                if mapa is not None:
+                    mapa.seek(0)
+                    contenido = mapa.read()
+
+        return _leer_con_pandas(contenido, separador, codificacion, usecols)
+    finally:
+        if mapa is not None:
+            mapa.close()
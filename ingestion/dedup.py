@@ -0,0 +1,385 @@
+"""
+Detección de operativos repetidos mediante hashes de contenido.
+
+Cada fila se resume en un hash de 64 bits de sus columnas clave normalizadas
+(mayúsculas, sin acentos ni espacios sobrantes), calculado de forma
+vectorizada. Los repetidos dentro de una carga se detectan con una tabla
+hash en una pasada; los que ya llegaron en cargas anteriores (otro archivo,
+otra sesión) se buscan en un índice persistente de hashes ordenados, mapeado
+desde disco y precedido por un filtro de Bloom que descarta sin tocar el
+disco casi todas las filas nuevas.
+"""
+
+import os
+import math
+import uuid
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+
+from config import (
+    COLUMNAS_CLAVE_DUPLICADOS, COLUMNA_DUPLICADO, INDICE_DUPLICADOS_DIR,
+    CAPACIDAD_INDICE_DUPLICADOS, FALSOS_POSITIVOS_BLOOM, COLUMNA_ORIGEN
+)
+from ingestion.schema import normalizar_encabezado
+from ingestion.workbook import leer_bytes_archivo
+
+# Acciones sobre las filas duplicadas
+ACCIONES_DUPLICADOS = ["marcar", "eliminar"]
+
+def columnas_clave(df):
+    """
+    Obtiene las columnas clave presentes en el DataFrame.
+
+    Args:
+        df (pandas.DataFrame): Datos formateados.
+
+    Returns:
+        list: Columnas de COLUMNAS_CLAVE_DUPLICADOS presentes; la fecha se
+            sustituye por DIA cuando no hay FECHA.
+    """
+    columnas = [col for col in COLUMNAS_CLAVE_DUPLICADOS if col in df.columns]
+    if "FECHA" not in df.columns and "DIA" in df.columns:
+        columnas.append("DIA")
+    return columnas
+
+def _normalizar_clave(serie):
+    """Convierte una columna clave en valores comparables entre archivos."""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        # Solo importa el día
+        return serie.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]").astype("int64")
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        return serie.to_numpy(dtype="float64", na_value=np.nan)
+
+    # Textos (o mezclas, como NUMERO ORDEN): se normaliza cada valor distinto
+    # una sola vez y se expande por código
+    codigos, unicos = pd.factorize(serie)
+    normalizados = np.array([
+        normalizar_encabezado(int(v) if isinstance(v, float) and v.is_integer() else v)
+        for v in unicos
+    ] + [""], dtype=object)
+    return normalizados[codigos]
+
+def hash_filas(df, columnas=None):
+    """
+    Calcula el hash de 64 bits de las columnas clave de cada fila.
+
+    Args:
+        df (pandas.DataFrame): Datos formateados (o compactos).
+        columnas (list, optional): Columnas clave. Defaults to columnas_clave(df).
+
+    Returns:
+        numpy.ndarray: Hashes uint64, uno por fila.
+    """
+    columnas = columnas_clave(df) if columnas is None else columnas
+    if not columnas:
+        return np.arange(len(df), dtype="uint64")
+    claves = pd.DataFrame({col: _normalizar_clave(df[col]) for col in columnas})
+    return pd.util.hash_pandas_object(claves, index=False).to_numpy()
+
+def huella_archivo(archivo):
+    """
+    Identifica un archivo por su contenido, no por su nombre.
+
+    Un libro corregido que se vuelve a subir con otro nombre sigue siendo
+    otro archivo, y dos archivos distintos con el mismo nombre no se
+    confunden.
+
+    Args:
+        archivo: Archivo subido por Streamlit, objeto tipo archivo, ruta o bytes.
+
+    Returns:
+        str: Hash SHA-256 hexadecimal del contenido.
+    """
+    return hashlib.sha256(leer_bytes_archivo(archivo)).hexdigest()
+
+def hash_origenes(origen, filas):
+    """
+    Calcula el hash del archivo de origen de cada fila.
+
+    Args:
+        origen (str | array-like): Identificador del archivo (ver huella_archivo)
+            o uno por fila.
+        filas (int): Número de filas.
+
+    Returns:
+        numpy.ndarray: Hashes uint64, uno por fila.
+    """
+    if origen is None or isinstance(origen, str):
+        return np.full(filas, pd.util.hash_array(np.array([str(origen)], dtype=object))[0], dtype="uint64")
+    return pd.util.hash_array(np.asarray(origen, dtype=str).astype(object))
+
+class IndiceDuplicados:
+    """
+    Índice persistente de los hashes de filas ya cargadas.
+
+    Los hashes se guardan ordenados, junto con el hash del archivo del que
+    llegaron, en archivos .npy que se mapean en memoria. Un filtro de Bloom
+    en memoria responde primero: solo las filas que el filtro no descarta se
+    buscan (búsqueda binaria) en el índice.
+    """
+
+    def __init__(self, directorio=INDICE_DUPLICADOS_DIR, capacidad=CAPACIDAD_INDICE_DUPLICADOS,
+                 falsos_positivos=FALSOS_POSITIVOS_BLOOM):
+        """
+        Args:
+            directorio (str, optional): Carpeta del índice. Defaults to INDICE_DUPLICADOS_DIR.
+            capacidad (int, optional): Filas previstas para dimensionar el filtro.
+            falsos_positivos (float, optional): Tasa de falsos positivos del filtro.
+        """
+        self.directorio = directorio
+        self.capacidad = capacidad
+        self.falsos_positivos = falsos_positivos
+        self._bloqueo = threading.Lock()
+        self._hashes = None
+        self._origenes = None
+        self._bloom = None
+        self._cargar()
+
+    def _ruta(self, nombre):
+        """Ruta del archivo .npy de una parte del índice."""
+        return os.path.join(self.directorio, nombre + ".npy")
+
+    def _cargar(self):
+        """Carga el índice guardado (mapeado en memoria) o crea uno vacío."""
+        try:
+            self._hashes = np.load(self._ruta("hashes"), mmap_mode="r")
+            self._origenes = np.load(self._ruta("origenes"), mmap_mode="r")
+            if len(self._hashes) != len(self._origenes):
+                raise ValueError("índice incompleto")
+        except (FileNotFoundError, ValueError, OSError):
+            self._hashes = np.empty(0, dtype="uint64")
+            self._origenes = np.empty(0, dtype="uint64")
+
+        self.capacidad = max(self.capacidad, len(self._hashes))
+        try:
+            bloom = np.load(self._ruta("bloom"))
+            if len(bloom) * 8 != self._bits_bloom():
+                raise ValueError("tamaño distinto")
+            self._bloom = bloom
+        except (FileNotFoundError, ValueError, OSError):
+            self._reconstruir_bloom()
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def _bits_bloom(self):
+        """Bits del filtro para la capacidad y tasa de falsos positivos configuradas."""
+        bits = -self.capacidad * math.log(self.falsos_positivos) / math.log(2) ** 2
+        return max(64, int(math.ceil(bits / 64)) * 64)
+
+    def _funciones_bloom(self):
+        """Número óptimo de funciones hash del filtro."""
+        return max(1, round(self._bits_bloom() / self.capacidad * math.log(2)))
+
+    def _posiciones(self, hashes):
+        """Posiciones de bit de cada hash (doble hashing sobre las dos mitades)."""
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        i = np.arange(self._funciones_bloom(), dtype="uint64")
+        return (h1[:, None] + i[None, :] * h2[:, None]) % np.uint64(self._bits_bloom())
+
+    def _reconstruir_bloom(self):
+        """Crea el filtro de Bloom a partir de los hashes guardados."""
+        self._bloom = np.zeros(self._bits_bloom() // 8, dtype="uint8")
+        self._marcar_bloom(np.asarray(self._hashes))
+
+    def _marcar_bloom(self, hashes):
+        """Activa en el filtro los bits de los hashes dados."""
+        posiciones = self._posiciones(hashes).ravel()
+        octetos = (posiciones >> np.uint64(3)).astype(np.intp)
+        np.bitwise_or.at(self._bloom, octetos, np.left_shift(1, posiciones & np.uint64(7)).astype("uint8"))
+
+    def _quizas_contiene(self, hashes):
+        """Máscara de los hashes que pueden estar en el índice (sin falsos negativos)."""
+        posiciones = self._posiciones(hashes)
+        bits = (self._bloom[(posiciones >> np.uint64(3)).astype(np.intp)] >> (posiciones & np.uint64(7)).astype("uint8")) & 1
+        return bits.all(axis=1)
+
+    def buscar(self, hashes, origenes):
+        """
+        Indica qué filas ya se cargaron antes desde otro archivo.
+
+        Args:
+            hashes (numpy.ndarray): Hashes de las filas (uint64).
+            origenes (numpy.ndarray): Hash del archivo de origen de cada fila.
+
+        Returns:
+            numpy.ndarray: Máscara booleana de las filas ya vistas en otro archivo.
+        """
+        vistas = np.zeros(len(hashes), dtype=bool)
+        if not len(self._hashes) or not len(hashes):
+            return vistas
+
+        candidatas = np.flatnonzero(self._quizas_contiene(hashes))
+        if not len(candidatas):
+            return vistas
+
+        posiciones = np.searchsorted(self._hashes, hashes[candidatas])
+        posiciones_validas = np.minimum(posiciones, len(self._hashes) - 1)
+        encontradas = np.asarray(self._hashes[posiciones_validas]) == hashes[candidatas]
+        otro_archivo = np.asarray(self._origenes[posiciones_validas]) != origenes[candidatas]
+        vistas[candidatas] = encontradas & otro_archivo
+        return vistas
+
+    def agregar(self, hashes, origenes):
+        """
+        Añade al índice los hashes que aún no contiene.
+
+        Args:
+            hashes (numpy.ndarray): Hashes de las filas (uint64).
+            origenes (numpy.ndarray): Hash del archivo de origen de cada fila.
+
+        Returns:
+            int: Número de hashes nuevos.
+        """
+        with self._bloqueo:
+            unicos, primeras = np.unique(hashes, return_index=True)
+            posiciones = np.searchsorted(self._hashes, unicos)
+            posiciones_validas = np.minimum(posiciones, max(len(self._hashes) - 1, 0))
+            existentes = (
+                np.asarray(self._hashes[posiciones_validas]) == unicos
+                if len(self._hashes) else np.zeros(len(unicos), dtype=bool)
+            )
+            nuevos = ~existentes
+            if not nuevos.any():
+                return 0
+
+            # Inserción ordenada: los nuevos ya vienen ordenados por np.unique
+            self._hashes = np.insert(np.asarray(self._hashes), posiciones[nuevos], unicos[nuevos])
+            self._origenes = np.insert(np.asarray(self._origenes), posiciones[nuevos], origenes[primeras[nuevos]])
+
+            if len(self._hashes) > self.capacidad:
+                # El filtro se redimensiona para mantener la tasa de falsos positivos
+                self.capacidad = 2 * len(self._hashes)
+                self._reconstruir_bloom()
+            else:
+                self._marcar_bloom(unicos[nuevos])
+            return int(nuevos.sum())
+
+    def guardar(self):
+        """
+        Guarda el índice en disco (escritura atómica de cada archivo).
+
+        Returns:
+            bool: True si el índice se guardó.
+        """
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            with self._bloqueo:
+                for nombre, arreglo in (("hashes", self._hashes), ("origenes", self._origenes), ("bloom", self._bloom)):
+                    temporal = os.path.join(self.directorio, f".{nombre}.{uuid.uuid4().hex}.npy")
+                    np.save(temporal, np.asarray(arreglo))
+                    os.replace(temporal, self._ruta(nombre))
+        except Exception as e:
+            print(f"Advertencia: no se pudo guardar el índice de duplicados: {str(e)}")
+            return False
+        return True
+
+    def vaciar(self):
+        """
+        Olvida todas las cargas anteriores y borra el índice del disco.
+
+        Returns:
+            bool: True si el índice se vació.
+        """
+        with self._bloqueo:
+            self._hashes = np.empty(0, dtype="uint64")
+            self._origenes = np.empty(0, dtype="uint64")
+            self._reconstruir_bloom()
+            try:
+                for nombre in ("hashes", "origenes", "bloom"):
+                    if os.path.exists(self._ruta(nombre)):
+                        os.remove(self._ruta(nombre))
+            except OSError as e:
+                print(f"Advertencia: no se pudo borrar el índice de duplicados: {str(e)}")
+                return False
+        return True
+
+def marcar_duplicados(df, indice=None, origen=None):
+    """
+    Detecta las filas repetidas de una carga en tiempo lineal.
+
+    Una fila es duplicada si otra fila anterior de la misma carga tiene la
+    misma clave o, con un índice, si la clave ya llegó desde otro archivo en
+    una carga previa. El índice solo se consulta cuando los datos tienen
+    FECHA: sin ella, operativos iguales de días distintos coincidirían.
+
+    Si todas las filas de la carga ya llegaron antes, se trata de un archivo
+    re-subido (por ejemplo, corregido y con otro nombre): esas filas no se
+    marcan y solo se advierte, para no vaciar la carga al eliminarlas.
+
+    Args:
+        df (pandas.DataFrame): Datos formateados.
+        indice (IndiceDuplicados, optional): Índice persistente a consultar y
+            actualizar con las filas nuevas.
+        origen (str | array-like, optional): Identificador del archivo de
+            origen (ver huella_archivo) o uno por fila. Defaults to la columna
+            ARCHIVO_ORIGEN si existe.
+
+    Returns:
+        tuple: (numpy.ndarray, bool) - (máscara de las filas duplicadas,
+            True si la carga completa repite cargas anteriores).
+    """
+    hashes = hash_filas(df)
+    duplicadas = pd.Series(hashes).duplicated().to_numpy()
+    recarga = False
+
+    if indice is not None and "FECHA" in df.columns:
+        if origen is None and COLUMNA_ORIGEN in df.columns:
+            origen = df[COLUMNA_ORIGEN]
+        origenes = hash_origenes(origen, len(df))
+        vistas = indice.buscar(hashes, origenes)
+        recarga = bool(vistas.any()) and bool(vistas[~duplicadas].all())
+        if recarga:
+            print("Advertencia: todas las filas de la carga ya llegaron en cargas anteriores; no se marcan como duplicadas")
+        else:
+            duplicadas = duplicadas | vistas
+        if indice.agregar(hashes[~duplicadas], origenes[~duplicadas]):
+            indice.guardar()
+
+    return duplicadas, recarga
+
+def depurar_duplicados(df, accion="marcar", indice=None, origen=None):
+    """
+    Marca o elimina las filas duplicadas de una carga.
+
+    Args:
+        df (pandas.DataFrame): Datos formateados.
+        accion (str, optional): "marcar" (añade la columna COLUMNA_DUPLICADO)
+            o "eliminar". Defaults to "marcar".
+        indice (IndiceDuplicados, optional): Índice persistente de cargas previas.
+        origen (str | array-like, optional): Identificador del archivo de origen
+            de las filas (ver huella_archivo).
+
+    Returns:
+        tuple: (DataFrame, int, bool) - (datos depurados, filas duplicadas,
+            True si la carga completa repite cargas anteriores)
+    """
+    if accion not in ACCIONES_DUPLICADOS:
+        raise ValueError(f"Acción no válida para duplicados: {accion}")
+
+    duplicadas, recarga = marcar_duplicados(df, indice, origen)
+    cantidad = int(duplicadas.sum())
+
+    if accion == "marcar":
+        return df.assign(**{COLUMNA_DUPLICADO: duplicadas}), cantidad, recarga
+    if cantidad:
+        df = df[~duplicadas].reset_index(drop=True)
+    return df, cantidad, recarga
+
+# Índice compartido por toda la aplicación
+_indice = None
+
+def obtener_indice_duplicados():
+    """
+    Obtiene el índice persistente de duplicados compartido del proceso.
+
+    Returns:
+        IndiceDuplicados: Índice configurado según config.py.
+    """
+    global _indice
+    if _indice is None:
+        _indice = IndiceDuplicados()
+    return _indice
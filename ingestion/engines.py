@@ -0,0 +1,150 @@
+"""
+Motores de lectura de Excel: selección automática, respaldo y comparación.
+"""
+
+import io
+import os
+import time
+import importlib.util
+import pandas as pd
+
+from config import UMBRAL_MOTOR_RAPIDO
+
+# Motores soportados: módulo que los implementa y formatos que leen
+MOTORES_EXCEL = {
+    "calamine": {
+        "modulo": "python_calamine",
+        "formatos": ("xlsx", "xls"),
+        "descripcion": "Lector en Rust (python-calamine), el más rápido"
+    },
+    "openpyxl": {
+        "modulo": "openpyxl",
+        "formatos": ("xlsx",),
+        "descripcion": "Lector de referencia de pandas para xlsx"
+    },
+    "xlrd": {
+        "modulo": "xlrd",
+        "formatos": ("xls",),
+        "descripcion": "Lector para archivos Excel 97-2003 (.xls)"
+    }
+}
+
+# Firmas binarias de cada formato
+FIRMA_XLSX = b"PK\x03\x04"
+FIRMA_XLS = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+def motor_disponible(motor):
+    """
+    Indica si el módulo de un motor está instalado.
+
+    Args:
+        motor (str): Nombre del motor (ver MOTORES_EXCEL).
+
+    Returns:
+        bool: True si el motor puede usarse.
+    """
+    return importlib.util.find_spec(MOTORES_EXCEL[motor]["modulo"]) is not None
+
+def detectar_formato(contenido, nombre=None):
+    """
+    Detecta el formato de un libro por su firma binaria o, si no, por su extensión.
+
+    Args:
+        contenido (bytes): Contenido del archivo.
+        nombre (str, optional): Nombre del archivo. Defaults to None.
+
+    Returns:
+        str: "xlsx", "xls" o None si no se reconoce.
+    """
+    if contenido[:4] == FIRMA_XLSX:
+        return "xlsx"
+    if contenido[:8] == FIRMA_XLS:
+        return "xls"
+
+    extension = os.path.splitext(nombre or "")[1].lower().lstrip(".")
+    if extension in ("xlsx", "xlsm"):
+        return "xlsx"
+    if extension == "xls":
+        return "xls"
+    return None
+
+def seleccionar_motores(contenido, nombre=None):
+    """
+    Elige el orden de los motores según el tipo y el tamaño del archivo.
+
+    Los .xls se leen con xlrd y, como respaldo, con calamine. Para xlsx se usa
+    openpyxl en archivos pequeños (máxima compatibilidad) y calamine a partir
+    de UMBRAL_MOTOR_RAPIDO bytes. Solo se devuelven motores instalados.
+
+    Args:
+        contenido (bytes): Contenido del archivo.
+        nombre (str, optional): Nombre del archivo. Defaults to None.
+
+    Returns:
+        list: Motores en orden de preferencia. Si la lista queda vacía se
+            devuelve [None] para que pandas elija su motor por defecto.
+    """
+    formato = detectar_formato(contenido, nombre)
+
+    if formato == "xls":
+        orden = ["xlrd", "calamine"]
+    elif len(contenido) >= UMBRAL_MOTOR_RAPIDO:
+        orden = ["calamine", "openpyxl"]
+    else:
+        orden = ["openpyxl", "calamine"]
+
+    motores = [motor for motor in orden if motor_disponible(motor)]
+    return motores or [None]
+
+def comparar_motores(archivo, hoja=None, repeticiones=1):
+    """
+    Mide el tiempo de lectura de una hoja con cada motor disponible.
+
+    Args:
+        archivo: Archivo Excel cargado por el usuario o LibroExcel ya abierto.
+        hoja (str, optional): Hoja a leer. Si es None, 'OPERATIVOS' o la primera.
+        repeticiones (int, optional): Lecturas por motor; se informa la mejor.
+            Defaults to 1.
+
+    Returns:
+        pandas.DataFrame: Una fila por motor con las columnas MOTOR, SEGUNDOS,
+            FILAS, COLUMNAS y ERROR, ordenada del más rápido al más lento.
+    """
+    from ingestion.workbook import abrir_libro
+
+    libro = abrir_libro(archivo)
+    formato = detectar_formato(libro.contenido, libro.nombre)
+    resultados = []
+
+    for motor, info in MOTORES_EXCEL.items():
+        if formato not in info["formatos"] or not motor_disponible(motor):
+            continue
+
+        mejor = None
+        filas = columnas = None
+        error = ""
+        try:
+            for _ in range(max(1, repeticiones)):
+                inicio = time.perf_counter()
+                excel = pd.ExcelFile(io.BytesIO(libro.contenido), engine=motor)
+                nombre_hoja = hoja
+                if nombre_hoja is None:
+                    nombre_hoja = 'OPERATIVOS' if 'OPERATIVOS' in excel.sheet_names else excel.sheet_names[0]
+                df = excel.parse(sheet_name=nombre_hoja)
+                transcurrido = time.perf_counter() - inicio
+                mejor = transcurrido if mejor is None else min(mejor, transcurrido)
+                filas, columnas = df.shape
+        except Exception as e:
+            error = str(e)
+
+        resultados.append({
+            "MOTOR": motor,
+            "SEGUNDOS": round(mejor, 4) if mejor is not None else None,
+            "FILAS": filas,
+            "COLUMNAS": columnas,
+            "ERROR": error
+        })
+
+    return pd.DataFrame(resultados, columns=["MOTOR", "SEGUNDOS", "FILAS", "COLUMNAS", "ERROR"]).sort_values(
+        "SEGUNDOS", na_position="last"
+    ).reset_index(drop=True)
@@ -0,0 +1,183 @@
+"""
+Ingesta incremental de libros xlsx que se vuelven a subir con pocos cambios.
+
+Cada hoja de un xlsx es un miembro del zip con su propio CRC y tamaño. Al
+leer un mes se guarda, por nombre de archivo, la huella de cada hoja diaria
+junto con su DataFrame ya formateado; en la siguiente subida solo se vuelven
+a analizar las hojas cuya huella cambió.
+
+Una hoja sin cambios sigue siendo válida mientras no cambien los estilos
+(formatos de fecha) ni las cadenas compartidas que referencia: si la tabla
+de cadenas cambió, se compara el tramo inicial que cubre el mayor índice
+usado por la hoja.
+"""
+
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+
+from config import MAX_LIBROS_INCREMENTALES
+
+# Referencias a cadenas compartidas dentro del XML de una hoja
+_REFERENCIA_CADENA = re.compile(rb'<c\b[^>]*?\bt="s"[^>]*>\s*<v>(\d+)</v>')
+
+RUTA_ESTILOS = 'xl/styles.xml'
+RUTA_CADENAS = 'xl/sharedStrings.xml'
+
+# Estado por (nombre de archivo, columnas leídas), del menos al más usado recientemente
+_estados = OrderedDict()
+_bloqueo = threading.Lock()
+
+def huella_miembro(archivo_zip, ruta):
+    """
+    Obtiene la huella de un miembro del zip sin descomprimirlo.
+
+    Args:
+        archivo_zip (zipfile.ZipFile): Libro xlsx abierto.
+        ruta (str): Ruta del miembro.
+
+    Returns:
+        tuple: (crc, tamaño) del miembro, o None si no existe.
+    """
+    try:
+        info = archivo_zip.getinfo(ruta)
+    except KeyError:
+        return None
+    return info.CRC, info.file_size
+
+def max_indice_cadena(archivo_zip, ruta):
+    """
+    Obtiene el mayor índice de cadena compartida que usa una hoja.
+
+    Args:
+        archivo_zip (zipfile.ZipFile): Libro xlsx abierto.
+        ruta (str): Ruta del XML de la hoja.
+
+    Returns:
+        int: Mayor índice referenciado, o -1 si la hoja no usa cadenas compartidas.
+    """
+    xml = archivo_zip.read(ruta)
+    return max((int(m) for m in _REFERENCIA_CADENA.findall(xml)), default=-1)
+
+def hash_cadenas(cadenas, hasta):
+    """
+    Calcula el hash del tramo inicial de la tabla de cadenas compartidas.
+
+    Args:
+        cadenas (list): Tabla de cadenas compartidas.
+        hasta (int): Último índice incluido (-1 para un tramo vacío).
+
+    Returns:
+        str: Hash hexadecimal del tramo, o None si la tabla es más corta.
+    """
+    if hasta >= len(cadenas):
+        return None
+    return hashlib.sha256("\x00".join(cadenas[:hasta + 1]).encode()).hexdigest()
+
+def separar_hojas_sin_cambios(libro, hojas, columnas=None):
+    """
+    Separa las hojas que pueden reutilizarse de la subida anterior del mismo archivo.
+
+    Args:
+        libro (LibroExcel): Libro recién subido.
+        hojas (list): Hojas que se quieren leer.
+        columnas (tuple, optional): Columnas leídas de cada hoja (las hojas
+            leídas con otras columnas no se reutilizan). Defaults to None (todas).
+
+    Returns:
+        tuple: (reutilizadas, pendientes) - diccionario {hoja: DataFrame} con
+            las hojas sin cambios y lista de hojas que hay que analizar.
+    """
+    if not libro.es_xlsx or not libro.nombre:
+        return {}, list(hojas)
+
+    clave = (libro.nombre, columnas)
+    with _bloqueo:
+        estado = _estados.get(clave)
+        if estado is not None:
+            _estados.move_to_end(clave)
+    if estado is None:
+        return {}, list(hojas)
+
+    lector = libro.lector_streaming
+    archivo_zip = lector.zip
+    if huella_miembro(archivo_zip, RUTA_ESTILOS) != estado['estilos']:
+        return {}, list(hojas)
+
+    cadenas_iguales = huella_miembro(archivo_zip, RUTA_CADENAS) == estado['cadenas']
+    rutas = lector.rutas_hojas
+
+    reutilizadas = {}
+    pendientes = []
+    for hoja in hojas:
+        previo = estado['hojas'].get(hoja)
+        sin_cambios = (
+            previo is not None
+            and hoja in rutas
+            and huella_miembro(archivo_zip, rutas[hoja]) == previo['huella']
+            and (cadenas_iguales or hash_cadenas(lector.cadenas_compartidas, previo['max_cadena']) == previo['hash_cadenas'])
+        )
+        if sin_cambios:
+            reutilizadas[hoja] = previo['df']
+        else:
+            pendientes.append(hoja)
+
+    return reutilizadas, pendientes
+
+def recordar_hojas(libro, frames, columnas=None):
+    """
+    Guarda la huella y el DataFrame de las hojas leídas para la próxima subida.
+
+    Args:
+        libro (LibroExcel): Libro leído.
+        frames (dict): DataFrame formateado de cada hoja {hoja: DataFrame}.
+        columnas (tuple, optional): Columnas leídas de cada hoja. Defaults to None (todas).
+    """
+    if not libro.es_xlsx or not libro.nombre:
+        return
+
+    lector = libro.lector_streaming
+    archivo_zip = lector.zip
+    rutas = lector.rutas_hojas
+
+    clave = (libro.nombre, columnas)
+    with _bloqueo:
+        anterior = _estados.get(clave)
+
+    cadenas = huella_miembro(archivo_zip, RUTA_CADENAS)
+    cadenas_iguales = anterior is not None and anterior['cadenas'] == cadenas
+
+    hojas = {}
+    for hoja, df in frames.items():
+        if hoja not in rutas:
+            continue
+        huella = huella_miembro(archivo_zip, rutas[hoja])
+        previo = anterior['hojas'].get(hoja) if anterior is not None else None
+
+        if previo is not None and previo['huella'] == huella:
+            max_cadena = previo['max_cadena']
+        else:
+            max_cadena = max_indice_cadena(archivo_zip, rutas[hoja])
+
+        if previo is not None and previo['huella'] == huella and cadenas_iguales:
+            hash_tramo = previo['hash_cadenas']
+        else:
+            hash_tramo = hash_cadenas(lector.cadenas_compartidas, max_cadena)
+
+        hojas[hoja] = {'huella': huella, 'max_cadena': max_cadena, 'hash_cadenas': hash_tramo, 'df': df}
+
+    with _bloqueo:
+        _estados[clave] = {
+            'estilos': huella_miembro(archivo_zip, RUTA_ESTILOS),
+            'cadenas': cadenas,
+            'hojas': hojas
+        }
+        _estados.move_to_end(clave)
+        while len(_estados) > MAX_LIBROS_INCREMENTALES:
+            _estados.popitem(last=False)
+
+def olvidar_libros():
+    """Descarta el estado incremental de todos los archivos."""
+    with _bloqueo:
+        _estados.clear()
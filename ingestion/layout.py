@@ -0,0 +1,126 @@
+"""
+Lectura tolerante al diseño de las hojas operativas.
+
+Las planillas reales suelen tener filas de título por encima del encabezado
+y la UNIDAD combinada verticalmente en muchas filas, que pandas devuelve como
+NaN. Aquí se busca la fila de encabezado recorriendo solo las primeras filas
+de la hoja (en modo incremental en los xlsx) y las celdas combinadas se
+rellenan hacia abajo con una operación vectorizada por columna.
+"""
+
+import pandas as pd
+
+from config import FILAS_BUSQUEDA_ENCABEZADO, MIN_COLUMNAS_ENCABEZADO, COLUMNAS_COMBINADAS
+from ingestion.schema import resolver_columna, normalizar_columnas, selector_columnas
+
+def puntuar_encabezado(valores):
+    """
+    Cuenta las columnas esperadas distintas que reconoce una fila.
+
+    Args:
+        valores (iterable): Valores de la fila.
+
+    Returns:
+        int: Número de columnas esperadas encontradas.
+    """
+    return len({resolver_columna(v) for v in valores if not pd.isna(v)} - {None})
+
+def _primeras_filas(libro, hoja, max_filas):
+    """Recorre las primeras filas de una hoja sin leerla completa."""
+    if libro.es_xlsx:
+        yield from libro.lector_streaming.iterar_filas(hoja, max_filas=max_filas)
+        return
+
+    # Los .xls no admiten lectura incremental: se leen solo las primeras filas
+    muestra = libro.leer_hoja(hoja, header=None, nrows=max_filas)
+    for fila in muestra.itertuples(index=False):
+        yield list(fila)
+
+def detectar_fila_encabezado(libro, hoja, max_filas=FILAS_BUSQUEDA_ENCABEZADO, minimo=MIN_COLUMNAS_ENCABEZADO):
+    """
+    Busca la fila de encabezado entre las primeras filas de una hoja.
+
+    Se toma la primera fila que reconoce al menos `minimo` columnas esperadas;
+    en un libro sin filas de título es la primera y no se lee nada más.
+
+    Args:
+        libro (LibroExcel): Libro abierto.
+        hoja (str): Nombre de la hoja.
+        max_filas (int, optional): Filas iniciales que se examinan.
+        minimo (int, optional): Columnas esperadas que debe reconocer la fila.
+
+    Returns:
+        int: Índice (base 0) de la fila de encabezado, o 0 si ninguna fila
+            alcanza el mínimo (se conserva la lectura habitual).
+    """
+    try:
+        for numero, valores in enumerate(_primeras_filas(libro, hoja, max_filas)):
+            if puntuar_encabezado(valores) >= minimo:
+                return numero
+    except Exception as e:
+        print(f"Advertencia: no se pudo buscar el encabezado de la hoja '{hoja}' ({str(e)}). Se usará la primera fila.")
+    return 0
+
+def encabezado_hoja(libro, hoja):
+    """
+    Obtiene los encabezados de una hoja sin leer sus datos.
+
+    Args:
+        libro (LibroExcel): Libro abierto.
+        hoja (str): Nombre de la hoja.
+
+    Returns:
+        list: Valores no vacíos de la fila de encabezado.
+    """
+    fila_encabezado = detectar_fila_encabezado(libro, hoja)
+    for numero, valores in enumerate(_primeras_filas(libro, hoja, fila_encabezado + 1)):
+        if numero == fila_encabezado:
+            return [v for v in valores if not pd.isna(v)]
+    return []
+
+def rellenar_celdas_combinadas(df, columnas=None, anteriores=None):
+    """
+    Descarta las filas vacías y rellena hacia abajo las columnas combinadas.
+
+    Args:
+        df (pandas.DataFrame): Datos con las columnas ya normalizadas.
+        columnas (list, optional): Columnas a rellenar. Defaults to COLUMNAS_COMBINADAS.
+        anteriores (dict, optional): Último valor de cada columna en el bloque
+            previo, para continuar el relleno al leer por bloques.
+
+    Returns:
+        pandas.DataFrame: Datos sin filas vacías y con las celdas combinadas completas.
+    """
+    columnas = COLUMNAS_COMBINADAS if columnas is None else columnas
+    df = df.dropna(how="all")
+
+    presentes = [col for col in columnas if col in df.columns]
+    if presentes and not df.empty:
+        rellenas = df[presentes].ffill()
+        if anteriores:
+            rellenas = rellenas.fillna({col: v for col, v in anteriores.items() if col in presentes})
+        df = df.assign(**{col: rellenas[col] for col in presentes})
+    return df
+
+def leer_hoja_tolerante(libro, hoja, columnas=None):
+    """
+    Lee una hoja detectando su encabezado y completando las celdas combinadas.
+
+    Args:
+        libro (LibroExcel): Libro abierto.
+        hoja (str): Nombre de la hoja.
+        columnas (tuple, optional): Columnas esperadas a leer; el resto no se
+            analiza. Defaults to None (todas).
+
+    Returns:
+        pandas.DataFrame: Datos con las columnas normalizadas, sin formatear.
+    """
+    opciones = {}
+    if columnas is not None:
+        opciones['usecols'] = selector_columnas(tuple(columnas))
+    # Sin filas de título se reutiliza la lectura habitual (y su caché)
+    fila_encabezado = detectar_fila_encabezado(libro, hoja)
+    if fila_encabezado:
+        opciones['header'] = fila_encabezado
+    df = libro.leer_hoja(hoja, **opciones)
+    return rellenar_celdas_combinadas(normalizar_columnas(df))
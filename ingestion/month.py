@@ -0,0 +1,207 @@
+"""
+Ingesta de un mes completo: lee en paralelo las hojas diarias "01".."31".
+"""
+
+import calendar
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+
+from config import MESES, MAX_PROCESOS_INGESTA
+from ingestion.workbook import LibroExcel, HOJAS_DIA, abrir_libro
+from ingestion.incremental import separar_hojas_sin_cambios, recordar_hojas
+
+# Libro abierto en cada proceso trabajador (se abre una vez por proceso)
+_libro_trabajador = None
+
+def _inicializar_trabajador(contenido, nombre):
+    """
+    Abre el libro en el proceso trabajador a partir de sus bytes.
+
+    Args:
+        contenido (bytes): Contenido del archivo Excel.
+        nombre (str): Nombre original del archivo.
+    """
+    global _libro_trabajador
+    _libro_trabajador = LibroExcel(contenido, nombre=nombre)
+
+def _leer_hoja_dia(hoja, libro=None, columnas=None):
+    """
+    Lee y formatea una hoja diaria.
+
+    Args:
+        hoja (str): Nombre de la hoja ("01".."31").
+        libro (LibroExcel, optional): Libro a usar. Si es None, se usa el
+            libro del proceso trabajador. Defaults to None.
+        columnas (tuple, optional): Columnas esperadas a leer. Defaults to None (todas).
+
+    Returns:
+        tuple: (hoja, DataFrame, mensaje_error)
+    """
+    from utils import leer_excel
+
+    df, es_valido, mensaje_error = leer_excel(libro or _libro_trabajador, hoja, columnas)
+    return hoja, df if es_valido else None, mensaje_error
+
+def numero_mes(mes):
+    """
+    Convierte un mes (nombre en español o número) a su número 1-12.
+
+    Args:
+        mes (str | int): Mes seleccionado, por ejemplo "Marzo" o 3.
+
+    Returns:
+        int: Número del mes.
+
+    Raises:
+        ValueError: Si el mes no es válido.
+    """
+    if isinstance(mes, str) and not mes.strip().isdigit():
+        meses_normalizados = [m.upper() for m in MESES]
+        if mes.strip().upper() not in meses_normalizados:
+            raise ValueError(f"Mes no válido: {mes}")
+        return meses_normalizados.index(mes.strip().upper()) + 1
+
+    numero = int(mes)
+    if not 1 <= numero <= 12:
+        raise ValueError(f"Mes no válido: {mes}")
+    return numero
+
+def hojas_del_mes(hojas_disponibles, mes, año):
+    """
+    Obtiene las hojas diarias presentes en el libro que existen en el mes.
+
+    Args:
+        hojas_disponibles (list): Hojas del libro.
+        mes (int): Número del mes (1-12).
+        año (int): Año.
+
+    Returns:
+        list: Hojas diarias a leer, ordenadas por día.
+    """
+    dias_mes = calendar.monthrange(int(año), mes)[1]
+    return [hoja for hoja in HOJAS_DIA[:dias_mes] if hoja in hojas_disponibles]
+
+def _leer_hojas_secuencial(libro, hojas, progreso, columnas=None, completadas=0, total=None):
+    """Lee las hojas una a una en el proceso actual (el avance sigue desde completadas)."""
+    total = completadas + len(hojas) if total is None else total
+    for i, hoja in enumerate(hojas, start=completadas + 1):
+        resultado = _leer_hoja_dia(hoja, libro, columnas)
+        if progreso:
+            progreso(hoja, i, total)
+        yield resultado
+
+def _leer_hojas_en_paralelo(libro, hojas, progreso, max_procesos, columnas=None):
+    """
+    Lee las hojas en un pool de procesos, informando el avance por hoja.
+
+    Si el pool no puede crearse o falla a mitad de la lectura (por ejemplo,
+    en entornos sin soporte de multiprocesamiento o si un proceso muere), se
+    conservan las hojas ya leídas y solo las restantes se leen de forma
+    secuencial, sin reiniciar el avance.
+    """
+    if len(hojas) <= 1 or max_procesos == 1:
+        yield from _leer_hojas_secuencial(libro, hojas, progreso, columnas)
+        return
+
+    resultados = {}
+    futuros = {}
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_procesos,
+            initializer=_inicializar_trabajador,
+            initargs=(libro.contenido, libro.nombre)
+        ) as pool:
+            futuros = {pool.submit(_leer_hoja_dia, hoja, None, columnas): hoja for hoja in hojas}
+            for futuro in as_completed(futuros):
+                resultado = futuro.result()
+                resultados[resultado[0]] = resultado
+                if progreso:
+                    progreso(resultado[0], len(resultados), len(hojas))
+    except Exception as e:
+        # Al cerrar el pool terminan las hojas en curso: se aprovechan las que no fallaron
+        for futuro, hoja in futuros.items():
+            if hoja not in resultados and futuro.done() and not futuro.cancelled() and futuro.exception() is None:
+                resultados[hoja] = futuro.result()
+                if progreso:
+                    progreso(hoja, len(resultados), len(hojas))
+
+        faltantes = [hoja for hoja in hojas if hoja not in resultados]
+        print(f"Advertencia: no se pudo leer en paralelo ({str(e)}). Se leerán de forma secuencial {len(faltantes)} de {len(hojas)} hojas.")
+        yield from resultados.values()
+        yield from _leer_hojas_secuencial(libro, faltantes, progreso, columnas, len(resultados), len(hojas))
+        return
+
+    yield from resultados.values()
+
+def leer_mes_excel(archivo, mes, año, progreso=None, max_procesos=MAX_PROCESOS_INGESTA, columnas=None):
+    """
+    Lee todas las hojas diarias de un libro y las une en un único DataFrame.
+
+    Cada hoja se analiza en un proceso distinto; el resultado incluye la
+    columna DIA (día de la hoja) y la columna FECHA construida con el mes y
+    año seleccionados. Si el mismo archivo ya se leyó, solo se analizan las
+    hojas que cambiaron desde entonces (ver ingestion.incremental).
+
+    Args:
+        archivo: Archivo Excel cargado por el usuario o LibroExcel ya abierto.
+        mes (str | int): Mes al que corresponden los datos.
+        año (int): Año al que corresponden los datos.
+        progreso (callable, optional): Función llamada como
+            progreso(hoja, completadas, total) al terminar cada hoja.
+        max_procesos (int, optional): Número máximo de procesos.
+        columnas (tuple, optional): Columnas esperadas a leer de cada hoja;
+            el resto no se analiza. Defaults to None (todas).
+
+    Returns:
+        tuple: (DataFrame, bool, str) - (datos, es_valido, mensaje_error)
+    """
+    try:
+        libro = abrir_libro(archivo)
+        numero = numero_mes(mes)
+        hojas = hojas_del_mes(libro.hojas, numero, año)
+
+        if not hojas:
+            return None, False, f"El archivo Excel no contiene hojas diarias (01-31) para {MESES[numero - 1]} {año}"
+
+        # Hojas sin cambios desde la subida anterior del mismo archivo
+        leidas, pendientes = separar_hojas_sin_cambios(libro, hojas, columnas)
+        total = len(hojas)
+        if progreso:
+            for i, hoja in enumerate(leidas, start=1):
+                progreso(hoja, i, total)
+
+        def progreso_pendientes(hoja, completadas, _):
+            progreso(hoja, len(leidas) + completadas, total)
+
+        errores = []
+        for hoja, df, mensaje_error in _leer_hojas_en_paralelo(
+            libro, pendientes, progreso_pendientes if progreso else None, max_procesos, columnas
+        ):
+            if df is None:
+                errores.append(f"{hoja} ({mensaje_error})")
+            else:
+                leidas[hoja] = df
+
+        if errores:
+            return None, False, f"No se pudieron leer las hojas: {', '.join(errores)}"
+
+        recordar_hojas(libro, leidas, columnas)
+        frames = {hoja: df for hoja, df in leidas.items() if not df.empty}
+
+        if not frames:
+            return None, False, "Las hojas diarias del archivo Excel no contienen datos"
+
+        # Unir las hojas en orden de día
+        df_mes = pd.concat([frames[hoja] for hoja in hojas if hoja in frames], ignore_index=True)
+
+        # Construir la fecha completa a partir del día de cada hoja
+        df_mes['FECHA'] = pd.to_datetime(pd.DataFrame({
+            'year': int(año),
+            'month': numero,
+            'day': df_mes['DIA']
+        }))
+
+        return df_mes, True, ""
+
+    except Exception as e:
+        return None, False, f"Error al procesar el mes completo: {str(e)}"
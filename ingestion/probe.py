@@ -0,0 +1,239 @@
+"""
+Sondeo rápido de libros xlsx antes de cualquier análisis completo.
+
+Lee solo xl/workbook.xml y, de cada hoja relevante, el elemento <dimension>
+y las primeras filas, directamente del zip; entre ellas se busca la fila de
+encabezado igual que en la lectura completa (saltando las filas de título).
+Las cadenas compartidas se recorren únicamente hasta el mayor índice usado
+por esas filas. Con eso
+se conocen las hojas, el esquema de cada una y una estimación de sus filas
+en pocos milisegundos, y se rechazan archivos dañados sin cargarlos.
+"""
+
+import io
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+from config import EXCEL_SHEETS, FILAS_BUSQUEDA_ENCABEZADO, MIN_COLUMNAS_ENCABEZADO
+from ingestion.engines import detectar_formato
+from ingestion.layout import puntuar_encabezado
+from ingestion.schema import diferencias_esquema
+from ingestion.xlsx_stream import NS_MAIN, indice_columna, leer_rutas_hojas, _texto_cadena
+
+# Prefijo de los mensajes de error (el mismo que al abrir el libro con pandas)
+PREFIJO_ERROR = "Error al leer las hojas del archivo Excel"
+
+# Bytes del XML que se analizan en cada paso (el encabezado suele estar en el primero)
+TAMAÑO_PASO = 4096
+
+# Última fila del rango de <dimension ref="A1:T74">
+_FILA_FINAL = re.compile(r"[A-Z]+(\d+)$")
+
+def _filas_dimension(referencia, fila_encabezado=None):
+    """
+    Estima las filas de datos a partir del rango de <dimension>.
+
+    Args:
+        referencia (str): Rango de la hoja, por ejemplo "A1:T74".
+        fila_encabezado (int, optional): Número (base 1) de la fila de
+            encabezado. Defaults to None (la primera fila del rango).
+
+    Returns:
+        int: Filas por debajo del encabezado, o None si el rango no es válido.
+    """
+    if not referencia or ":" not in referencia:
+        return None
+    inicio, fin = referencia.split(":", 1)
+    fila_inicio, fila_fin = _FILA_FINAL.search(inicio), _FILA_FINAL.search(fin)
+    if not fila_inicio or not fila_fin:
+        return None
+    if fila_encabezado is None:
+        fila_encabezado = int(fila_inicio.group(1))
+    return max(int(fila_fin.group(1)) - fila_encabezado, 0)
+
+def _sondear_hoja(archivo_zip, ruta, max_filas=FILAS_BUSQUEDA_ENCABEZADO):
+    """
+    Lee la dimensión y las primeras filas de una hoja, y se detiene.
+
+    Args:
+        archivo_zip (zipfile.ZipFile): Libro abierto.
+        ruta (str): Ruta del XML de la hoja dentro del zip.
+        max_filas (int, optional): Filas iniciales que se leen.
+
+    Returns:
+        tuple: (filas, referencia) donde filas es una lista de
+            (numero_fila, celdas) con las filas que tienen datos, celdas es una
+            lista de (indice_columna, tipo, valor) con las cadenas compartidas
+            como índices por resolver, y referencia es el rango de <dimension>.
+    """
+    referencia = None
+    filas = []
+    leidas = 0
+    # El XML se descomprime y analiza por pasos pequeños, y se abandona en
+    # cuanto se completan las filas donde se busca el encabezado
+    analizador = ET.XMLPullParser(events=("end",))
+    with archivo_zip.open(ruta) as xml:
+        while leidas < max_filas:
+            bloque = xml.read(TAMAÑO_PASO)
+            if not bloque:
+                break
+            analizador.feed(bloque)
+            for _, elemento in analizador.read_events():
+                if elemento.tag == NS_MAIN + "dimension":
+                    referencia = elemento.get("ref")
+                elif elemento.tag == NS_MAIN + "row":
+                    leidas += 1
+                    celdas = _celdas_fila(elemento)
+                    if celdas:
+                        numero = elemento.get("r")
+                        filas.append((int(numero) if numero else leidas, celdas))
+                    elemento.clear()
+                    if leidas >= max_filas:
+                        break
+    return filas, referencia
+
+def _elegir_encabezado(filas):
+    """
+    Elige la fila de encabezado con el mismo criterio que layout.detectar_fila_encabezado.
+
+    Args:
+        filas (list): Lista de (numero_fila, nombres) de las filas con datos.
+
+    Returns:
+        tuple: (numero_fila, nombres) de la primera fila que reconoce al menos
+            MIN_COLUMNAS_ENCABEZADO columnas esperadas, o de la primera fila con
+            datos si ninguna lo alcanza ((None, []) si la hoja está vacía).
+    """
+    for numero, nombres in filas:
+        if puntuar_encabezado(n for n in nombres if n is not None) >= MIN_COLUMNAS_ENCABEZADO:
+            return numero, nombres
+    return filas[0] if filas else (None, [])
+
+def _celdas_fila(fila):
+    """Obtiene las celdas con valor de una fila como (indice_columna, tipo, valor)."""
+    celdas = []
+    for posicion, celda in enumerate(fila.iter(NS_MAIN + "c")):
+        referencia = celda.get("r")
+        indice = indice_columna(referencia) if referencia else posicion
+        tipo = celda.get("t")
+        if tipo == "inlineStr":
+            contenido = celda.find(NS_MAIN + "is")
+            valor = _texto_cadena(contenido) if contenido is not None else None
+        else:
+            v = celda.find(NS_MAIN + "v")
+            valor = v.text if v is not None else None
+        if valor not in (None, ""):
+            celdas.append((indice, tipo, valor))
+    return celdas
+
+def _leer_cadenas_hasta(archivo_zip, indices):
+    """Lee de la tabla de cadenas compartidas solo hasta el mayor índice pedido."""
+    if not indices or "xl/sharedStrings.xml" not in archivo_zip.namelist():
+        return {}
+
+    maximo = max(indices)
+    cadenas = {}
+    with archivo_zip.open("xl/sharedStrings.xml") as xml:
+        posicion = 0
+        for _, elemento in ET.iterparse(xml):
+            if elemento.tag != NS_MAIN + "si":
+                continue
+            if posicion in indices:
+                cadenas[posicion] = _texto_cadena(elemento)
+            elemento.clear()
+            posicion += 1
+            if posicion > maximo:
+                break
+    return cadenas
+
+def sondear_contenido(contenido, hojas_relevantes=None):
+    """
+    Sondea un libro xlsx a partir de sus bytes.
+
+    Args:
+        contenido (bytes): Contenido del archivo xlsx.
+        hojas_relevantes (iterable, optional): Hojas cuyo encabezado se lee.
+            Defaults to EXCEL_SHEETS.
+
+    Returns:
+        dict: 'hojas' (todas, en orden), 'encabezados' ({hoja: [nombres]}),
+            'faltantes' ({hoja: columnas esperadas ausentes}) y
+            'filas_estimadas' ({hoja: filas por debajo del encabezado según
+            <dimension>, o None}).
+
+    Raises:
+        zipfile.BadZipFile, KeyError, ET.ParseError: Si el libro está dañado.
+    """
+    hojas_relevantes = EXCEL_SHEETS if hojas_relevantes is None else hojas_relevantes
+
+    with zipfile.ZipFile(io.BytesIO(contenido)) as archivo_zip:
+        rutas = leer_rutas_hojas(archivo_zip)
+        filas_por_hoja = {}
+        referencias = {}
+        for hoja in rutas:
+            if hoja in hojas_relevantes:
+                filas_por_hoja[hoja], referencias[hoja] = _sondear_hoja(archivo_zip, rutas[hoja])
+
+        indices = {
+            int(valor)
+            for filas in filas_por_hoja.values()
+            for _, celdas in filas
+            for _, tipo, valor in celdas
+            if tipo == "s"
+        }
+        cadenas = _leer_cadenas_hasta(archivo_zip, indices)
+
+    encabezados = {}
+    faltantes = {}
+    filas_estimadas = {}
+    for hoja, filas in filas_por_hoja.items():
+        filas_nombres = []
+        for numero, celdas in filas:
+            nombres = [None] * (max(indice for indice, _, _ in celdas) + 1)
+            for indice, tipo, valor in celdas:
+                nombres[indice] = cadenas.get(int(valor), "") if tipo == "s" else valor
+            filas_nombres.append((numero, nombres))
+
+        fila_encabezado, nombres = _elegir_encabezado(filas_nombres)
+        encabezados[hoja] = nombres
+        faltantes[hoja], _ = diferencias_esquema([n for n in nombres if n is not None])
+        filas_estimadas[hoja] = _filas_dimension(referencias[hoja], fila_encabezado)
+
+    return {
+        "hojas": list(rutas),
+        "encabezados": encabezados,
+        "faltantes": faltantes,
+        "filas_estimadas": filas_estimadas
+    }
+
+def sondear_libro(libro, hojas_relevantes=None):
+    """
+    Valida un libro sin cargarlo y obtiene sus metadatos.
+
+    Los .xls (formato binario) no se pueden sondear: se devuelve None como
+    sondeo y el llamador recurre a la lectura con pandas.
+
+    Args:
+        libro (LibroExcel): Libro subido.
+        hojas_relevantes (iterable, optional): Hojas cuyo encabezado se lee.
+            Defaults to EXCEL_SHEETS.
+
+    Returns:
+        tuple: (dict, bool, str) - (sondeo, es_valido, mensaje_error)
+    """
+    formato = detectar_formato(libro.contenido, libro.nombre)
+    if formato == "xls":
+        return None, True, ""
+    if formato is None:
+        return None, False, f"{PREFIJO_ERROR}: el archivo no es un libro Excel válido"
+
+    try:
+        sondeo = sondear_contenido(libro.contenido, hojas_relevantes)
+    except (zipfile.BadZipFile, KeyError, ET.ParseError, ValueError) as e:
+        return None, False, f"{PREFIJO_ERROR}: {str(e)}"
+
+    if not sondeo["hojas"]:
+        return None, False, "El archivo Excel no contiene hojas"
+
+    return sondeo, True, ""
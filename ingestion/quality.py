@@ -0,0 +1,130 @@
+"""
+Validación de calidad fila a fila, vectorizada.
+
+Cada regla es una operación sobre columnas completas que devuelve un arreglo
+booleano con las filas que la incumplen. Todas las reglas se evalúan en una
+pasada sobre los arreglos numpy del DataFrame (sin recorrer filas), por lo
+que el costo es lineal y apto para cargas de varios meses.
+"""
+
+import numpy as np
+import pandas as pd
+
+from config import NUMERIC_COLUMNS, COLUMNAS_HORA, COMPONENTES_PPSS_TOTAL, COLUMNA_DUPLICADO
+
+# Conteos de recursos: columnas numéricas que no son horas ni porcentajes
+COLUMNAS_CONTEO = [col for col in NUMERIC_COLUMNS if col not in COLUMNAS_HORA and col != "PORCENTAJE"]
+
+# Columnas del resumen de calidad
+COLUMNAS_INFORME = ["REGLA", "DESCRIPCION", "FILAS AFECTADAS"]
+
+def _enteros(df, columnas):
+    """Matriz int64 (filas x columnas) de los conteos; los tipos pequeños se amplían antes de operar."""
+    return np.column_stack([
+        df[col].to_numpy(dtype="int64", na_value=0) if pd.api.types.is_numeric_dtype(df[col])
+        else pd.to_numeric(df[col], errors="coerce").fillna(0).to_numpy(dtype="int64")
+        for col in columnas
+    ])
+
+def _total_personal_distinto(df):
+    """PP.SS TOTAL no coincide con la suma de sus componentes."""
+    componentes = [col for col in COMPONENTES_PPSS_TOTAL if col in df.columns]
+    total = _enteros(df, ["PP.SS TOTAL"])[:, 0]
+    return _enteros(df, componentes).sum(axis=1) != total
+
+def _hora_invalida(columna):
+    """Crea la regla de hora vacía o fuera de rango para una columna de hora."""
+    def regla(df):
+        minutos = pd.to_numeric(df[columna], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        return ~((minutos >= 0) & (minutos < 1440))
+    return regla
+
+def _conteo_negativo(df):
+    """Algún conteo de recursos es negativo."""
+    columnas = [col for col in COLUMNAS_CONTEO if col in df.columns]
+    return (_enteros(df, columnas) < 0).any(axis=1)
+
+def _unidad_vacia(df):
+    """La UNIDAD falta o está en blanco."""
+    # Se evalúa una vez por valor distinto y se expande por código
+    codigos, unicos = pd.factorize(df["UNIDAD"])
+    en_blanco = pd.Index(unicos).astype(str).str.strip() == ""
+    return np.append(en_blanco, True)[codigos]
+
+def _duplicada(df):
+    """La fila repite un operativo ya cargado (marcada por ingestion.dedup)."""
+    return df[COLUMNA_DUPLICADO].to_numpy(dtype=bool, na_value=False)
+
+# Reglas de calidad: nombre, descripción, columnas necesarias y función de evaluación
+REGLAS_CALIDAD = [
+    {
+        "nombre": "TOTAL PERSONAL",
+        "descripcion": "PP.SS TOTAL no coincide con la suma de motos, hipo, PP.SS en móvil, a pie, choque y GEO",
+        "columnas": ["PP.SS TOTAL"],
+        "evaluar": _total_personal_distinto
+    },
+    {
+        "nombre": "HORA INICIO",
+        "descripcion": "Hora de inicio vacía o con formato no válido",
+        "columnas": ["HORA INICIO"],
+        "evaluar": _hora_invalida("HORA INICIO")
+    },
+    {
+        "nombre": "HORA FIN",
+        "descripcion": "Hora de fin vacía o con formato no válido",
+        "columnas": ["HORA FIN"],
+        "evaluar": _hora_invalida("HORA FIN")
+    },
+    {
+        "nombre": "CONTEOS NEGATIVOS",
+        "descripcion": "Algún conteo de recursos (móviles, motos, personal, etc.) es negativo",
+        "columnas": [],
+        "evaluar": _conteo_negativo
+    },
+    {
+        "nombre": "UNIDAD VACIA",
+        "descripcion": "La fila no indica la unidad",
+        "columnas": ["UNIDAD"],
+        "evaluar": _unidad_vacia
+    },
+    {
+        "nombre": "DUPLICADO",
+        "descripcion": "Repite unidad, orden, operativo, horario, fecha y recursos de otra fila o de una carga anterior",
+        "columnas": [COLUMNA_DUPLICADO],
+        "evaluar": _duplicada
+    }
+]
+
+def evaluar_reglas(df, reglas=None):
+    """
+    Evalúa las reglas de calidad sobre todas las filas del DataFrame.
+
+    Las reglas cuyas columnas no están en el DataFrame se omiten.
+
+    Args:
+        df (pandas.DataFrame): Datos formateados (o compactos).
+        reglas (list, optional): Reglas a evaluar. Defaults to REGLAS_CALIDAD.
+
+    Returns:
+        tuple: (resumen, filas) - DataFrame con REGLA, DESCRIPCION y FILAS
+            AFECTADAS (más una fila final con las filas que incumplen alguna
+            regla) y diccionario {regla: índice de las filas que la incumplen}.
+    """
+    reglas = REGLAS_CALIDAD if reglas is None else reglas
+    aplicables = [r for r in reglas if all(col in df.columns for col in r["columnas"])]
+
+    if not aplicables or df.empty:
+        return pd.DataFrame(columns=COLUMNAS_INFORME), {}
+
+    # Matriz de incumplimientos (reglas x filas), evaluada en una sola pasada
+    incumplimientos = np.vstack([np.asarray(r["evaluar"](df), dtype=bool) for r in aplicables])
+    conteos = incumplimientos.sum(axis=1)
+    alguna = incumplimientos.any(axis=0)
+
+    filas = {r["nombre"]: df.index[fila] for r, fila in zip(aplicables, incumplimientos)}
+    resumen = pd.DataFrame({
+        "REGLA": [r["nombre"] for r in aplicables] + ["ALGUNA REGLA"],
+        "DESCRIPCION": [r["descripcion"] for r in aplicables] + ["Filas que incumplen al menos una regla"],
+        "FILAS AFECTADAS": np.append(conteos, alguna.sum()).astype("int64")
+    })
+    return resumen, filas
@@ -0,0 +1,182 @@
+"""
+Registro del esquema de columnas y resolución de encabezados.
+
+El índice de nombres normalizados se compila una sola vez al importar el
+módulo; la resolución de cada tupla de encabezados distinta se memoriza, de
+modo que las hojas diarias con el mismo encabezado se resuelven al instante.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+from config import EXPECTED_COLUMNS, ALIAS_COLUMNAS, COLUMNAS_POR_MODO, COLUMNAS_VISTA_PREVIA, COLUMNAS_MATRICULA
+
+_ESPACIOS = re.compile(r"\s+")
+_ESPACIOS_PUNTO = re.compile(r"\s*\.\s*")
+
+def normalizar_encabezado(texto):
+    """
+    Normaliza un nombre de columna para compararlo con el esquema.
+
+    Quita acentos y diacríticos (cualquier carácter Unicode, no solo Ó/Á),
+    unifica espacios (incluidos los no separables), elimina los espacios
+    alrededor de los puntos y pasa a mayúsculas.
+
+    Args:
+        texto: Nombre de columna (se convierte a texto si no lo es).
+
+    Returns:
+        str: Nombre normalizado, por ejemplo "MÓVILES " -> "MOVILES".
+    """
+    if not isinstance(texto, str):
+        texto = str(texto)
+
+    texto = unicodedata.normalize("NFKD", texto)
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    texto = _ESPACIOS.sub(" ", texto).strip()
+    texto = _ESPACIOS_PUNTO.sub(".", texto)
+    return texto.upper()
+
+def _compilar_indice():
+    """Construye el índice {nombre_normalizado: columna_esperada}."""
+    indice = {normalizar_encabezado(col): col for col in EXPECTED_COLUMNS}
+    for alias, columna in ALIAS_COLUMNAS.items():
+        indice.setdefault(normalizar_encabezado(alias), columna)
+    return indice
+
+# Índice compilado al importar: búsqueda O(1) por nombre normalizado
+INDICE_ESQUEMA = _compilar_indice()
+
+# Columnas esperadas en su forma normalizada
+COLUMNAS_NORMALIZADAS = frozenset(normalizar_encabezado(col) for col in EXPECTED_COLUMNS)
+
+def resolver_columna(nombre):
+    """
+    Obtiene la columna esperada que corresponde a un encabezado.
+
+    Args:
+        nombre: Encabezado leído del archivo.
+
+    Returns:
+        str: Nombre de la columna esperada, o None si no pertenece al esquema.
+    """
+    return INDICE_ESQUEMA.get(normalizar_encabezado(nombre))
+
+@lru_cache(maxsize=256)
+def resolver_encabezados(encabezados):
+    """
+    Resuelve una tupla de encabezados contra el esquema (resultado memorizado).
+
+    Si dos encabezados corresponden a la misma columna esperada, solo se
+    renombra el primero para no generar columnas duplicadas.
+
+    Args:
+        encabezados (tuple): Encabezados leídos del archivo, en orden.
+
+    Returns:
+        tuple: Pares (encabezado_original, columna_esperada) de los
+            encabezados reconocidos que necesitan renombrarse o ya coinciden.
+    """
+    usadas = set()
+    pares = []
+    for encabezado in encabezados:
+        columna = resolver_columna(encabezado)
+        if columna is not None and columna not in usadas:
+            usadas.add(columna)
+            pares.append((encabezado, columna))
+    return tuple(pares)
+
+def mapear_columnas(columnas):
+    """
+    Crea el mapeo de nombres de columna actuales a los nombres esperados.
+
+    Args:
+        columnas: Nombres de columna leídos del archivo.
+
+    Returns:
+        dict: Mapeo {nombre_actual: nombre_esperado}.
+    """
+    return dict(resolver_encabezados(tuple(columnas)))
+
+def normalizar_columnas(df):
+    """
+    Renombra las columnas de un DataFrame a los nombres del esquema.
+
+    Args:
+        df (pandas.DataFrame): Datos leídos del archivo.
+
+    Returns:
+        pandas.DataFrame: DataFrame con las columnas renombradas.
+    """
+    mapeo = {actual: esperada for actual, esperada in mapear_columnas(df.columns).items() if actual != esperada}
+    return df.rename(columns=mapeo) if mapeo else df
+
+def diferencias_esquema(columnas):
+    """
+    Compara los encabezados de un archivo con el esquema esperado.
+
+    Args:
+        columnas: Encabezados leídos del archivo.
+
+    Returns:
+        tuple: (faltantes, adicionales) - columnas esperadas que no están y
+            encabezados que no pertenecen al esquema (se ignoran las columnas
+            sin nombre que pandas genera para celdas vacías).
+    """
+    mapeo = mapear_columnas(columnas)
+    reconocidas = set(mapeo.values())
+    faltantes = [col for col in EXPECTED_COLUMNS if col not in reconocidas]
+    adicionales = [
+        str(col) for col in columnas
+        if col not in mapeo and not str(col).startswith("Unnamed:")
+    ]
+    return faltantes, adicionales
+
+def columnas_necesarias(modo=None, matriculas=False):
+    """
+    Obtiene las columnas esperadas que hay que leer para un modo de reporte.
+
+    Args:
+        modo (str, optional): Clave de COLUMNAS_POR_MODO. Si es None, se
+            leen todas las columnas.
+        matriculas (bool, optional): Si es True, se agregan las columnas de
+            COLUMNAS_MATRICULA (conflictos de matrículas). Defaults to False.
+
+    Returns:
+        tuple: Columnas del modo y de la vista previa, en el orden de
+            EXPECTED_COLUMNS, o None si se leen todas.
+
+    Raises:
+        ValueError: Si el modo no existe.
+    """
+    if modo is None:
+        return None
+    if modo not in COLUMNAS_POR_MODO:
+        raise ValueError(f"Modo de reporte no válido: {modo}")
+    requeridas = set(COLUMNAS_POR_MODO[modo]) | set(COLUMNAS_VISTA_PREVIA)
+    if matriculas:
+        requeridas |= set(COLUMNAS_MATRICULA)
+    return tuple(col for col in EXPECTED_COLUMNS if col in requeridas)
+
+@lru_cache(maxsize=32)
+def selector_columnas(columnas):
+    """
+    Crea el filtro de encabezados para leer solo algunas columnas.
+
+    La misma tupla devuelve siempre la misma función, de modo que las
+    lecturas memorizadas por sus opciones (usecols) se reutilizan.
+
+    Args:
+        columnas (tuple): Columnas esperadas a conservar.
+
+    Returns:
+        callable: Función que recibe un encabezado del archivo y devuelve
+            True si corresponde a una de las columnas (válida como usecols).
+    """
+    conjunto = frozenset(columnas)
+
+    def seleccionar(encabezado):
+        return resolver_columna(encabezado) in conjunto
+
+    return seleccionar
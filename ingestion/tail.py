@@ -0,0 +1,324 @@
+"""
+Ingesta incremental de archivos CSV que solo crecen al final.
+
+El sistema de planificación agrega filas a un CSV a lo largo del día. Tras
+cada lectura se guarda un punto de control: el desplazamiento (en bytes) del
+final del último registro completo, el encabezado y el hash de ese último
+registro. En la lectura siguiente, si el encabezado y el último registro
+siguen en su lugar, solo se analizan los bytes agregados y las filas nuevas
+se unen a los datos y totales ya calculados; si el archivo se reescribió,
+se vuelve a leer completo.
+
+Los límites de registro se buscan con numpy, respetando las comillas (un
+campo entre comillas puede contener saltos de línea). Si la última línea no
+termina en salto de línea, se toma como registro completo en una lectura
+completa o cuando el tamaño del archivo no cambió desde la consulta
+anterior; mientras el archivo sigue creciendo se deja para la próxima
+lectura.
+"""
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+from config import MAX_CSV_EN_CURSO, COLUMNAS_AGREGADOS, DIRECTORIO_CSV_EN_CURSO
+from ingestion.csv_reader import detectar_formato_csv, leer_tabla_csv, TAMAÑO_MUESTRA, EXTENSIONES_CSV
+from ingestion.schema import normalizar_columnas, selector_columnas
+from ingestion.compact import compactar_dataframe, densificar_dataframe
+
+# Estado por (ruta, columnas leídas), del menos al más usado recientemente
+_estados = OrderedDict()
+_bloqueo = threading.Lock()
+
+_COMILLA = ord('"')
+_SALTO = ord('\n')
+
+def limites_registros(contenido):
+    """
+    Obtiene el final de cada registro completo de un tramo de CSV.
+
+    El tramo debe empezar al comienzo de un registro. Un salto de línea
+    termina un registro solo si hay un número par de comillas antes de él
+    (las comillas escapadas "" cuentan dos veces y no cambian la paridad).
+
+    Args:
+        contenido (bytes): Tramo del archivo (UTF-8 o cp1252).
+
+    Returns:
+        numpy.ndarray: Posición de cada salto de línea que cierra un registro.
+    """
+    datos = np.frombuffer(contenido, dtype=np.uint8)
+    saltos = np.flatnonzero(datos == _SALTO)
+    if not len(saltos):
+        return saltos
+    comillas = np.cumsum(datos == _COMILLA)
+    return saltos[comillas[saltos] % 2 == 0]
+
+def _limites_hasta_el_final(contenido):
+    """
+    Obtiene los límites de registro tomando el final del tramo como fin del último.
+
+    El texto posterior al último salto de línea cuenta como registro si no
+    está vacío y no deja comillas abiertas.
+
+    Args:
+        contenido (bytes): Tramo del archivo, desde el comienzo de un registro.
+
+    Returns:
+        numpy.ndarray: Límites como en limites_registros; el del registro
+            final sin salto de línea es la posición de su último byte.
+    """
+    limites = limites_registros(contenido)
+    inicio_resto = int(limites[-1]) + 1 if len(limites) else 0
+    resto = contenido[inicio_resto:]
+    if resto.strip() and resto.count(b'"') % 2 == 0:
+        limites = np.append(limites, len(contenido) - 1)
+    return limites
+
+def _salto_inicial(contenido):
+    """Longitud del salto de línea (\\n o \\r\\n) con que empieza un tramo, o 0."""
+    if contenido.startswith(b"\n"):
+        return 1
+    if contenido.startswith(b"\r\n"):
+        return 2
+    return 0
+
+def agregados_por_unidad(df):
+    """
+    Calcula los totales por unidad de un conjunto de filas.
+
+    Args:
+        df (pandas.DataFrame): Datos formateados.
+
+    Returns:
+        pandas.DataFrame: Índice UNIDAD, columna SERVICIOS (filas) y la suma
+            de cada columna de COLUMNAS_AGREGADOS presente.
+    """
+    columnas = [col for col in COLUMNAS_AGREGADOS if col in df.columns]
+    if "UNIDAD" not in df.columns:
+        return pd.DataFrame(columns=["SERVICIOS"] + columnas)
+    grupos = densificar_dataframe(df[["UNIDAD"] + columnas]).groupby("UNIDAD", observed=True, sort=True)
+    return grupos.sum().astype("int64").assign(SERVICIOS=grupos.size())[["SERVICIOS"] + columnas]
+
+def _leer_registros(contenido, separador, codificacion, columnas):
+    """Analiza un tramo (encabezado más registros completos) y lo formatea."""
+    from utils import formatear_datos
+
+    usecols = selector_columnas(tuple(columnas)) if columnas is not None else None
+    df = leer_tabla_csv(contenido, separador=separador, codificacion=codificacion, usecols=usecols)
+    return formatear_datos(normalizar_columnas(df), columnas)
+
+def _hash(contenido):
+    return hashlib.sha256(contenido).hexdigest()
+
+def _punto_control(estado, contenido_final, inicio_final, fin):
+    """Actualiza el punto de control con el último registro completo leído."""
+    estado['desplazamiento'] = fin
+    estado['inicio_ultimo'] = inicio_final
+    estado['hash_ultimo'] = _hash(contenido_final)
+    # Un registro cerrado por el final del archivo: lo que se agregue después
+    # debe empezar con su salto de línea
+    estado['sin_salto_final'] = not contenido_final.endswith(b"\n")
+    return estado
+
+def _sigue_igual(archivo, estado, tamaño):
+    """Indica si el archivo solo creció desde el punto de control."""
+    if tamaño < estado['desplazamiento']:
+        return False
+    archivo.seek(0)
+    if archivo.read(len(estado['encabezado'])) != estado['encabezado']:
+        return False
+    archivo.seek(estado['inicio_ultimo'])
+    ultimo = archivo.read(estado['desplazamiento'] - estado['inicio_ultimo'])
+    if _hash(ultimo) != estado['hash_ultimo']:
+        return False
+    if estado['sin_salto_final'] and tamaño > estado['desplazamiento']:
+        # Si la línea final siguió creciendo, ese registro no estaba completo
+        siguiente = archivo.read(2)
+        return _salto_inicial(siguiente) > 0 or siguiente == b"\r"
+    return True
+
+def _lectura_completa(archivo, columnas):
+    """Lee el archivo completo (el final cierra el último registro) y crea el estado."""
+    archivo.seek(0)
+    contenido = archivo.read()
+    limites = _limites_hasta_el_final(contenido)
+    if not len(limites):
+        raise ValueError("El archivo CSV no tiene ninguna fila completa")
+
+    codificacion, separador = detectar_formato_csv(contenido[:TAMAÑO_MUESTRA])
+    fin = int(limites[-1]) + 1
+    inicio_ultimo = int(limites[-2]) + 1 if len(limites) > 1 else 0
+    df = compactar_dataframe(_leer_registros(contenido[:fin], separador, codificacion, columnas))
+
+    estado = {
+        'encabezado': contenido[:int(limites[0]) + 1],
+        'separador': separador,
+        'codificacion': codificacion,
+        'df': df,
+        'agregados': agregados_por_unidad(df)
+    }
+    return _punto_control(estado, contenido[inicio_ultimo:fin], inicio_ultimo, fin), len(df)
+
+def _cerrar_salto_pendiente(archivo, estado, agregado):
+    """
+    Pasa al punto de control el salto de línea que faltaba tras el último registro.
+
+    Returns:
+        tuple: (estado, agregado) con el salto ya quitado de lo agregado.
+    """
+    salto = _salto_inicial(agregado)
+    if not estado['sin_salto_final'] or not salto:
+        return estado, agregado
+
+    inicio_ultimo = estado['inicio_ultimo']
+    archivo.seek(inicio_ultimo)
+    ultimo = archivo.read(estado['desplazamiento'] - inicio_ultimo) + agregado[:salto]
+    if inicio_ultimo == 0:
+        # El registro cerrado era el encabezado
+        estado['encabezado'] = ultimo
+    estado = _punto_control(estado, ultimo, inicio_ultimo, estado['desplazamiento'] + salto)
+    return estado, agregado[salto:]
+
+def _lectura_incremental(archivo, estado, tamaño, columnas, hasta_el_final=False):
+    """
+    Lee solo los registros completos agregados desde el punto de control.
+
+    Args:
+        archivo (file): Archivo abierto en modo binario.
+        estado (dict): Punto de control de la lectura anterior.
+        tamaño (int): Tamaño actual del archivo.
+        columnas (tuple): Columnas esperadas a leer, o None.
+        hasta_el_final (bool, optional): Si el final del archivo cierra el
+            último registro (el archivo dejó de crecer). Defaults to False.
+
+    Returns:
+        tuple: (estado, filas_nuevas)
+    """
+    archivo.seek(estado['desplazamiento'])
+    agregado = archivo.read(tamaño - estado['desplazamiento'])
+    estado, agregado = _cerrar_salto_pendiente(archivo, estado, agregado)
+    desplazamiento = estado['desplazamiento']
+    limites = _limites_hasta_el_final(agregado) if hasta_el_final else limites_registros(agregado)
+    if not len(limites):
+        return estado, 0
+
+    fin = int(limites[-1]) + 1
+    nuevos = _leer_registros(estado['encabezado'] + agregado[:fin], estado['separador'], estado['codificacion'], columnas)
+    if not nuevos.empty:
+        # Unir con los datos guardados y volver a compactar (las categorías
+        # de las filas nuevas pueden no existir en los datos anteriores)
+        estado['df'] = compactar_dataframe(
+            pd.concat([densificar_dataframe(estado['df']), nuevos], ignore_index=True)
+        )
+        estado['agregados'] = estado['agregados'].add(agregados_por_unidad(nuevos), fill_value=0).astype("int64")
+
+    inicio_ultimo = int(limites[-2]) + 1 if len(limites) > 1 else 0
+    estado = _punto_control(
+        estado, agregado[inicio_ultimo:fin], desplazamiento + inicio_ultimo, desplazamiento + fin
+    )
+    return estado, len(nuevos)
+
+def listar_csv_en_curso(directorio=DIRECTORIO_CSV_EN_CURSO):
+    """
+    Lista los archivos CSV/TSV que se pueden seguir.
+
+    Args:
+        directorio (str, optional): Directorio de las exportaciones.
+            Defaults to DIRECTORIO_CSV_EN_CURSO.
+
+    Returns:
+        list: Nombres de los archivos, ordenados (vacía si el directorio no
+            existe). Los enlaces a archivos fuera del directorio se omiten.
+    """
+    try:
+        nombres = os.listdir(directorio)
+    except OSError:
+        return []
+
+    permitidos = []
+    for nombre in sorted(nombres):
+        if not nombre.lower().endswith(EXTENSIONES_CSV):
+            continue
+        try:
+            ruta = resolver_ruta_en_curso(nombre, directorio)
+        except ValueError:
+            continue
+        if os.path.isfile(ruta):
+            permitidos.append(nombre)
+    return permitidos
+
+def resolver_ruta_en_curso(nombre, directorio=DIRECTORIO_CSV_EN_CURSO):
+    """
+    Obtiene la ruta real de un CSV en curso y comprueba que esté en el directorio permitido.
+
+    Args:
+        nombre (str): Nombre del archivo (o ruta relativa al directorio).
+        directorio (str, optional): Directorio de las exportaciones.
+            Defaults to DIRECTORIO_CSV_EN_CURSO.
+
+    Returns:
+        str: Ruta real del archivo (con los enlaces simbólicos resueltos).
+
+    Raises:
+        ValueError: Si la ruta queda fuera del directorio.
+    """
+    base = os.path.realpath(directorio)
+    ruta = os.path.realpath(os.path.join(base, nombre))
+    if ruta == base or os.path.commonpath([base, ruta]) != base:
+        raise ValueError(f"solo se pueden seguir archivos del directorio '{directorio}'")
+    return ruta
+
+def leer_csv_en_curso(ruta, columnas=None):
+    """
+    Lee un CSV que crece al final, analizando solo lo agregado desde la lectura anterior.
+
+    Args:
+        ruta (str): Ruta del archivo CSV en disco.
+        columnas (tuple, optional): Columnas esperadas a leer. Defaults to None (todas).
+
+    Returns:
+        tuple: (DataFrame, DataFrame, int, bool) - (datos compactos, totales
+            por unidad, filas nuevas leídas, lectura_completa). En una
+            lectura completa las filas nuevas son todas las del archivo.
+
+    Raises:
+        OSError: Si el archivo no se puede abrir.
+        ValueError: Si el archivo no tiene ninguna fila completa.
+    """
+    clave = (os.path.abspath(ruta), columnas)
+    with _bloqueo:
+        estado = _estados.get(clave)
+        if estado is not None:
+            _estados.move_to_end(clave)
+
+    with open(ruta, 'rb') as archivo:
+        tamaño = os.fstat(archivo.fileno()).st_size
+        completa = estado is None or not _sigue_igual(archivo, estado, tamaño)
+        if completa:
+            if estado is not None:
+                print(f"Advertencia: el archivo '{ruta}' no solo creció desde la lectura anterior. Se leerá completo.")
+            estado, filas_nuevas = _lectura_completa(archivo, columnas)
+        else:
+            # Si el tamaño no cambió desde la consulta anterior, la línea final
+            # sin salto ya no está a medio escribir
+            estado, filas_nuevas = _lectura_incremental(
+                archivo, estado, tamaño, columnas, hasta_el_final=tamaño == estado['tamaño']
+            )
+        estado['tamaño'] = tamaño
+
+    with _bloqueo:
+        _estados[clave] = estado
+        _estados.move_to_end(clave)
+        while len(_estados) > MAX_CSV_EN_CURSO:
+            _estados.popitem(last=False)
+
+    return estado['df'], estado['agregados'], filas_nuevas, completa
+
+def olvidar_csv_en_curso():
+    """Descarta los puntos de control de todos los archivos."""
+    with _bloqueo:
+        _estados.clear()
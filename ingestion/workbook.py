@@ -0,0 +1,295 @@
+"""
+Sesión de lectura de libros Excel: el archivo subido se abre una sola vez.
+"""
+
+import io
+import pandas as pd
+
+from ingestion.engines import seleccionar_motores
+
+# Nombres de las hojas diarias ("01".."31")
+HOJAS_DIA = [f"{i:02d}" for i in range(1, 32)]
+
+# Errores que no dependen del motor (opciones no válidas, falta de memoria):
+# se propagan sin probar otro motor
+ERRORES_NO_DE_MOTOR = (TypeError, MemoryError)
+
+def leer_bytes_archivo(archivo):
+    """
+    Obtiene el contenido completo de un archivo como bytes.
+
+    Args:
+        archivo: Archivo subido por Streamlit, objeto tipo archivo, ruta o bytes.
+
+    Returns:
+        bytes: Contenido del archivo.
+    """
+    if isinstance(archivo, (bytes, bytearray, memoryview)):
+        return bytes(archivo)
+
+    if isinstance(archivo, str):
+        with open(archivo, 'rb') as f:
+            return f.read()
+
+    # Los archivos subidos por Streamlit exponen getvalue() sin mover el cursor
+    if hasattr(archivo, 'getvalue'):
+        return archivo.getvalue()
+
+    pos = archivo.tell()
+    archivo.seek(0)
+    contenido = archivo.read()
+    archivo.seek(pos)
+    return contenido
+
+class LibroExcel:
+    """
+    Libro Excel abierto una única vez a partir de sus bytes.
+
+    Todas las funciones de ingesta comparten la misma instancia, de modo que el
+    archivo se descomprime y se analiza una sola vez por ejecución. Las hojas
+    leídas se conservan para no volver a analizarlas.
+    """
+
+    def __init__(self, contenido, nombre=None, motores=None):
+        """
+        Args:
+            contenido (bytes): Contenido binario del archivo Excel.
+            nombre (str, optional): Nombre original del archivo. Defaults to None.
+            motores (list, optional): Motores de lectura en orden de preferencia.
+                Si es None, se eligen según el tipo y tamaño del archivo.
+        """
+        self.contenido = contenido
+        self.nombre = nombre
+        self.motores = motores if motores else seleccionar_motores(contenido, nombre)
+        self._indice_motor = 0
+        self._excel = None
+        self._lector_streaming = None
+        self._sondeo = None
+        self._hojas_leidas = {}
+
+    @classmethod
+    def desde_archivo(cls, archivo):
+        """
+        Crea un libro a partir de un archivo subido (o devuelve el mismo libro).
+
+        Args:
+            archivo: Archivo Excel cargado por el usuario o LibroExcel existente.
+
+        Returns:
+            LibroExcel: Libro listo para ser consultado.
+        """
+        if isinstance(archivo, cls):
+            return archivo
+
+        nombre = getattr(archivo, 'name', archivo if isinstance(archivo, str) else None)
+        return cls(leer_bytes_archivo(archivo), nombre=nombre)
+
+    @property
+    def motor(self):
+        """str: Motor de lectura en uso (None = motor por defecto de pandas)."""
+        return self.motores[self._indice_motor]
+
+    @property
+    def excel(self):
+        """pandas.ExcelFile: Manejador único del libro, creado bajo demanda."""
+        while self._excel is None:
+            try:
+                self._excel = pd.ExcelFile(io.BytesIO(self.contenido), engine=self.motor)
+            except ERRORES_NO_DE_MOTOR:
+                raise
+            except Exception:
+                if not self._cambiar_motor():
+                    raise
+        return self._excel
+
+    def _cambiar_motor(self):
+        """
+        Pasa al siguiente motor de lectura tras un fallo.
+
+        Returns:
+            bool: True si quedaba otro motor por probar.
+        """
+        if self._indice_motor + 1 >= len(self.motores):
+            return False
+
+        print(f"Advertencia: el motor '{self.motor}' no pudo leer el archivo. Se intentará con '{self.motores[self._indice_motor + 1]}'.")
+        if self._excel is not None:
+            self._excel.close()
+            self._excel = None
+        self._hojas_leidas.clear()
+        self._indice_motor += 1
+        return True
+
+    @property
+    def lector_streaming(self):
+        """LectorXlsxStreaming: Lector incremental sobre los mismos bytes (solo xlsx)."""
+        if self._lector_streaming is None:
+            from ingestion.xlsx_stream import LectorXlsxStreaming
+            self._lector_streaming = LectorXlsxStreaming(self.contenido)
+        return self._lector_streaming
+
+    @property
+    def es_xlsx(self):
+        """bool: True si el contenido es un libro xlsx (zip) y admite lectura incremental."""
+        return self.contenido[:4] == b'PK\x03\x04'
+
+    @property
+    def hojas(self):
+        """list: Nombres de las hojas del libro, en su orden original."""
+        # Si el libro ya se sondeó, no hace falta abrirlo con pandas
+        if self._sondeo is not None and self._sondeo[0] is not None:
+            return list(self._sondeo[0]['hojas'])
+        return list(self.excel.sheet_names)
+
+    def sondear(self):
+        """
+        Valida el libro y obtiene sus metadatos sin analizar las hojas (resultado memorizado).
+
+        Returns:
+            tuple: (dict, bool, str) - (sondeo, es_valido, mensaje_error); el
+                sondeo es None para los .xls, que no pueden sondearse.
+        """
+        if self._sondeo is None:
+            from ingestion.probe import sondear_libro
+            self._sondeo = sondear_libro(self)
+        return self._sondeo
+
+    @property
+    def tamaño(self):
+        """int: Tamaño del archivo en bytes."""
+        return len(self.contenido)
+
+    def _comprobar_hoja(self, hoja):
+        """
+        Verifica que la hoja pedida exista en el libro.
+
+        Args:
+            hoja (str | int): Nombre o posición de la hoja.
+
+        Raises:
+            ValueError: Si el libro no tiene esa hoja.
+        """
+        hojas = self.hojas
+        if isinstance(hoja, int):
+            if not -len(hojas) <= hoja < len(hojas):
+                raise ValueError(f"La hoja {hoja} no existe: el libro tiene {len(hojas)} hojas")
+        elif hoja not in hojas:
+            raise ValueError(f"La hoja '{hoja}' no existe en el libro")
+
+    def leer_hoja(self, hoja=None, **opciones):
+        """
+        Lee una hoja del libro reutilizando el manejador abierto.
+
+        Args:
+            hoja (str, optional): Nombre de la hoja. Si es None, se usa la primera.
+            **opciones: Parámetros adicionales para pandas.ExcelFile.parse.
+
+        Returns:
+            pandas.DataFrame: Datos de la hoja. Se devuelve una copia superficial
+                para que el llamador pueda añadir columnas sin alterar la caché.
+
+        Raises:
+            ValueError: Si la hoja no existe.
+            TypeError: Si las opciones no son válidas.
+        """
+        if hoja is None:
+            hoja = self.hojas[0]
+        else:
+            # Una hoja inexistente no es un fallo del motor: no se cambia de motor
+            self._comprobar_hoja(hoja)
+
+        clave = (hoja, tuple(sorted(opciones.items())))
+        if clave not in self._hojas_leidas:
+            try:
+                df = self.excel.parse(sheet_name=hoja, **opciones)
+            except ERRORES_NO_DE_MOTOR:
+                raise
+            except Exception as error:
+                # Si el motor actual no puede analizar la hoja, probar los siguientes
+                df = self._leer_con_otro_motor(hoja, opciones, error)
+            self._hojas_leidas[clave] = df
+
+        return self._hojas_leidas[clave].copy(deep=False)
+
+    def _leer_con_otro_motor(self, hoja, opciones, error):
+        """
+        Lee una hoja con los motores siguientes tras un fallo del motor actual.
+
+        Solo se cambia de motor (y se descartan las hojas ya leídas) si otro
+        motor consigue leer la hoja; si todos fallan, el error se debe a la
+        hoja o a las opciones y el libro queda como estaba.
+
+        Args:
+            hoja (str | int): Nombre o posición de la hoja.
+            opciones (dict): Parámetros para pandas.ExcelFile.parse.
+            error (Exception): Error del motor actual.
+
+        Returns:
+            pandas.DataFrame: Datos de la hoja.
+
+        Raises:
+            Exception: El error original si ningún otro motor puede leer la hoja.
+        """
+        for indice in range(self._indice_motor + 1, len(self.motores)):
+            try:
+                excel = pd.ExcelFile(io.BytesIO(self.contenido), engine=self.motores[indice])
+                df = excel.parse(sheet_name=hoja, **opciones)
+            except Exception:
+                continue
+
+            print(f"Advertencia: el motor '{self.motor}' no pudo leer el archivo. Se intentará con '{self.motores[indice]}'.")
+            self._excel.close()
+            self._excel = excel
+            self._hojas_leidas.clear()
+            self._indice_motor = indice
+            return df
+        raise error
+
+    def metadatos(self, hoja):
+        """
+        Obtiene los metadatos de una hoja del libro.
+
+        Args:
+            hoja (str): Nombre de la hoja.
+
+        Returns:
+            dict: Nombre, posición, si es hoja diaria, filas estimadas (si el
+                libro se sondeó) y, si ya fue leída, sus dimensiones (filas y
+                columnas); en otro caso estas son None.
+        """
+        hojas = self.hojas
+        if hoja not in hojas:
+            raise KeyError(f"La hoja '{hoja}' no existe en el libro")
+
+        df = next((d for (nombre, _), d in self._hojas_leidas.items() if nombre == hoja), None)
+        sondeo = self._sondeo[0] if self._sondeo is not None else None
+
+        return {
+            'nombre': hoja,
+            'indice': hojas.index(hoja),
+            'es_hoja_dia': hoja in HOJAS_DIA,
+            'dia': int(hoja) if hoja in HOJAS_DIA else None,
+            'filas_estimadas': sondeo['filas_estimadas'].get(hoja) if sondeo is not None else None,
+            'filas': len(df) if df is not None else None,
+            'columnas': len(df.columns) if df is not None else None
+        }
+
+    def cerrar(self):
+        """Libera el manejador del libro y las hojas en memoria."""
+        if self._excel is not None:
+            self._excel.close()
+            self._excel = None
+        self._lector_streaming = None
+        self._hojas_leidas.clear()
+
+def abrir_libro(archivo):
+    """
+    Abre un libro Excel una sola vez, o reutiliza el que ya esté abierto.
+
+    Args:
+        archivo: Archivo Excel cargado por el usuario o LibroExcel existente.
+
+    Returns:
+        LibroExcel: Sesión de lectura del libro.
+    """
+    return LibroExcel.desde_archivo(archivo)
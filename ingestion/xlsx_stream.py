@@ -0,0 +1,387 @@
+"""
+Lector incremental de hojas xlsx con memoria constante.
+
+Analiza directamente el XML de cada hoja dentro del zip del libro, sin crear
+un objeto por celda como hace openpyxl. La tabla de cadenas compartidas se
+resuelve una sola vez por libro y las filas se entregan en bloques tipados.
+"""
+
+import io
+import zipfile
+import posixpath
+from datetime import datetime, timedelta
+from functools import lru_cache
+import xml.etree.ElementTree as ET
+import pandas as pd
+
+# Espacios de nombres del formato Office Open XML
+NS_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+NS_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+NS_PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+# Formatos numéricos integrados de Excel que representan fechas u horas
+FORMATOS_FECHA_INTEGRADOS = {14, 15, 16, 17, 18, 19, 20, 21, 22, 45, 46, 47}
+
+# Origen de las fechas seriales de Excel (sistema 1900)
+ORIGEN_EXCEL = datetime(1899, 12, 30)
+
+# Número de filas por bloque por defecto
+TAMAÑO_BLOQUE = 5000
+
+@lru_cache(maxsize=1024)
+def indice_columna(referencia):
+    """
+    Convierte una referencia de celda ("B12") en el índice de su columna (1).
+
+    Args:
+        referencia (str): Referencia de la celda en notación A1.
+
+    Returns:
+        int: Índice de la columna empezando en 0.
+    """
+    indice = 0
+    for caracter in referencia:
+        if caracter.isdigit():
+            break
+        indice = indice * 26 + (ord(caracter.upper()) - 64)
+    return indice - 1
+
+def _es_formato_fecha(codigo):
+    """Indica si un código de formato numérico personalizado es de fecha u hora."""
+    # Quitar literales entre comillas y secciones entre corchetes (colores, locales)
+    limpio = []
+    en_comillas = en_corchetes = False
+    for caracter in codigo:
+        if caracter == '"':
+            en_comillas = not en_comillas
+        elif caracter == '[':
+            en_corchetes = True
+        elif caracter == ']':
+            en_corchetes = False
+        elif not en_comillas and not en_corchetes:
+            limpio.append(caracter.lower())
+    return any(c in 'dmyhs' for c in limpio)
+
+def _texto_cadena(elemento):
+    """Concatena el texto de un elemento <si> o <is>, ignorando la fonética (<rPh>)."""
+    partes = []
+    for hijo in elemento:
+        if hijo.tag == NS_MAIN + 't':
+            partes.append(hijo.text or '')
+        elif hijo.tag == NS_MAIN + 'r':
+            partes.extend(t.text or '' for t in hijo.iter(NS_MAIN + 't'))
+    return ''.join(partes)
+
+class LectorXlsxStreaming:
+    """
+    Lector incremental de un libro xlsx a partir de sus bytes.
+
+    Los metadatos del libro (hojas, estilos y cadenas compartidas) se leen una
+    sola vez; cada hoja se recorre fila a fila liberando el XML ya procesado.
+    """
+
+    def __init__(self, contenido):
+        """
+        Args:
+            contenido (bytes): Contenido binario del archivo xlsx.
+
+        Raises:
+            zipfile.BadZipFile: Si el contenido no es un archivo xlsx válido.
+        """
+        self._zip = zipfile.ZipFile(io.BytesIO(contenido))
+        self._rutas_hojas = None
+        self._cadenas = None
+        self._estilos_fecha = None
+
+    @property
+    def zip(self):
+        """zipfile.ZipFile: Archivo zip subyacente del libro."""
+        return self._zip
+
+    @property
+    def rutas_hojas(self):
+        """dict: Nombre de cada hoja y la ruta de su XML dentro del zip, en orden."""
+        if self._rutas_hojas is None:
+            self._rutas_hojas = leer_rutas_hojas(self._zip)
+        return self._rutas_hojas
+
+    @property
+    def hojas(self):
+        """list: Nombres de las hojas del libro."""
+        return list(self.rutas_hojas)
+
+    @property
+    def cadenas_compartidas(self):
+        """list: Tabla de cadenas compartidas, resuelta una vez por libro."""
+        if self._cadenas is None:
+            self._cadenas = leer_cadenas_compartidas(self._zip)
+        return self._cadenas
+
+    @property
+    def estilos_fecha(self):
+        """set: Índices de estilo de celda (cellXfs) con formato de fecha u hora."""
+        if self._estilos_fecha is None:
+            self._estilos_fecha = leer_estilos_fecha(self._zip)
+        return self._estilos_fecha
+
+    def _valor_celda(self, celda):
+        """Convierte un elemento <c> en su valor Python tipado."""
+        tipo = celda.get('t')
+
+        if tipo == 'inlineStr':
+            elemento = celda.find(NS_MAIN + 'is')
+            return _texto_cadena(elemento) if elemento is not None else None
+
+        valor = celda.findtext(NS_MAIN + 'v')
+        if not valor:
+            return None
+
+        if tipo == 's':
+            return self.cadenas_compartidas[int(valor)]
+        if tipo == 'str':
+            return valor
+        if tipo == 'b':
+            return valor == '1'
+        if tipo == 'e':
+            return None
+        if tipo == 'd':
+            return pd.Timestamp(valor)
+
+        numero = float(valor)
+        estilo = celda.get('s')
+        if estilo is not None and int(estilo) in self.estilos_fecha:
+            if 0 <= numero < 1:
+                # Solo hora: fracción del día
+                return (ORIGEN_EXCEL + timedelta(days=numero)).time().replace(microsecond=0)
+            return ORIGEN_EXCEL + timedelta(days=numero)
+
+        return int(numero) if numero.is_integer() else numero
+
+    def iterar_filas(self, hoja=None, max_filas=None, columnas=None):
+        """
+        Recorre las filas de una hoja sin cargarla completa en memoria.
+
+        Las filas vacías intermedias se entregan como listas vacías, igual que
+        pandas; las vacías al final de la hoja se descartan.
+
+        Args:
+            hoja (str, optional): Nombre de la hoja. Si es None, se usa la primera.
+            max_filas (int, optional): Número máximo de filas a recorrer.
+            columnas (set, optional): Índices de columna a convertir; el resto se
+                omite sin analizar su valor. Defaults to None (todas).
+
+        Yields:
+            list: Valores de la fila, indexados por columna.
+        """
+        ruta = self.rutas_hojas[hoja if hoja is not None else self.hojas[0]]
+        fila_esperada = 1
+        filas_vacias = 0
+        entregadas = 0
+        contenedor = None
+
+        with self._zip.open(ruta) as xml:
+            for evento, elemento in ET.iterparse(xml, events=('start', 'end')):
+                if evento == 'start':
+                    if elemento.tag == NS_MAIN + 'sheetData':
+                        contenedor = elemento
+                    continue
+
+                if elemento.tag != NS_MAIN + 'row':
+                    continue
+
+                numero_fila = int(elemento.get('r', fila_esperada))
+                valores = []
+                for posicion, celda in enumerate(elemento.iter(NS_MAIN + 'c')):
+                    referencia = celda.get('r')
+                    indice = indice_columna(referencia) if referencia else posicion
+                    if columnas is not None and indice not in columnas:
+                        continue
+                    valor = self._valor_celda(celda)
+                    if valor is None or valor == '':
+                        continue
+                    if indice >= len(valores):
+                        valores.extend([None] * (indice + 1 - len(valores)))
+                    valores[indice] = valor
+
+                # Liberar el XML ya procesado para mantener la memoria constante
+                if contenedor is not None:
+                    contenedor.clear()
+
+                filas_vacias += numero_fila - fila_esperada
+                fila_esperada = numero_fila + 1
+
+                if not valores:
+                    filas_vacias += 1
+                    continue
+
+                # Entregar las filas vacías intermedias pendientes
+                while filas_vacias and (max_filas is None or entregadas < max_filas):
+                    filas_vacias -= 1
+                    entregadas += 1
+                    yield []
+                filas_vacias = 0
+
+                if max_filas is not None and entregadas >= max_filas:
+                    return
+                entregadas += 1
+                yield valores
+
+    def iterar_bloques(self, hoja=None, tamaño_bloque=TAMAÑO_BLOQUE, fila_encabezado=0, usecols=None):
+        """
+        Recorre una hoja en bloques de filas ya convertidos a DataFrame.
+
+        Las filas vacías se omiten, igual que al leer la hoja con pandas.
+
+        Args:
+            hoja (str, optional): Nombre de la hoja. Si es None, se usa la primera.
+            tamaño_bloque (int, optional): Filas por bloque. Defaults to TAMAÑO_BLOQUE.
+            fila_encabezado (int, optional): Fila (base 0) con los nombres de
+                columna; las anteriores se descartan. Defaults to 0.
+            usecols (callable, optional): Función que recibe un nombre de
+                columna y indica si se conserva; las demás celdas no se
+                convierten. Defaults to None (todas).
+
+        Yields:
+            pandas.DataFrame: Bloque de filas con las columnas del encabezado.
+        """
+        nombres = indices = None
+        if usecols is not None:
+            # El encabezado se lee antes (solo las primeras filas) para saber
+            # qué columnas convertir en el recorrido completo
+            primeras = list(self.iterar_filas(hoja, max_filas=fila_encabezado + 1))
+            if len(primeras) <= fila_encabezado:
+                return
+            nombres = nombres_columnas(primeras[fila_encabezado])
+            indices = [i for i, nombre in enumerate(nombres) if usecols(nombre)]
+
+        encabezado = None
+        filas = []
+
+        for numero, valores in enumerate(self.iterar_filas(hoja, columnas=set(indices) if indices is not None else None)):
+            if numero < fila_encabezado:
+                continue
+
+            if encabezado is None:
+                encabezado = nombres_columnas(valores) if indices is None else [nombres[i] for i in indices]
+                continue
+
+            if indices is not None:
+                valores = [valores[i] if i < len(valores) else None for i in indices]
+            if all(valor is None for valor in valores):
+                continue
+
+            # Ajustar la fila al ancho del encabezado
+            if len(valores) < len(encabezado):
+                valores = valores + [None] * (len(encabezado) - len(valores))
+            filas.append(valores[:len(encabezado)])
+
+            if len(filas) >= tamaño_bloque:
+                yield pd.DataFrame(filas, columns=encabezado)
+                filas = []
+
+        if encabezado is None:
+            return
+
+        if filas:
+            yield pd.DataFrame(filas, columns=encabezado)
+
+def nombres_columnas(valores):
+    """
+    Construye los nombres de columna a partir de la fila de encabezado.
+
+    Reproduce el criterio de pandas: las celdas vacías se nombran
+    "Unnamed: n" y los nombres repetidos reciben el sufijo ".1", ".2", etc.
+
+    Args:
+        valores (list): Valores de la fila de encabezado.
+
+    Returns:
+        list: Nombres de columna únicos.
+    """
+    nombres = []
+    vistos = {}
+    for i, valor in enumerate(valores):
+        nombre = f"Unnamed: {i}" if valor is None else valor
+        if nombre in vistos:
+            vistos[nombre] += 1
+            nombre = f"{nombre}.{vistos[nombre]}"
+        else:
+            vistos[nombre] = 0
+        nombres.append(nombre)
+    return nombres
+
+def leer_rutas_hojas(archivo_zip):
+    """
+    Obtiene las hojas del libro y la ruta de su XML dentro del zip.
+
+    Args:
+        archivo_zip (zipfile.ZipFile): Libro xlsx abierto.
+
+    Returns:
+        dict: Nombre de cada hoja y su ruta, en el orden del libro.
+    """
+    relaciones = {}
+    with archivo_zip.open('xl/_rels/workbook.xml.rels') as xml:
+        for relacion in ET.parse(xml).getroot().iter(NS_PKG_REL + 'Relationship'):
+            destino = relacion.get('Target')
+            if destino.startswith('/'):
+                ruta = destino.lstrip('/')
+            else:
+                ruta = posixpath.normpath(posixpath.join('xl', destino))
+            relaciones[relacion.get('Id')] = ruta
+
+    rutas = {}
+    with archivo_zip.open('xl/workbook.xml') as xml:
+        for hoja in ET.parse(xml).getroot().iter(NS_MAIN + 'sheet'):
+            rutas[hoja.get('name')] = relaciones[hoja.get(NS_REL + 'id')]
+    return rutas
+
+def leer_cadenas_compartidas(archivo_zip):
+    """
+    Lee la tabla de cadenas compartidas del libro de forma incremental.
+
+    Args:
+        archivo_zip (zipfile.ZipFile): Libro xlsx abierto.
+
+    Returns:
+        list: Cadenas en el orden de su índice.
+    """
+    if 'xl/sharedStrings.xml' not in archivo_zip.namelist():
+        return []
+
+    cadenas = []
+    with archivo_zip.open('xl/sharedStrings.xml') as xml:
+        for _, elemento in ET.iterparse(xml):
+            if elemento.tag == NS_MAIN + 'si':
+                cadenas.append(_texto_cadena(elemento))
+                elemento.clear()
+    return cadenas
+
+def leer_estilos_fecha(archivo_zip):
+    """
+    Obtiene los estilos de celda cuyo formato numérico es de fecha u hora.
+
+    Args:
+        archivo_zip (zipfile.ZipFile): Libro xlsx abierto.
+
+    Returns:
+        set: Índices de cellXfs con formato de fecha u hora.
+    """
+    if 'xl/styles.xml' not in archivo_zip.namelist():
+        return set()
+
+    with archivo_zip.open('xl/styles.xml') as xml:
+        raiz = ET.parse(xml).getroot()
+
+    formatos_fecha = set(FORMATOS_FECHA_INTEGRADOS)
+    for formato in raiz.iter(NS_MAIN + 'numFmt'):
+        if _es_formato_fecha(formato.get('formatCode', '')):
+            formatos_fecha.add(int(formato.get('numFmtId')))
+
+    estilos = set()
+    cell_xfs = raiz.find(NS_MAIN + 'cellXfs')
+    if cell_xfs is not None:
+        for indice, xf in enumerate(cell_xfs.iter(NS_MAIN + 'xf')):
+            if int(xf.get('numFmtId', 0)) in formatos_fecha:
+                estilos.add(indice)
+    return estilos
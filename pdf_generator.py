@@ -10,7 +10,7 @@ from reportlab.platypus import SimpleDocTemplate
 from config import PDF_TITLE
 from pdf_config import COLUMNAS_PDF
 from pdf_header_footer import encabezado_pie_pagina
-from data_utils import preparar_dataframe, clasificar_datos_por_unidad
+from data_utils import DatasetPreparado
 from table_elements import crear_tabla_por_unidad, crear_tabla_general
 from table_styles import crear_estilos_tabla
 
@@ -38,7 +38,8 @@ def crear_documento_pdf(buffer):
         bottomMargin=2.0*cm  # Margen inferior para el pie de página
     )
 
-def generar_pdf_optimizado(df, organizar_por_unidad=True, reporte_cumplimiento=False, mes=None, año=None, **kwargs):
+def generar_pdf_optimizado(df, organizar_por_unidad=True, reporte_cumplimiento=False, mes=None, año=None,
+                           anexo_conflictos=False, **kwargs):
     """
     Genera un PDF optimizado a partir de un DataFrame con datos de despliegues operativos.
     
@@ -47,7 +48,8 @@ def generar_pdf_optimizado(df, organizar_por_unidad=True, reporte_cumplimiento=F
     definidos para mejorar la legibilidad.
     
     Args:
-        df (pandas.DataFrame): DataFrame con los datos de despliegues operativos.
+        df (pandas.DataFrame | DatasetPreparado): Datos de despliegues operativos. Con un
+            DatasetPreparado se reutilizan los datos ya preparados en generaciones anteriores.
         organizar_por_unidad (bool, optional): Si es True, organiza las tablas por unidad.
             Defaults to True.
         reporte_cumplimiento (bool, optional): Si es True, genera un reporte de cumplimiento de servicios.
@@ -56,6 +58,8 @@ def generar_pdf_optimizado(df, organizar_por_unidad=True, reporte_cumplimiento=F
             Defaults to None.
         año (int, optional): Año al que corresponden los datos. Usado para el reporte de cumplimiento.
             Defaults to None.
+        anexo_conflictos (bool, optional): Si es True, agrega al final un anexo con las matrículas
+            asignadas a servicios superpuestos. Defaults to False.
         **kwargs: Parámetros adicionales que se puedan necesitar en el futuro.
         
     Returns:
@@ -73,8 +77,8 @@ def generar_pdf_optimizado(df, organizar_por_unidad=True, reporte_cumplimiento=F
         organizar_por_unidad = False
         print("Advertencia: La columna 'UNIDAD' no existe en el DataFrame. Se desactivará la organización por unidad.")
     
-    # Preparar el DataFrame para el PDF
-    df_completo, df_filtrado, columnas_disponibles = preparar_dataframe(df)
+    # Datos preparados para el PDF (se calculan solo los que use este reporte)
+    datos = DatasetPreparado.desde_dataframe(df)
     
     # Crear buffer para el PDF
     buffer = io.BytesIO()
@@ -92,11 +96,11 @@ def generar_pdf_optimizado(df, organizar_por_unidad=True, reporte_cumplimiento=F
     if reporte_cumplimiento:
         # Importar función para crear el reporte de cumplimiento
         from report_services import crear_reporte_cumplimiento
-        elementos.extend(crear_reporte_cumplimiento(df_completo, estilos, mes=mes, año=año))
+        elementos.extend(crear_reporte_cumplimiento(datos, estilos, mes=mes, año=año))
     # Si se organiza por unidad, crear tablas separadas para cada unidad
-    elif organizar_por_unidad and 'UNIDAD' in df_completo.columns:
+    elif organizar_por_unidad and 'UNIDAD' in datos.columns:
         # Clasificar datos por unidad
-        dfs_por_unidad = clasificar_datos_por_unidad(df_completo, df_filtrado)
+        dfs_por_unidad = datos.por_unidad
         
         # Importar orden de unidades
         from unidades_config import UNIDADES_ORDEN
@@ -107,10 +111,16 @@ def generar_pdf_optimizado(df, organizar_por_unidad=True, reporte_cumplimiento=F
             if unidad in dfs_por_unidad:
                 df_unidad = dfs_por_unidad[unidad]
                 # Usar la función crear_tabla_por_unidad para generar la tabla y agregarla a los elementos
-                elementos.extend(crear_tabla_por_unidad(unidad, df_unidad, columnas_disponibles, estilos))
+                elementos.extend(crear_tabla_por_unidad(unidad, df_unidad, datos.columnas_disponibles, estilos))
     else:
         # Si no se organiza por unidad, crear una sola tabla con todos los datos
-        elementos.extend(crear_tabla_general(df_filtrado, columnas_disponibles, estilos))
+        elementos.extend(crear_tabla_general(datos.df_filtrado, datos.columnas_disponibles, estilos))
+    
+    # Anexo opcional con los conflictos de matrículas
+    if anexo_conflictos:
+        from report_services.personnel_conflicts import generar_anexo_conflictos
+        from report_services.utils import obtener_estilos_parrafo
+        elementos.extend(generar_anexo_conflictos(datos, estilos, obtener_estilos_parrafo()))
     
     # Construir documento con encabezado y pie de página
     doc.build(elementos, onFirstPage=encabezado_pie_pagina, onLaterPages=encabezado_pie_pagina)
@@ -3,7 +3,14 @@ Paquete para la generación de reportes de cumplimiento de servicios.
 """
 
 from report_services.core import crear_reporte_cumplimiento
+from report_services.coverage_analysis import calcular_cobertura_horaria
+from report_services.seccional_analysis import IndiceSeccional, despliegues_en_seccional
+from report_services.personnel_conflicts import detectar_conflictos
 
 __all__ = [
-    'crear_reporte_cumplimiento'
+    'crear_reporte_cumplimiento',
+    'calcular_cobertura_horaria',
+    'IndiceSeccional',
+    'despliegues_en_seccional',
+    'detectar_conflictos'
 ]
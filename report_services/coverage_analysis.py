@@ -0,0 +1,202 @@
+"""
+Módulo para el análisis de cobertura horaria en los reportes de cumplimiento.
+
+Calcula cuántos recursos (personal, móviles, motos) están en servicio en cada
+hora del día, por unidad. Cada servicio suma sus recursos al inicio de su
+horario y los resta al final en un arreglo de diferencias por unidad; una
+suma acumulada da la cobertura de todas las horas en una sola pasada. Los
+servicios que cruzan la medianoche (20:00 a 07:00) se parten en dos tramos.
+"""
+
+import numpy as np
+import pandas as pd
+from reportlab.platypus import Paragraph, Spacer
+from reportlab.lib.units import cm
+from charts import crear_grafica_lineas_tiempo
+
+from config import COLUMNAS_COBERTURA
+from unidades_config import UNIDADES_ORDEN, clasificar_columna_unidades, obtener_nombre_unidad
+from report_services.utils import crear_tabla_con_estilo
+
+# Minutos de un día y horas en que se divide
+MINUTOS_DIA = 24 * 60
+HORAS_DIA = 24
+
+# Nombres de los recursos en las tablas
+NOMBRES_RECURSOS = {
+    "PP.SS TOTAL": "PERSONAL",
+    "MOVILES": "MÓVILES",
+    "MOTOS": "MOTOS"
+}
+
+def tramos_horarios(inicio, fin):
+    """
+    Convierte los horarios de los servicios en tramos de horas completas.
+
+    Un servicio cuenta en una hora si está en servicio en algún momento de
+    ella. Si el fin es anterior al inicio, el servicio cruza la medianoche y
+    se parte en dos tramos; si coinciden, cubre el día completo.
+
+    Args:
+        inicio (numpy.ndarray): Minutos desde la medianoche del inicio.
+        fin (numpy.ndarray): Minutos desde la medianoche del fin.
+
+    Returns:
+        tuple: (fila, hora_inicio, hora_fin) - fila de cada tramo, primera
+            hora que cubre y hora siguiente a la última (0 a 24).
+    """
+    inicio = np.mod(inicio, MINUTOS_DIA)
+    fin = np.mod(fin, MINUTOS_DIA)
+    cruza = fin < inicio
+    dia_completo = fin == inicio
+
+    # Primer tramo: hasta el fin, hasta la medianoche si cruza, o el día completo
+    desde = np.where(dia_completo, 0, inicio)
+    hasta = np.where(cruza | dia_completo, MINUTOS_DIA, fin)
+    # Segundo tramo: desde la medianoche hasta el fin (solo si cruza)
+    filas_cruce = np.flatnonzero(cruza)
+
+    fila = np.concatenate([np.arange(len(inicio)), filas_cruce])
+    desde = np.concatenate([desde, np.zeros(len(filas_cruce))])
+    hasta = np.concatenate([hasta, fin[filas_cruce]])
+    return fila, (desde // 60).astype(np.int64), np.ceil(hasta / 60).astype(np.int64)
+
+def servicios_activos(inicio, fin, minuto):
+    """
+    Indica qué servicios están activos en un minuto del día.
+
+    Sigue las mismas reglas que tramos_horarios: si el fin es anterior al
+    inicio el servicio cruza la medianoche y, si coinciden, cubre el día.
+
+    Args:
+        inicio (numpy.ndarray): Minutos desde la medianoche del inicio.
+        fin (numpy.ndarray): Minutos desde la medianoche del fin.
+        minuto (int): Minuto del día consultado (0 a 1439).
+
+    Returns:
+        numpy.ndarray: Máscara booleana; los servicios sin horario no están activos.
+    """
+    inicio = np.mod(inicio, MINUTOS_DIA)
+    fin = np.mod(fin, MINUTOS_DIA)
+    minuto = minuto % MINUTOS_DIA
+    en_el_dia = (inicio <= minuto) & (minuto < fin)
+    cruzando = (fin < inicio) & ((minuto >= inicio) | (minuto < fin))
+    return en_el_dia | cruzando | (fin == inicio)
+
+def calcular_cobertura_horaria(df, columnas=None):
+    """
+    Calcula los recursos en servicio en cada hora del día, por unidad.
+
+    Con datos de varios días (columna FECHA) se informa el promedio por día.
+
+    Args:
+        df (pandas.DataFrame): Datos con UNIDAD, HORA INICIO y HORA FIN (minutos
+            desde la medianoche) y las columnas de recursos.
+        columnas (list, optional): Recursos a contar. Defaults to COLUMNAS_COBERTURA.
+
+    Returns:
+        pandas.DataFrame: Índice (UNIDAD, HORA) con las unidades presentes en el
+            orden de UNIDADES_ORDEN y las horas 0 a 23; una columna por recurso.
+            Los servicios sin horario válido no se cuentan.
+    """
+    columnas = [col for col in (COLUMNAS_COBERTURA if columnas is None else columnas) if col in df.columns]
+
+    inicio = pd.to_numeric(df['HORA INICIO'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    fin = pd.to_numeric(df['HORA FIN'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    con_horario = ~(np.isnan(inicio) | np.isnan(fin))
+
+    unidades = clasificar_columna_unidades(df['UNIDAD']).codes[con_horario]
+    recursos = np.column_stack([
+        pd.to_numeric(df[col], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)[con_horario]
+        for col in columnas
+    ]) if columnas else np.zeros((int(con_horario.sum()), 0))
+    recursos = np.nan_to_num(recursos)
+
+    # Arreglo de diferencias: +recursos en la primera hora, -recursos al terminar
+    fila, hora_inicio, hora_fin = tramos_horarios(inicio[con_horario], fin[con_horario])
+    diferencias = np.zeros((len(UNIDADES_ORDEN), HORAS_DIA + 1, len(columnas)))
+    np.add.at(diferencias, (unidades[fila], hora_inicio), recursos[fila])
+    np.add.at(diferencias, (unidades[fila], hora_fin), -recursos[fila])
+    cobertura = np.cumsum(diferencias, axis=1)[:, :HORAS_DIA, :]
+
+    if 'FECHA' in df.columns:
+        dias = pd.to_datetime(df['FECHA'], errors='coerce').dt.normalize().nunique()
+        if dias > 1:
+            cobertura = cobertura / dias
+
+    presentes = np.flatnonzero(np.bincount(unidades, minlength=len(UNIDADES_ORDEN)))
+    indice = pd.MultiIndex.from_product(
+        [[UNIDADES_ORDEN[i] for i in presentes], range(HORAS_DIA)], names=['UNIDAD', 'HORA']
+    )
+    return pd.DataFrame(cobertura[presentes].reshape(-1, len(columnas)), index=indice, columns=columnas)
+
+def _formatear_valor(valor):
+    """Muestra los enteros sin decimales y los promedios con uno."""
+    return str(int(round(valor))) if abs(valor - round(valor)) < 0.05 else f"{valor:.1f}"
+
+def generar_analisis_cobertura(datos, estilos, estilos_parrafo):
+    """
+    Genera el análisis de cobertura horaria para el reporte de cumplimiento.
+
+    Args:
+        datos (DatasetPreparado): Datos preparados (la cobertura queda memorizada).
+        estilos (dict): Diccionario con los estilos para las tablas.
+        estilos_parrafo (dict): Diccionario con los estilos para los párrafos.
+
+    Returns:
+        list: Lista de elementos para el PDF (párrafos, tablas, etc.).
+    """
+    elementos = []
+
+    # Verificar si existen las columnas necesarias
+    if not all(col in datos.columns for col in ['UNIDAD', 'HORA INICIO', 'HORA FIN']):
+        return elementos
+
+    cobertura = datos.memorizar('cobertura_horaria', lambda: calcular_cobertura_horaria(datos.numerico))
+    if cobertura.empty or not len(cobertura.columns):
+        return elementos
+
+    # Título de la sección
+    elementos.append(Paragraph("COBERTURA HORARIA", estilos_parrafo['subtitle']))
+    elementos.append(Spacer(1, 0.3*cm))
+
+    promedio = 'FECHA' in datos.columns and datos.numerico['FECHA'].dt.normalize().nunique() > 1
+    elementos.append(Paragraph(
+        "Recursos en servicio en cada hora del día"
+        + (" (promedio por día)" if promedio else "")
+        + ". Un servicio cuenta en cada hora en la que está activo, aunque sea en parte; "
+        "los que cruzan la medianoche cuentan antes y después de ella.",
+        estilos_parrafo['normal']
+    ))
+    elementos.append(Spacer(1, 0.3*cm))
+
+    encabezados = ["HORA"] + [NOMBRES_RECURSOS.get(col, col) for col in cobertura.columns]
+    anchos = [4*cm] + [3*cm] * len(cobertura.columns)
+
+    # Una tabla por unidad, con la hora de mayor cobertura al final
+    for unidad, tabla in cobertura.groupby(level='UNIDAD', sort=False):
+        valores = tabla.to_numpy()
+        datos_tabla = [
+            [f"{hora:02d}:00 - {(hora + 1) % HORAS_DIA:02d}:00"] + [_formatear_valor(v) for v in fila]
+            for hora, fila in enumerate(valores)
+        ]
+        datos_tabla.append(["MÁXIMO"] + [_formatear_valor(v) for v in valores.max(axis=0)])
+
+        elementos.append(Paragraph(f"<b>{obtener_nombre_unidad(unidad)}</b>", estilos_parrafo['normal']))
+        elementos.append(Spacer(1, 0.2*cm))
+        elementos.append(crear_tabla_con_estilo(datos_tabla, encabezados, colWidths=anchos))
+        elementos.append(Spacer(1, 0.5*cm))
+
+    # Gráfica del personal en servicio por hora (todas las unidades)
+    if 'PP.SS TOTAL' in cobertura.columns:
+        personal = cobertura['PP.SS TOTAL'].groupby(level='HORA').sum()
+        personal_por_hora = {f"{hora:02d}": round(float(valor), 1) for hora, valor in personal.items()}
+        elementos.append(crear_grafica_lineas_tiempo(
+            personal_por_hora,
+            "Personal en Servicio por Hora",
+            "Hora",
+            "Cantidad de Personal"
+        ))
+        elementos.append(Spacer(1, 0.5*cm))
+
+    return elementos
@@ -10,12 +10,12 @@ from charts import crear_grafica_barras, crear_grafica_pastel
 
 from report_services.utils import crear_tabla_con_estilo
 
-def generar_analisis_por_tipo_operativo(df, estilos, estilos_parrafo):
+def generar_analisis_por_tipo_operativo(datos, estilos, estilos_parrafo):
     """
     Genera el análisis por tipo de operativo para el reporte de cumplimiento.
     
     Args:
-        df (pandas.DataFrame): DataFrame con los datos de despliegues operativos.
+        datos (DatasetPreparado): Datos preparados (el agrupamiento queda memorizado).
         estilos (dict): Diccionario con los estilos para las tablas.
         estilos_parrafo (dict): Diccionario con los estilos para los párrafos.
         
@@ -25,7 +25,7 @@ def generar_analisis_por_tipo_operativo(df, estilos, estilos_parrafo):
     elementos = []
     
     # Verificar si existe la columna TIPO OPERATIVO
-    if 'TIPO OPERATIVO' not in df.columns:
+    if 'TIPO OPERATIVO' not in datos.columns:
         return elementos
     
     # Título de la sección
@@ -33,12 +33,12 @@ def generar_analisis_por_tipo_operativo(df, estilos, estilos_parrafo):
     elementos.append(Spacer(1, 0.3*cm))
     
     # Agrupar por tipo de operativo
-    df_tipo_op = df.groupby('TIPO OPERATIVO').agg({
+    df_tipo_op = datos.agregado('TIPO OPERATIVO', {
         'NOMBRE OPERATIVO': 'count',
         'PP.SS TOTAL': 'sum',
         'MOVILES': 'sum',
         'MOTOS': 'sum'
-    }).reset_index()
+    })
     
     # Renombrar columnas
     df_tipo_op = df_tipo_op.rename(columns={
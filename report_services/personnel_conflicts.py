@@ -0,0 +1,293 @@
+"""
+Módulo para detectar matrículas asignadas a servicios superpuestos.
+
+Las columnas MATRICULA 1 a MATRICULA 10 se pasan a formato largo (una
+entrada por fila y matrícula) y cada servicio se ubica en un eje de minutos
+absolutos: el día (FECHA, si existe) por 1440 más la hora. Un servicio que
+cruza la medianoche termina al día siguiente, de modo que choca también con
+los de la mañana siguiente.
+
+Los choques se buscan ordenando las entradas por matrícula e inicio y
+recorriéndolas con el máximo acumulado del fin de las anteriores: una
+entrada que empieza antes de ese máximo se superpone con la que lo fijó.
+Esto cuesta O(n log n), en lugar de comparar todos los pares de servicios.
+"""
+
+import numpy as np
+import pandas as pd
+from reportlab.platypus import Paragraph, Spacer, PageBreak, Table, TableStyle
+from reportlab.lib import colors
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import cm
+
+from config import COLUMNAS_MATRICULA
+from data_utils import DatasetPreparado
+from utils import minutos_a_hora
+from report_services.coverage_analysis import MINUTOS_DIA
+
+# Columnas de la tabla de conflictos
+COLUMNAS_CONFLICTOS = ["MATRICULA", "FILA", "FILA CONFLICTO"]
+
+# Valores que no identifican a nadie
+_SIN_MATRICULA = {"", "0", "NAN", "NONE", "-"}
+
+def _normalizar_matriculas(valores):
+    """
+    Texto de cada matrícula sin espacios sobrantes ni minúsculas ("" si no hay).
+
+    Args:
+        valores (pandas.Index): Valores distintos de una columna de matrículas.
+
+    Returns:
+        numpy.ndarray: Texto normalizado de cada valor.
+    """
+    serie = pd.Series(valores)
+    numeros = pd.to_numeric(serie, errors='coerce')
+    # Los números enteros leídos como decimales (829010.0) se escriben sin decimales
+    enteros = numeros.notna() & (numeros % 1 == 0)
+    if enteros.all():
+        texto = numeros.astype('int64').astype(str)
+    else:
+        texto = serie.astype(str).str.replace(r'\s+', ' ', regex=True).str.strip().str.upper()
+        texto = texto.where(~enteros, numeros.where(enteros, 0).astype('int64').astype(str))
+    return texto.where(~texto.isin(_SIN_MATRICULA) & serie.notna(), "").to_numpy(dtype=object)
+
+def hay_matriculas(df):
+    """
+    Indica si alguna columna de matrículas tiene al menos una matrícula.
+
+    formatear_datos agrega vacías las columnas esperadas que faltan, por lo
+    que no basta con que las columnas existan.
+
+    Args:
+        df (pandas.DataFrame): Datos de despliegues.
+
+    Returns:
+        bool: True si hay alguna matrícula que no sea vacía, 0 o "-".
+    """
+    for col in COLUMNAS_MATRICULA:
+        if col not in df.columns:
+            continue
+        distintos = pd.Index(df[col].dropna().unique())
+        if len(distintos) and (_normalizar_matriculas(distintos) != "").any():
+            return True
+    return False
+
+def matriculas_en_formato_largo(df):
+    """
+    Pasa las columnas de matrículas a una entrada por fila y matrícula.
+
+    Cada valor distinto de cada columna se normaliza una sola vez; las
+    matrículas se representan con códigos enteros.
+
+    Args:
+        df (pandas.DataFrame): Datos con las columnas de COLUMNAS_MATRICULA.
+
+    Returns:
+        tuple: (fila, matricula, nombres) - posición de la fila de cada
+            entrada, código de su matrícula y texto de cada código. Una
+            matrícula repetida en dos columnas de la fila aparece dos veces.
+    """
+    columnas = [col for col in COLUMNAS_MATRICULA if col in df.columns]
+    codigos_columna = []
+    textos = []
+    for col in columnas:
+        codigos, distintos = pd.factorize(df[col])
+        codigos_columna.append(codigos)
+        textos.append(np.append(_normalizar_matriculas(distintos), np.array([""], dtype=object)))
+
+    # Códigos comunes a todas las columnas (el texto vacío queda fuera)
+    codigos_globales, nombres = pd.factorize(np.concatenate(textos) if textos else np.array([], dtype=object))
+    vacio = int(np.flatnonzero(nombres == "")[0]) if len(nombres) else -1
+
+    filas, matriculas = [], []
+    desplazamiento = 0
+    for codigos, texto in zip(codigos_columna, textos):
+        # Los faltantes (código -1) apuntan al texto vacío del final
+        locales = codigos_globales[desplazamiento:desplazamiento + len(texto)]
+        matricula = locales[np.where(codigos < 0, len(texto) - 1, codigos)]
+        con_valor = matricula != vacio
+        filas.append(np.flatnonzero(con_valor))
+        matriculas.append(matricula[con_valor])
+        desplazamiento += len(texto)
+
+    fila = np.concatenate(filas) if filas else np.array([], dtype=np.int64)
+    matricula = np.concatenate(matriculas) if matriculas else np.array([], dtype=np.int64)
+    return fila, matricula, np.asarray(nombres, dtype=object)
+
+def intervalos_absolutos(df):
+    """
+    Ubica cada servicio en el eje de minutos absolutos.
+
+    Args:
+        df (pandas.DataFrame): Datos con HORA INICIO, HORA FIN y, si existe, FECHA.
+
+    Returns:
+        tuple: (inicio, fin) en minutos; NaN si el servicio no tiene horario.
+            Si el fin es anterior al inicio el servicio termina al día
+            siguiente y, si coinciden, dura 24 horas.
+    """
+    inicio = pd.to_numeric(df['HORA INICIO'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan) % MINUTOS_DIA
+    fin = pd.to_numeric(df['HORA FIN'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan) % MINUTOS_DIA
+    fin = np.where(fin <= inicio, fin + MINUTOS_DIA, fin)
+
+    if 'FECHA' in df.columns:
+        fechas = pd.to_datetime(df['FECHA'], errors='coerce')
+        # Días desde 1970 (0 si falta la fecha)
+        dias = (fechas.dt.normalize() - pd.Timestamp(0)).dt.days.to_numpy(dtype='float64', na_value=0)
+        inicio = inicio + dias * MINUTOS_DIA
+        fin = fin + dias * MINUTOS_DIA
+    return inicio, fin
+
+def detectar_conflictos(df):
+    """
+    Detecta las matrículas asignadas a dos servicios que se superponen.
+
+    Args:
+        df (pandas.DataFrame): Datos con las columnas de matrículas y horarios.
+
+    Returns:
+        pandas.DataFrame: Una fila por servicio en conflicto, con las columnas
+            de COLUMNAS_CONFLICTOS: la matrícula, la posición de la fila y la
+            posición de un servicio anterior que se superpone con ella (el de
+            fin más tardío). Servicios que solo se tocan (uno termina cuando
+            empieza el otro) no están en conflicto.
+    """
+    vacio = pd.DataFrame({col: pd.Series(dtype='int64') for col in COLUMNAS_CONFLICTOS}).astype({'MATRICULA': object})
+    if not {'HORA INICIO', 'HORA FIN'} <= set(df.columns) or df.empty:
+        return vacio
+
+    fila, matricula, nombres = matriculas_en_formato_largo(df)
+    inicio, fin = intervalos_absolutos(df)
+    con_horario = ~np.isnan(inicio[fila]) & ~np.isnan(fin[fila])
+    fila, matricula = fila[con_horario], matricula[con_horario]
+    if not len(fila):
+        return vacio
+
+    # Ordenar por matrícula y, dentro de cada una, por inicio (y fila, para
+    # que la misma matrícula repetida en una fila quede junta y se descarte)
+    orden = np.lexsort((fila, inicio[fila], matricula))
+    fila, matricula = fila[orden], matricula[orden]
+    unica = np.r_[True, (matricula[1:] != matricula[:-1]) | (fila[1:] != fila[:-1])]
+    fila, matricula = fila[unica], matricula[unica]
+    inicio_orden, fin_orden = inicio[fila], fin[fila]
+
+    # Máximo acumulado del fin dentro de cada matrícula
+    fin_maximo = pd.Series(fin_orden).groupby(matricula).cummax().to_numpy()
+    primero = np.r_[True, matricula[1:] != matricula[:-1]]
+    fin_anterior = np.r_[-np.inf, fin_maximo[:-1]]
+    en_conflicto = ~primero & (inicio_orden < fin_anterior)
+
+    # Entrada que fijó el máximo anterior: la última que lo alcanzó
+    posiciones = np.arange(len(fila))
+    lider = np.maximum.accumulate(np.where(fin_orden == fin_maximo, posiciones, 0))
+    pareja = np.r_[0, lider[:-1]]
+
+    return pd.DataFrame({
+        'MATRICULA': nombres[matricula[en_conflicto]],
+        'FILA': fila[en_conflicto],
+        'FILA CONFLICTO': fila[pareja[en_conflicto]]
+    }, columns=COLUMNAS_CONFLICTOS)
+
+def obtener_conflictos(datos):
+    """
+    Obtiene los conflictos de matrículas de un conjunto preparado (quedan memorizados).
+
+    La vista previa y el anexo del PDF comparten así una sola detección.
+
+    Args:
+        datos (DatasetPreparado | pandas.DataFrame): Datos de despliegues.
+
+    Returns:
+        pandas.DataFrame: Resultado de detectar_conflictos sobre datos.df_completo.
+    """
+    datos = DatasetPreparado.desde_dataframe(datos)
+    return datos.memorizar('conflictos_matriculas', lambda: detectar_conflictos(datos.df_completo))
+
+def _describir_servicios(df):
+    """Texto "UNIDAD - operativo (HH:MM a HH:MM)" de cada fila."""
+    nombre = next((col for col in ['NOMBRE OPERATIVO', 'NOMBRE ORDEN', 'TIPO OPERATIVO'] if col in df.columns), None)
+    unidad = df['UNIDAD'].astype(str) if 'UNIDAD' in df.columns else pd.Series('', index=df.index)
+    operativo = df[nombre].astype(str).fillna('') if nombre else pd.Series('', index=df.index)
+    horario = (
+        minutos_a_hora(pd.to_numeric(df['HORA INICIO'], errors='coerce')).astype(str)
+        + " a " + minutos_a_hora(pd.to_numeric(df['HORA FIN'], errors='coerce')).astype(str)
+    )
+    return (unidad + " - " + operativo + " (" + horario + ")").to_numpy(dtype=object)
+
+def tabla_conflictos(df, conflictos):
+    """
+    Describe los conflictos para mostrarlos.
+
+    Args:
+        df (pandas.DataFrame): Datos en los que se detectaron los conflictos.
+        conflictos (pandas.DataFrame): Resultado de detectar_conflictos.
+
+    Returns:
+        pandas.DataFrame: Columnas MATRICULA, FECHA (si existe), SERVICIO y
+            EN CONFLICTO CON, ordenadas por matrícula.
+    """
+    filas = np.unique(np.concatenate([conflictos['FILA'], conflictos['FILA CONFLICTO']])).astype(np.int64)
+    descripciones = pd.Series(_describir_servicios(df.iloc[filas]), index=filas)
+    tabla = pd.DataFrame({'MATRICULA': conflictos['MATRICULA'].to_numpy()})
+    if 'FECHA' in df.columns:
+        tabla['FECHA'] = pd.to_datetime(df['FECHA'].iloc[conflictos['FILA']], errors='coerce').dt.strftime('%d/%m/%Y').fillna('').to_numpy()
+    tabla['SERVICIO'] = descripciones.loc[conflictos['FILA']].to_numpy()
+    tabla['EN CONFLICTO CON'] = descripciones.loc[conflictos['FILA CONFLICTO']].to_numpy()
+    return tabla.sort_values('MATRICULA', kind='stable', ignore_index=True)
+
+def generar_anexo_conflictos(datos, estilos, estilos_parrafo):
+    """
+    Genera el anexo de conflictos de matrículas para el PDF.
+
+    Args:
+        datos (DatasetPreparado): Datos preparados (los conflictos quedan memorizados).
+        estilos (dict): Diccionario con los estilos para las tablas.
+        estilos_parrafo (dict): Diccionario con los estilos para los párrafos.
+
+    Returns:
+        list: Lista de elementos para el PDF (párrafos, tablas, etc.).
+    """
+    elementos = []
+
+    if not hay_matriculas(datos.df_completo):
+        return elementos
+
+    conflictos = obtener_conflictos(datos)
+
+    elementos.append(PageBreak())
+    elementos.append(Paragraph("ANEXO: CONFLICTOS DE MATRÍCULAS", estilos_parrafo['subtitle']))
+    elementos.append(Spacer(1, 0.3*cm))
+
+    if conflictos.empty:
+        elementos.append(Paragraph("Ninguna matrícula está asignada a dos servicios superpuestos.", estilos_parrafo['normal']))
+        return elementos
+
+    elementos.append(Paragraph(
+        f"{len(conflictos)} asignaciones de {conflictos['MATRICULA'].nunique()} matrículas se superponen "
+        "con otro servicio de la misma matrícula.",
+        estilos_parrafo['normal']
+    ))
+    elementos.append(Spacer(1, 0.3*cm))
+
+    # Celdas como párrafos para que las descripciones largas se ajusten
+    tabla = tabla_conflictos(datos.df_completo, conflictos)
+    estilo_celda = ParagraphStyle('celda_conflicto', parent=estilos_parrafo['normal'], fontSize=8, leading=10)
+    anchos = {'MATRICULA': 2.5*cm, 'FECHA': 2.2*cm, 'SERVICIO': 6.3*cm, 'EN CONFLICTO CON': 6.3*cm}
+    filas = [list(tabla.columns)] + [
+        [Paragraph(str(valor), estilo_celda) for valor in fila] for fila in tabla.itertuples(index=False)
+    ]
+    tabla_pdf = Table(filas, colWidths=[anchos[col] for col in tabla.columns], repeatRows=1)
+    tabla_pdf.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.Color(0.8, 0.6, 0.0)),  # Color dorado para encabezado
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 9),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ]))
+    elementos.append(tabla_pdf)
+    elementos.append(Spacer(1, 0.5*cm))
+
+    return elementos
@@ -0,0 +1,241 @@
+"""
+Módulo para el análisis por seccional en los reportes de cumplimiento.
+
+La columna SECC. puede tener varias seccionales separadas por comas ("5, 9,
+10"). Se analiza una sola vez y se guarda como un índice invertido: para cada
+número de seccional, las posiciones de las filas que la incluyen, en arreglos
+enteros compactos (formato CSR: un arreglo de filas ordenado por seccional y
+los punteros al comienzo de cada una). Las consultas por seccional son una
+búsqueda en ese índice y no recorren el texto de todas las filas.
+"""
+
+import numpy as np
+import pandas as pd
+from reportlab.platypus import Paragraph, Spacer
+from reportlab.lib.units import cm
+
+from config import COLUMNAS_COBERTURA
+from data_utils import DatasetPreparado
+from unidades_config import clasificar_columna_unidades
+from report_services.utils import crear_tabla_con_estilo
+from report_services.coverage_analysis import NOMBRES_RECURSOS, servicios_activos
+
+# Columna con las seccionales de cada servicio
+COLUMNA_SECCIONAL = "SECC."
+
+class IndiceSeccional:
+    """
+    Índice invertido de seccional a filas.
+
+    Las filas de la seccional `seccionales[i]` son
+    `filas[punteros[i]:punteros[i + 1]]`, en su orden original. Una fila con
+    varias seccionales aparece en cada una; las filas sin seccional no están.
+    """
+
+    def __init__(self, seccionales, punteros, filas):
+        """
+        Args:
+            seccionales (numpy.ndarray): Números de seccional, ordenados (int32).
+            punteros (numpy.ndarray): Comienzo de cada seccional en `filas` (int64).
+            filas (numpy.ndarray): Posiciones de las filas (int32).
+        """
+        self.seccionales = seccionales
+        self.punteros = punteros
+        self.filas = filas
+
+    @classmethod
+    def desde_serie(cls, serie):
+        """
+        Construye el índice a partir de la columna SECC.
+
+        Cada texto distinto se separa una sola vez (se toman los números que
+        contiene); luego las filas se expanden por código, sin recorrerlas.
+
+        Args:
+            serie (pandas.Series): Columna SECC. (texto, vacío si no hay seccional).
+
+        Returns:
+            IndiceSeccional: Índice de las filas por seccional.
+        """
+        codigos, distintos = pd.factorize(serie)
+
+        # Números de cada texto distinto: (texto, seccional) sin repetir. Los
+        # números se toman completos ("15.0" es la seccional 15, no 15 y 0)
+        # y se descartan los que no son enteros
+        partes = pd.Series(np.asarray(distintos, dtype=object)).astype(str).str.findall(r'\d+(?:\.\d+)?').explode()
+        numeros = pd.to_numeric(partes, errors='coerce')
+        numeros = numeros.where(numeros % 1 == 0)
+        pares = pd.DataFrame({'texto': partes.index, 'seccional': numeros}).dropna().drop_duplicates()
+        texto_par = pares['texto'].to_numpy(dtype=np.int64)
+        seccional_par = pares['seccional'].to_numpy(dtype=np.int32)
+
+        # Los pares quedan agrupados por texto: comienzo y cantidad de cada uno
+        cantidad_texto = np.bincount(texto_par, minlength=len(distintos) + 1)
+        comienzo_texto = np.cumsum(cantidad_texto) - cantidad_texto
+
+        # Expandir cada fila en tantas entradas como seccionales tiene su texto
+        # (los faltantes, código -1, van al texto vacío del final)
+        codigos = np.where(codigos < 0, len(distintos), codigos)
+        cantidad_fila = cantidad_texto[codigos]
+        fila = np.repeat(np.arange(len(codigos), dtype=np.int32), cantidad_fila)
+        desplazamiento = np.arange(len(fila)) - np.repeat(np.cumsum(cantidad_fila) - cantidad_fila, cantidad_fila)
+        seccional = seccional_par[np.repeat(comienzo_texto[codigos], cantidad_fila) + desplazamiento]
+
+        # Ordenar por seccional (estable: cada seccional conserva el orden de filas)
+        orden = np.argsort(seccional, kind='stable')
+        seccionales, cantidades = np.unique(seccional, return_counts=True)
+        punteros = np.concatenate([[0], np.cumsum(cantidades)]).astype(np.int64)
+        return cls(seccionales.astype(np.int32), punteros, fila[orden])
+
+    def __len__(self):
+        return len(self.seccionales)
+
+    @property
+    def cantidades(self):
+        """numpy.ndarray: Número de filas de cada seccional."""
+        return np.diff(self.punteros)
+
+    def filas_de(self, seccional):
+        """
+        Devuelve las filas de una seccional.
+
+        Args:
+            seccional (int): Número de seccional.
+
+        Returns:
+            numpy.ndarray: Posiciones de sus filas (vacío si no tiene ninguna).
+        """
+        i = np.searchsorted(self.seccionales, seccional)
+        if i == len(self.seccionales) or self.seccionales[i] != seccional:
+            return self.filas[:0]
+        return self.filas[self.punteros[i]:self.punteros[i + 1]]
+
+def obtener_indice_seccional(datos):
+    """
+    Obtiene el índice por seccional de un conjunto preparado (queda memorizado).
+
+    Args:
+        datos (DatasetPreparado | pandas.DataFrame): Datos de despliegues.
+
+    Returns:
+        IndiceSeccional: Índice sobre las filas de datos.df_completo, o None
+            si no existe la columna SECC.
+    """
+    datos = DatasetPreparado.desde_dataframe(datos)
+    if COLUMNA_SECCIONAL not in datos.columns:
+        return None
+    return datos.memorizar(
+        'indice_seccional', lambda: IndiceSeccional.desde_serie(datos.df_completo[COLUMNA_SECCIONAL])
+    )
+
+def despliegues_en_seccional(datos, seccional, minuto=None):
+    """
+    Obtiene los despliegues de una seccional, opcionalmente activos a una hora.
+
+    Args:
+        datos (DatasetPreparado | pandas.DataFrame): Datos de despliegues.
+        seccional (int): Número de seccional.
+        minuto (int, optional): Minuto del día (por ejemplo 22*60 para las
+            22:00); solo se devuelven los servicios activos en ese momento.
+            Defaults to None (todos).
+
+    Returns:
+        pandas.DataFrame: Filas de datos.df_completo de la seccional.
+    """
+    datos = DatasetPreparado.desde_dataframe(datos)
+    indice = obtener_indice_seccional(datos)
+    if indice is None:
+        return datos.df_completo.iloc[:0]
+
+    filas = indice.filas_de(seccional)
+    df = datos.df_completo
+    if minuto is not None and 'HORA INICIO' in df.columns and 'HORA FIN' in df.columns:
+        # Solo se miran los horarios de las filas de la seccional
+        inicio = pd.to_numeric(df['HORA INICIO'].iloc[filas], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        fin = pd.to_numeric(df['HORA FIN'].iloc[filas], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        filas = filas[servicios_activos(inicio, fin, minuto)]
+    return df.iloc[filas]
+
+def resumen_por_seccional(df, indice, columnas=None):
+    """
+    Calcula los totales de cada seccional a partir del índice.
+
+    Args:
+        df (pandas.DataFrame): Datos numéricos (filas en las posiciones del índice).
+        indice (IndiceSeccional): Índice por seccional de df.
+        columnas (list, optional): Recursos a sumar. Defaults to COLUMNAS_COBERTURA.
+
+    Returns:
+        pandas.DataFrame: Índice SECC.; columnas SERVICIOS, UNIDADES (unidades
+            distintas) y la suma de cada recurso.
+    """
+    columnas = [col for col in (COLUMNAS_COBERTURA if columnas is None else columnas) if col in df.columns]
+    resumen = pd.DataFrame(
+        {'SERVICIOS': indice.cantidades}, index=pd.Index(indice.seccionales, name=COLUMNA_SECCIONAL)
+    )
+    if not len(indice):
+        return resumen.assign(UNIDADES=0, **{col: 0 for col in columnas})
+
+    # Sumas por tramo del índice (cada seccional tiene al menos una fila)
+    for col in columnas:
+        valores = pd.to_numeric(df[col], errors='coerce').fillna(0).to_numpy(dtype='float64')
+        resumen[col] = np.add.reduceat(valores[indice.filas], indice.punteros[:-1])
+
+    # Unidades distintas: pares (seccional, unidad) únicos
+    if 'UNIDAD' in df.columns:
+        unidades = clasificar_columna_unidades(df['UNIDAD']).codes.astype(np.int64)
+        seccional_entrada = np.repeat(np.arange(len(indice)), indice.cantidades)
+        pares = np.unique(seccional_entrada * (unidades.max() + 1) + unidades[indice.filas])
+        resumen.insert(1, 'UNIDADES', np.bincount(pares // (unidades.max() + 1), minlength=len(indice)))
+    return resumen
+
+def generar_analisis_seccional(datos, estilos, estilos_parrafo):
+    """
+    Genera el análisis por seccional para el reporte de cumplimiento.
+
+    Args:
+        datos (DatasetPreparado): Datos preparados (el índice queda memorizado).
+        estilos (dict): Diccionario con los estilos para las tablas.
+        estilos_parrafo (dict): Diccionario con los estilos para los párrafos.
+
+    Returns:
+        list: Lista de elementos para el PDF (párrafos, tablas, etc.).
+    """
+    elementos = []
+
+    indice = obtener_indice_seccional(datos)
+    if indice is None or not len(indice):
+        return elementos
+
+    resumen = datos.memorizar('resumen_seccional', lambda: resumen_por_seccional(datos.numerico, indice))
+
+    # Título de la sección
+    elementos.append(Paragraph("ANÁLISIS POR SECCIONAL", estilos_parrafo['subtitle']))
+    elementos.append(Spacer(1, 0.3*cm))
+
+    con_seccional = np.unique(indice.filas)
+    sin_seccional = len(datos.df_completo) - len(con_seccional)
+    texto = "Servicios y recursos desplegados en cada seccional. Un servicio asignado a varias seccionales se cuenta en cada una."
+    if sin_seccional:
+        texto += f" {sin_seccional} servicios no tienen seccional registrada."
+    elementos.append(Paragraph(texto, estilos_parrafo['normal']))
+    elementos.append(Spacer(1, 0.3*cm))
+
+    encabezados = ["SECCIONAL"] + [NOMBRES_RECURSOS.get(col, col) for col in resumen.columns]
+    datos_tabla = [
+        [str(seccional)] + [str(int(valor)) for valor in fila]
+        for seccional, fila in zip(resumen.index, resumen.to_numpy())
+    ]
+
+    # Fila de totales: cada servicio una sola vez, aunque tenga varias seccionales
+    df_total = datos.numerico.iloc[con_seccional]
+    totales = {'SERVICIOS': len(df_total)}
+    if 'UNIDADES' in resumen.columns:
+        totales['UNIDADES'] = len(np.unique(clasificar_columna_unidades(df_total['UNIDAD']).codes))
+    totales.update({col: df_total[col].sum() for col in resumen.columns if col not in totales})
+    datos_tabla.append(["TOTAL"] + [str(int(totales[col])) for col in resumen.columns])
+    anchos = [3*cm] + [2.5*cm] * len(resumen.columns)
+    elementos.append(crear_tabla_con_estilo(datos_tabla, encabezados, colWidths=anchos))
+    elementos.append(Spacer(1, 0.5*cm))
+
+    return elementos
@@ -2,17 +2,17 @@
 Módulo para el análisis temporal en los reportes de cumplimiento.
 """
 
-import pandas as pd
 from reportlab.platypus import Paragraph, Spacer
 from reportlab.lib.units import cm
 from charts import crear_grafica_lineas_tiempo
 
-def generar_analisis_temporal(df, estilos_parrafo):
+def generar_analisis_temporal(datos, estilos_parrafo):
     """
     Genera el análisis temporal para el reporte de cumplimiento.
     
     Args:
-        df (pandas.DataFrame): DataFrame con los datos de despliegues operativos.
+        datos (DatasetPreparado): Datos preparados (FECHA ya convertida a fecha y el
+            agrupamiento por día memorizado).
         estilos_parrafo (dict): Diccionario con los estilos para los párrafos.
         
     Returns:
@@ -21,22 +21,18 @@ def generar_analisis_temporal(df, estilos_parrafo):
     elementos = []
     
     # Verificar si existe la columna FECHA
-    if 'FECHA' not in df.columns:
+    if 'FECHA' not in datos.columns:
         return elementos
     
     # Título de la sección
     elementos.append(Paragraph("EVOLUCIÓN TEMPORAL DE SERVICIOS", estilos_parrafo['subtitle']))
     elementos.append(Spacer(1, 0.3*cm))
     
-    # Convertir FECHA a datetime si no lo es
-    if not pd.api.types.is_datetime64_any_dtype(df['FECHA']):
-        df['FECHA'] = pd.to_datetime(df['FECHA'], errors='coerce')
-    
-    # Agrupar por fecha
-    df_fechas = df.groupby(df['FECHA'].dt.date).agg({
+    # Agrupar por fecha (día)
+    df_fechas = datos.agregado('FECHA', {
         'NOMBRE OPERATIVO': 'count',
         'PP.SS TOTAL': 'sum'
-    }).reset_index()
+    })
     
     # Renombrar columnas
     df_fechas = df_fechas.rename(columns={
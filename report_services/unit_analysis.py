@@ -10,12 +10,12 @@ from charts import crear_grafica_barras, crear_grafica_pastel
 
 from report_services.utils import crear_tabla_con_estilo
 
-def generar_analisis_por_unidad(df, estilos, estilos_parrafo):
+def generar_analisis_por_unidad(datos, estilos, estilos_parrafo):
     """
     Genera el análisis por unidad para el reporte de cumplimiento.
     
     Args:
-        df (pandas.DataFrame): DataFrame con los datos de despliegues operativos.
+        datos (DatasetPreparado): Datos preparados (el agrupamiento queda memorizado).
         estilos (dict): Diccionario con los estilos para las tablas.
         estilos_parrafo (dict): Diccionario con los estilos para los párrafos.
         
@@ -25,7 +25,7 @@ def generar_analisis_por_unidad(df, estilos, estilos_parrafo):
     elementos = []
     
     # Verificar si existe la columna UNIDAD
-    if 'UNIDAD' not in df.columns:
+    if 'UNIDAD' not in datos.columns:
         return elementos
     
     # Título de la sección
@@ -33,12 +33,12 @@ def generar_analisis_por_unidad(df, estilos, estilos_parrafo):
     elementos.append(Spacer(1, 0.3*cm))
     
     # Agrupar por unidad
-    df_unidad = df.groupby('UNIDAD').agg({
+    df_unidad = datos.agregado('UNIDAD', {
         'NOMBRE OPERATIVO': 'count',
         'PP.SS TOTAL': 'sum',
         'MOVILES': 'sum',
         'MOTOS': 'sum'
-    }).reset_index()
+    })
     
     # Renombrar columnas
     df_unidad = df_unidad.rename(columns={
@@ -102,7 +102,9 @@ def generar_graficas_por_unidad(df_unidad):
     servicios_por_unidad = dict(zip(df_unidad['UNIDAD'], df_unidad['SERVICIOS']))
     grafica_servicios = crear_grafica_barras(
         servicios_por_unidad,
-        "Servicios por Unidad"
+        "Servicios por Unidad",
+        "Unidad",
+        "Cantidad de Servicios"
     )
     elementos.append(grafica_servicios)
     elementos.append(Spacer(1, 0.5*cm))
@@ -111,7 +113,9 @@ def generar_graficas_por_unidad(df_unidad):
     personal_por_unidad = dict(zip(df_unidad['UNIDAD'], df_unidad['PERSONAL']))
     grafica_personal = crear_grafica_barras(
         personal_por_unidad,
-        "Personal por Unidad"
+        "Personal por Unidad",
+        "Unidad",
+        "Cantidad de Personal"
     )
     elementos.append(grafica_personal)
     elementos.append(Spacer(1, 0.5*cm))
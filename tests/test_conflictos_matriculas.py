@@ -0,0 +1,95 @@
+"""Pruebas de la detección de conflictos de matrículas (report_services.personnel_conflicts)."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import COLUMNAS_MATRICULA
+from ingestion.compact import compactar_dataframe
+from utils import formatear_datos
+from report_services.personnel_conflicts import (
+    detectar_conflictos, hay_matriculas, intervalos_absolutos, matriculas_en_formato_largo
+)
+
+def _por_pares(df):
+    """
+    Referencia por fuerza bruta: compara cada par de asignaciones de la misma matrícula.
+
+    Una asignación está en conflicto si se superpone con otra que empieza
+    antes (o a la vez, en una fila anterior), como en el recorrido ordenado.
+    """
+    fila, matricula, nombres = matriculas_en_formato_largo(df)
+    inicio, fin = intervalos_absolutos(df)
+    entradas = sorted({
+        (nombres[m], f) for f, m in zip(fila, matricula)
+        if not np.isnan(inicio[f]) and not np.isnan(fin[f])
+    })
+    en_conflicto = set()
+    for nombre, f in entradas:
+        for otro, g in entradas:
+            if otro != nombre or g == f:
+                continue
+            anterior = (inicio[g], g) < (inicio[f], f)
+            if anterior and inicio[g] < fin[f] and inicio[f] < fin[g]:
+                en_conflicto.add((nombre, f))
+                break
+    return en_conflicto, inicio, fin
+
+def _datos_aleatorios(filas, semilla):
+    generador = np.random.default_rng(semilla)
+    df = pd.DataFrame({
+        "UNIDAD": "DIRECCIÓN I",
+        "NOMBRE OPERATIVO": [f"OP {i}" for i in range(filas)],
+        # Horas en punto y medias horas: muchos servicios que solo se tocan
+        "HORA INICIO": generador.integers(0, 48, filas) * 30,
+        "HORA FIN": generador.integers(0, 48, filas) * 30,
+        "FECHA": pd.Timestamp("2025-03-01") + pd.to_timedelta(generador.integers(0, 3, filas), unit="D"),
+    })
+    for col in COLUMNAS_MATRICULA[:4]:
+        valores = generador.integers(0, 40, filas).astype(object)
+        # Vacíos, "0" (sin matrícula), decimales enteros y espacios sobrantes
+        valores[generador.random(filas) < 0.3] = np.nan
+        valores[generador.random(filas) < 0.05] = 0
+        valores[generador.random(filas) < 0.1] = 829010.0
+        valores[generador.random(filas) < 0.1] = " 829010 "
+        df[col] = valores
+    df.loc[generador.random(filas) < 0.05, "HORA FIN"] = np.nan
+    return df
+
+@pytest.mark.parametrize("semilla", [0, 1, 2])
+def test_igual_que_la_comparacion_por_pares(semilla):
+    df = _datos_aleatorios(300, semilla)
+    conflictos = detectar_conflictos(df)
+    esperado, inicio, fin = _por_pares(df)
+
+    assert esperado
+    assert set(zip(conflictos["MATRICULA"], conflictos["FILA"])) == esperado
+    # La fila informada como pareja tiene la misma matrícula y se superpone
+    fila, matricula, nombres = matriculas_en_formato_largo(df)
+    asignadas = set(zip(nombres[matricula], fila))
+    for nombre, f, g in conflictos.itertuples(index=False):
+        assert (nombre, g) in asignadas and g != f
+        assert inicio[g] < fin[f] and inicio[f] < fin[g]
+
+def test_servicio_nocturno_choca_con_la_manana_siguiente():
+    df = pd.DataFrame({
+        "HORA INICIO": [20 * 60, 6 * 60, 7 * 60, 8 * 60],
+        "HORA FIN": [7 * 60, 8 * 60, 9 * 60, 8 * 60],
+        "FECHA": pd.to_datetime(["2025-03-01", "2025-03-02", "2025-03-02", "2025-03-05"]),
+        "MATRICULA 1": ["A1", "a1", "B2", "A1"],
+        "MATRICULA 2": [np.nan, "B2", "-", "A1"],
+    })
+    conflictos = detectar_conflictos(df)
+
+    assert set(zip(conflictos["MATRICULA"], conflictos["FILA"])) == _por_pares(df)[0] == {("A1", 1), ("B2", 2)}
+
+def test_sin_matriculas_cargadas():
+    df = formatear_datos(pd.DataFrame({"UNIDAD": ["GEO"], "HORA INICIO": ["08:00"], "HORA FIN": ["12:00"]}))
+
+    # formatear_datos agrega las columnas de matrículas vacías
+    assert set(COLUMNAS_MATRICULA) <= set(df.columns)
+    assert not hay_matriculas(df)
+    assert not hay_matriculas(compactar_dataframe(df))
+    assert not hay_matriculas(df.assign(**{"MATRICULA 1": ["0"], "MATRICULA 2": ["-"]}))
+    assert hay_matriculas(df.assign(**{"MATRICULA 3": ["829010"]}))
+    assert detectar_conflictos(df).empty
@@ -0,0 +1,104 @@
+"""Pruebas de la lectura incremental de CSV en curso (ingestion.tail)."""
+
+import os
+
+import pytest
+
+from ingestion.tail import leer_csv_en_curso, olvidar_csv_en_curso, listar_csv_en_curso, resolver_ruta_en_curso
+
+PLANILLA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Planilla despliegues.csv")
+
+@pytest.fixture(autouse=True)
+def sin_puntos_de_control():
+    olvidar_csv_en_curso()
+    yield
+    olvidar_csv_en_curso()
+
+@pytest.fixture
+def lineas():
+    with open(PLANILLA, "rb") as archivo:
+        return archivo.read().rstrip(b"\r\n").split(b"\r\n")
+
+def _escribir(ruta, contenido, modo="wb"):
+    with open(ruta, modo) as archivo:
+        archivo.write(contenido)
+
+def test_ultima_fila_sin_salto_de_linea(tmp_path, lineas):
+    con_salto = tmp_path / "con_salto.csv"
+    sin_salto = tmp_path / "sin_salto.csv"
+    _escribir(con_salto, b"\r\n".join(lineas) + b"\r\n")
+    _escribir(sin_salto, b"\r\n".join(lineas))
+
+    esperado, agregados_esperados, _, _ = leer_csv_en_curso(str(con_salto))
+    df, agregados, filas_nuevas, completa = leer_csv_en_curso(str(sin_salto))
+
+    assert completa
+    assert len(df) == filas_nuevas == len(lineas) - 1
+    assert df.equals(esperado)
+    assert agregados.equals(agregados_esperados)
+
+def test_filas_agregadas_tras_ultima_fila_sin_salto(tmp_path, lineas):
+    ruta = tmp_path / "en_curso.csv"
+    _escribir(ruta, b"\r\n".join(lineas[:-2]))
+    leer_csv_en_curso(str(ruta))
+
+    _escribir(ruta, b"\r\n" + b"\r\n".join(lineas[-2:]), modo="ab")
+    _, _, filas_nuevas, completa = leer_csv_en_curso(str(ruta))
+    assert not completa
+    # La última línea agregada espera a que el tamaño deje de cambiar
+    assert filas_nuevas == 1
+    df, agregados, filas_nuevas, _ = leer_csv_en_curso(str(ruta))
+    assert filas_nuevas == 1
+
+    olvidar_csv_en_curso()
+    esperado, agregados_esperados, _, _ = leer_csv_en_curso(str(ruta))
+    assert df.equals(esperado)
+    assert agregados.equals(agregados_esperados)
+
+def test_linea_final_a_medio_escribir(tmp_path, lineas):
+    ruta = tmp_path / "en_curso.csv"
+    _escribir(ruta, b"\r\n".join(lineas[:-1]) + b"\r\n")
+    leer_csv_en_curso(str(ruta))
+
+    # Mientras el archivo crece, la línea sin salto queda pendiente
+    mitad = len(lineas[-1]) // 2
+    _escribir(ruta, lineas[-1][:mitad], modo="ab")
+    df, _, filas_nuevas, completa = leer_csv_en_curso(str(ruta))
+    assert not completa
+    assert filas_nuevas == 0
+    assert len(df) == len(lineas) - 2
+
+    # Cuando termina de escribirse y el tamaño no cambia, el final la cierra
+    _escribir(ruta, lineas[-1][mitad:], modo="ab")
+    _, _, filas_nuevas, _ = leer_csv_en_curso(str(ruta))
+    assert filas_nuevas == 0
+    df, _, filas_nuevas, completa = leer_csv_en_curso(str(ruta))
+    assert not completa
+    assert filas_nuevas == 1
+    assert len(df) == len(lineas) - 1
+
+def test_linea_final_que_sigue_creciendo_se_relee(tmp_path, lineas):
+    ruta = tmp_path / "en_curso.csv"
+    mitad = len(lineas[-1]) // 2
+    _escribir(ruta, b"\r\n".join(lineas[:-1]) + b"\r\n" + lineas[-1][:mitad])
+    leer_csv_en_curso(str(ruta))
+
+    # La lectura completa tomó la línea incompleta; al crecer se vuelve a leer todo
+    _escribir(ruta, lineas[-1][mitad:] + b"\r\n", modo="ab")
+    df, _, _, completa = leer_csv_en_curso(str(ruta))
+    assert completa
+    assert len(df) == len(lineas) - 1
+
+def test_solo_archivos_del_directorio_de_exportaciones(tmp_path, lineas):
+    directorio = tmp_path / "exportaciones"
+    directorio.mkdir()
+    _escribir(directorio / "despliegues.csv", b"\r\n".join(lineas))
+    _escribir(directorio / "notas.pdf", b"")
+    _escribir(tmp_path / "fuera.csv", b"\r\n".join(lineas))
+    os.symlink(tmp_path / "fuera.csv", directorio / "enlace.csv")
+
+    assert listar_csv_en_curso(str(directorio)) == ["despliegues.csv"]
+    assert resolver_ruta_en_curso("despliegues.csv", str(directorio)) == os.path.realpath(directorio / "despliegues.csv")
+    for nombre in ["../fuera.csv", str(tmp_path / "fuera.csv"), "enlace.csv", ""]:
+        with pytest.raises(ValueError):
+            resolver_ruta_en_curso(nombre, str(directorio))
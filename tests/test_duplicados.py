@@ -0,0 +1,66 @@
+"""Pruebas de la detección de duplicados entre cargas (ingestion.dedup)."""
+
+import io
+
+import pandas as pd
+
+from data_processing import depurar_filas_duplicadas
+from ingestion.dedup import IndiceDuplicados, depurar_duplicados, huella_archivo, marcar_duplicados
+
+def _carga(filas, desde=0):
+    return pd.DataFrame({
+        "UNIDAD": [f"UNIDAD {i % 7}" for i in range(desde, desde + filas)],
+        "NUMERO ORDEN": [1000 + i for i in range(desde, desde + filas)],
+        "HORA INICIO": [480] * filas,
+        "FECHA": pd.Timestamp("2025-03-01") + pd.to_timedelta(list(range(desde, desde + filas)), unit="D")
+    })
+
+def _archivo(nombre, df):
+    archivo = io.BytesIO(df.to_csv(index=False).encode())
+    archivo.name = nombre
+    return archivo
+
+def test_archivo_resubido_con_otro_nombre_no_se_vacia(tmp_path):
+    indice = IndiceDuplicados(str(tmp_path))
+    df = _carga(20)
+    depurar_duplicados(df, "eliminar", indice, huella_archivo(b"original"))
+
+    depurado, cantidad, recarga = depurar_duplicados(df, "eliminar", indice, huella_archivo(b"corregido"))
+
+    assert recarga
+    assert cantidad == 0
+    assert depurado.equals(df)
+
+def test_filas_de_otro_archivo_se_detectan(tmp_path):
+    indice = IndiceDuplicados(str(tmp_path))
+    depurar_duplicados(_carga(20), "eliminar", indice, huella_archivo(b"a"))
+
+    depurado, cantidad, recarga = depurar_duplicados(_carga(20, desde=10), "eliminar", indice, huella_archivo(b"b"))
+
+    assert not recarga
+    assert cantidad == 10
+    assert depurado["NUMERO ORDEN"].tolist() == list(range(1020, 1030))
+
+def test_mismo_nombre_con_otro_contenido_se_compara(tmp_path, monkeypatch):
+    indice = IndiceDuplicados(str(tmp_path))
+    monkeypatch.setattr("data_processing.obtener_indice_duplicados", lambda: indice)
+    primero = _carga(20)
+    segundo = _carga(20, desde=10)
+
+    depurar_filas_duplicadas(primero, _archivo("despliegues.csv", primero), "marcar")
+    _, cantidad, recarga = depurar_filas_duplicadas(segundo, _archivo("despliegues.csv", segundo), "marcar")
+
+    assert not recarga
+    assert cantidad == 10
+
+def test_vaciar_olvida_cargas_anteriores(tmp_path):
+    indice = IndiceDuplicados(str(tmp_path))
+    marcar_duplicados(_carga(20), indice, huella_archivo(b"a"))
+    assert len(IndiceDuplicados(str(tmp_path))) == 20
+
+    assert indice.vaciar()
+
+    assert len(indice) == 0
+    assert len(IndiceDuplicados(str(tmp_path))) == 0
+    duplicadas, recarga = marcar_duplicados(_carga(20, desde=10), indice, huella_archivo(b"b"))
+    assert not duplicadas.any() and not recarga
@@ -0,0 +1,102 @@
+"""Pruebas de la lectura de xlsx por bloques (utils.leer_excel_streaming)."""
+
+import io
+import os
+import tracemalloc
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+import data_processing
+from config import EXCEL_SHEETS
+from ingestion.workbook import abrir_libro
+from ingestion.compact import compactar_dataframe
+from utils import leer_excel, leer_excel_streaming, iterar_excel_streaming
+
+PLANILLA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Planilla despliegues.csv")
+
+# Columnas de un reporte parcial (proyección de columnas)
+COLUMNAS = ("UNIDAD", "NOMBRE ORDEN", "HORA INICIO", "HORA FIN", "SECC.", "MOVILES", "PP.SS TOTAL")
+
+def _libro(copias, titulo=False):
+    """Genera un xlsx con la planilla de ejemplo repetida y la UNIDAD combinada."""
+    df = pd.concat([pd.read_csv(PLANILLA)] * copias, ignore_index=True)
+    # Celdas combinadas: la UNIDAD solo figura en la primera fila de cada grupo
+    df.loc[df.index % 7 != 0, "UNIDAD"] = None
+    salida = io.BytesIO()
+    with pd.ExcelWriter(salida) as escritor:
+        df.to_excel(escritor, sheet_name="OPERATIVOS", index=False, startrow=2 if titulo else 0)
+        if titulo:
+            escritor.sheets["OPERATIVOS"]["A1"] = "DESPLIEGUES OPERATIVOS"
+    return salida.getvalue()
+
+class _CacheVacia:
+    def obtener(self, clave):
+        return None
+
+    def guardar(self, clave, df):
+        pass
+
+def test_igual_que_la_lectura_completa():
+    contenido = _libro(4, titulo=True)
+    for columnas in (None, COLUMNAS):
+        esperado, es_valido, _ = leer_excel(abrir_libro(contenido), columnas=columnas)
+        # Bloques pequeños: el relleno de celdas combinadas cruza los bloques
+        df, es_valido_bloques, _ = leer_excel_streaming(abrir_libro(contenido), tamaño_bloque=50, columnas=columnas)
+
+        assert es_valido and es_valido_bloques
+        assert isinstance(df["UNIDAD"].dtype, pd.CategoricalDtype)
+        assert_frame_equal(df, compactar_dataframe(esperado, dispersas=False))
+
+def _recorrer(libro):
+    for _ in iterar_excel_streaming(libro, tamaño_bloque=200):
+        pass
+
+def _pico(funcion):
+    tracemalloc.start()
+    try:
+        funcion()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def test_pico_de_memoria_acotado_por_el_bloque():
+    """Recorrer la hoja bloque a bloque usa la misma memoria con 4 veces más filas."""
+    picos = []
+    for copias in (10, 40):
+        libro = abrir_libro(_libro(copias))
+        # La tabla de cadenas compartidas es del libro, no de la lectura
+        libro.lector_streaming.cadenas_compartidas
+        picos.append(_pico(lambda: _recorrer(libro)))
+
+    assert picos[1] <= 1.5 * picos[0], f"pico de {picos[1] / 2**20:.1f} MB con 4 veces más filas"
+
+def test_pico_menor_que_la_lectura_completa():
+    # Primera lectura fuera de la medición (importaciones y cachés de módulo)
+    muestra = _libro(1)
+    leer_excel(abrir_libro(muestra))
+    leer_excel_streaming(abrir_libro(muestra))
+
+    contenido = _libro(40)
+    completa = _pico(lambda: leer_excel(abrir_libro(contenido)))
+    por_bloques = _pico(lambda: leer_excel_streaming(abrir_libro(contenido), tamaño_bloque=200))
+
+    assert por_bloques <= 0.8 * completa, f"{por_bloques / 2**20:.1f} MB por bloques, {completa / 2**20:.1f} MB completa"
+
+def test_libros_grandes_se_leen_por_bloques(monkeypatch):
+    contenido = _libro(2)
+    llamadas = []
+
+    def leer_por_bloques(*args, **kwargs):
+        llamadas.append(args)
+        return leer_excel_streaming(*args, **kwargs)
+
+    monkeypatch.setattr(data_processing, "obtener_cache", _CacheVacia)
+    esperado, _ = data_processing.procesar_archivo_excel(contenido, EXCEL_SHEETS)
+    monkeypatch.setattr(data_processing, "UMBRAL_LECTURA_POR_BLOQUES", 0)
+    monkeypatch.setattr(data_processing, "leer_excel_streaming", leer_por_bloques)
+    df, mensaje_error = data_processing.procesar_archivo_excel(contenido, EXCEL_SHEETS)
+
+    assert mensaje_error is None
+    assert len(llamadas) == 1
+    assert_frame_equal(df, esperado)
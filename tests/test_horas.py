@@ -0,0 +1,42 @@
+"""Pruebas de la conversión de horas a minutos (utils.formatear_datos)."""
+
+import datetime
+
+import pandas as pd
+import pytest
+
+from ingestion.compact import compactar_dataframe
+from utils import formatear_datos
+
+@pytest.mark.parametrize("horas, minutos", [
+    ([1200, 800, 730], [720.0, 480.0, 450.0]),
+    (["12:00", "08:00", "07:30"], [720.0, 480.0, 450.0]),
+    ([0.5, 1 / 3, 0.3125], [720.0, 480.0, 450.0]),
+    ([datetime.time(12), datetime.time(8), datetime.time(7, 30)], [720.0, 480.0, 450.0]),
+])
+def test_formatear_dos_veces_no_cambia_las_horas(horas, minutos):
+    df = pd.DataFrame({"HORA INICIO": horas, "HORA FIN": horas})
+
+    una_vez = formatear_datos(df)
+    dos_veces = formatear_datos(una_vez)
+
+    assert una_vez["HORA INICIO"].tolist() == minutos
+    assert dos_veces["HORA INICIO"].tolist() == minutos
+    assert dos_veces["HORA FIN"].tolist() == minutos
+    # El DataFrame original no queda marcado como convertido
+    assert not df.attrs
+
+def test_formatear_datos_compactos_no_cambia_las_horas():
+    compacto = compactar_dataframe(formatear_datos(pd.DataFrame({"HORA INICIO": [1200, 20, None]})))
+
+    formateado = formatear_datos(compacto)
+
+    assert formateado["HORA INICIO"].tolist()[:2] == [720, 20]
+    assert formateado["HORA INICIO"].isna().tolist() == [False, False, True]
+
+def test_columna_reemplazada_por_texto_se_convierte():
+    formateado = formatear_datos(pd.DataFrame({"HORA INICIO": [1200]}))
+
+    formateado["HORA INICIO"] = ["08:00"]
+
+    assert formatear_datos(formateado)["HORA INICIO"].tolist() == [480.0]
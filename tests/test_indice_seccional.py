@@ -0,0 +1,69 @@
+"""Pruebas del índice por seccional (report_services.seccional_analysis)."""
+
+import io
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ingestion.workbook import abrir_libro
+from utils import leer_excel, formatear_datos
+from report_services.seccional_analysis import IndiceSeccional, despliegues_en_seccional
+
+PLANILLA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Planilla despliegues.csv")
+
+def _seccionales_por_recorrido(serie):
+    """Índice de referencia: analiza el texto de cada fila por separado."""
+    filas = {}
+    for posicion, texto in enumerate(serie):
+        if pd.isna(texto):
+            continue
+        numeros = {float(token) for token in re.findall(r"\d+(?:\.\d+)?", str(texto))}
+        for numero in sorted(numeros):
+            if numero.is_integer():
+                filas.setdefault(int(numero), []).append(posicion)
+    return filas
+
+def _comparar(serie):
+    indice = IndiceSeccional.desde_serie(serie)
+    esperado = _seccionales_por_recorrido(serie)
+
+    assert list(indice.seccionales) == sorted(esperado)
+    for seccional, filas in esperado.items():
+        assert list(indice.filas_de(seccional)) == filas
+    return indice
+
+@pytest.mark.parametrize("dtype", [object, "str", "category"])
+def test_igual_que_el_recorrido_por_fila(dtype):
+    serie = pd.Series(
+        ["5, 9, 10", "15.0", "", np.nan, "7.0", "9", "5, 5", "3-4", "15", "2.5", "SIN DATO", "10 y 12"],
+        dtype=object
+    ).astype(dtype)
+    indice = _comparar(serie)
+
+    assert 0 not in indice.seccionales
+    assert list(indice.filas_de(5)) == [0, 6]
+
+def test_columna_numerica_de_excel():
+    """Una columna SECC. solo con números y celdas vacías se lee como float."""
+    df = pd.read_csv(PLANILLA).head(4)
+    df["SECC. "] = [15, None, 7, 15]
+    contenido = io.BytesIO()
+    df.to_excel(contenido, sheet_name="OPERATIVOS", index=False)
+
+    datos, es_valido, _ = leer_excel(abrir_libro(contenido.getvalue()))
+    assert es_valido
+    assert list(datos["SECC."]) == ["15", "", "7", "15"]
+
+    indice = _comparar(datos["SECC."])
+    assert list(indice.seccionales) == [7, 15]
+    assert list(indice.cantidades) == [1, 2]
+    assert despliegues_en_seccional(datos, 0).empty
+
+def test_texto_con_decimales_enteros():
+    """Los textos "15.0" ya formateados (caché anterior) no crean la seccional 0."""
+    datos = formatear_datos(pd.DataFrame({"SECC.": ["15.0", "7.0, 9.0", None]}), ["SECC."])
+    _comparar(datos["SECC."])
+    assert list(IndiceSeccional.desde_serie(datos["SECC."]).seccionales) == [7, 9, 15]
@@ -0,0 +1,46 @@
+"""Pruebas del cambio de motor de lectura de LibroExcel (ingestion.workbook)."""
+
+import io
+
+import pandas as pd
+import pytest
+
+from ingestion.workbook import LibroExcel
+
+@pytest.fixture
+def libro():
+    salida = io.BytesIO()
+    with pd.ExcelWriter(salida, engine="openpyxl") as escritor:
+        pd.DataFrame({"UNIDAD": ["A", "B"], "CANTIDAD": [1, 2]}).to_excel(escritor, sheet_name="01", index=False)
+        pd.DataFrame({"UNIDAD": ["C"], "CANTIDAD": [3]}).to_excel(escritor, sheet_name="02", index=False)
+    libro = LibroExcel(salida.getvalue(), "libro.xlsx", motores=["openpyxl", "calamine"])
+    libro.leer_hoja("01")
+    return libro
+
+@pytest.mark.parametrize("hoja, opciones, error", [
+    ("NO_EXISTE", {}, ValueError),
+    (5, {}, ValueError),
+    ("02", {"nrows": "x"}, ValueError),
+    ("02", {"skiprows": object()}, TypeError),
+])
+def test_errores_del_llamador_no_cambian_de_motor(libro, hoja, opciones, error):
+    with pytest.raises(error):
+        libro.leer_hoja(hoja, **opciones)
+
+    assert libro.motor == "openpyxl"
+    assert len(libro._hojas_leidas) == 1
+    assert libro.leer_hoja("02")["UNIDAD"].tolist() == ["C"]
+
+def test_fallo_del_motor_pasa_al_siguiente(libro, monkeypatch):
+    parse = pd.ExcelFile.parse
+
+    def parse_sin_openpyxl(self, *args, **kwargs):
+        if self.engine == "openpyxl":
+            raise OSError("archivo dañado")
+        return parse(self, *args, **kwargs)
+
+    monkeypatch.setattr(pd.ExcelFile, "parse", parse_sin_openpyxl)
+
+    assert libro.leer_hoja("02")["UNIDAD"].tolist() == ["C"]
+    assert libro.motor == "calamine"
+    assert list(libro._hojas_leidas) == [("02", ())]
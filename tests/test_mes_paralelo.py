@@ -0,0 +1,55 @@
+"""Pruebas de la lectura en paralelo de las hojas diarias (ingestion.month)."""
+
+import io
+import multiprocessing
+import os
+
+import pandas as pd
+import pytest
+
+import ingestion.month as month
+from ingestion.workbook import LibroExcel
+
+pytestmark = pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="los trabajadores deben heredar la función sustituida"
+)
+
+HOJAS = ["01", "02", "03", "04", "05", "06"]
+PADRE = os.getpid()
+_leer_hoja_dia = month._leer_hoja_dia
+_secuenciales = []
+
+def _leer_hoja_dia_con_fallo(hoja, libro=None, columnas=None):
+    """Lee la hoja; en un proceso trabajador, la hoja "04" mata el proceso."""
+    if os.getpid() != PADRE:
+        if hoja == "04":
+            os._exit(1)
+    else:
+        _secuenciales.append(hoja)
+    return _leer_hoja_dia(hoja, libro, columnas)
+
+@pytest.fixture
+def libro():
+    salida = io.BytesIO()
+    with pd.ExcelWriter(salida, engine="openpyxl") as escritor:
+        for hoja in HOJAS:
+            pd.DataFrame({"UNIDAD": [f"UNIDAD {hoja}"], "PERSONAL": [int(hoja)]}).to_excel(escritor, sheet_name=hoja, index=False)
+    return LibroExcel(salida.getvalue(), "mes.xlsx")
+
+def test_fallo_del_pool_solo_relee_las_hojas_faltantes(libro, monkeypatch):
+    # Un proceso trabajador muere a mitad de la lectura: el pool queda roto
+    monkeypatch.setattr(month, "_leer_hoja_dia", _leer_hoja_dia_con_fallo)
+    _secuenciales.clear()
+    avance = []
+
+    resultados = list(month._leer_hojas_en_paralelo(
+        libro, HOJAS, lambda hoja, completadas, total: avance.append((completadas, total)), 2
+    ))
+
+    assert sorted(hoja for hoja, _, _ in resultados) == HOJAS
+    assert all(df is not None for _, df, _ in resultados)
+    assert "04" in _secuenciales
+    assert len(_secuenciales) < len(HOJAS)
+    # El avance no se reinicia: cada hoja cuenta una sola vez
+    assert avance == [(i, len(HOJAS)) for i in range(1, len(HOJAS) + 1)]
@@ -0,0 +1,35 @@
+"""Pruebas del NOMBRE ORDEN combinado (data_utils._combinar_nombres_orden)."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_utils import _combinar_nombre, _combinar_nombres_orden, preparar_dataframe
+
+# Casos borde: faltantes (NaN, None, pd.NA), textos vacíos, números y
+# combinaciones repetidas con el mismo nombre resultante
+TIPO = ["PATRULLAJE", "PATRULLAJE", np.nan, "", None, "PATRULLAJE", "", np.nan, "PATRULLAJE ZONA", "PATRULLAJE", pd.NA, 5]
+NOMBRE = ["ZONA NORTE", "ZONA NORTE", "ESTADIO", "ESTADIO", np.nan, "", "", np.nan, "NORTE", "ZONA NORTE", "ESTADIO", 7]
+ORDEN = ["ORD 1", "ORD 2", "ORD 1", "ORD 3", "ORD 4", np.nan, "", np.nan, "ORD 1", "ORD 1", "ORD 5", 3]
+
+def _por_fila(tipo, nombre, orden):
+    return [_combinar_nombre(*fila) for fila in zip(tipo, nombre, orden)]
+
+@pytest.mark.parametrize("dtype", [object, "str", "category"])
+def test_igual_que_la_regla_por_fila(dtype):
+    columnas = [pd.Series(valores, dtype=object) for valores in (TIPO, NOMBRE, ORDEN)]
+    if dtype != object:
+        columnas = [serie.map(lambda v: v if pd.isna(v) else str(v)).astype(dtype) for serie in columnas]
+
+    combinado = _combinar_nombres_orden(*columnas)
+
+    assert isinstance(combinado, pd.Categorical)
+    assert list(combinado.astype(object)) == _por_fila(*columnas)
+    # Cada nombre es una sola categoría aunque venga de combinaciones distintas
+    assert combinado.categories.is_unique
+
+def test_preparar_dataframe_conserva_la_regla():
+    df = pd.DataFrame({"TIPO OPERATIVO": TIPO, "NOMBRE OPERATIVO": NOMBRE, "NOMBRE ORDEN": ORDEN})
+    df_completo, _, _ = preparar_dataframe(df)
+
+    assert list(df_completo["NOMBRE ORDEN"].astype(object)) == _por_fila(TIPO, NOMBRE, ORDEN)
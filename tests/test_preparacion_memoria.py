@@ -0,0 +1,48 @@
+"""Prueba del pico de memoria al preparar los datos para el PDF."""
+
+import os
+import tracemalloc
+
+import pandas as pd
+
+from ingestion.tail import leer_csv_en_curso, olvidar_csv_en_curso
+from ingestion.compact import compactar_dataframe
+from data_utils import preparar_dataframe, clasificar_datos_por_unidad
+
+PLANILLA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Planilla despliegues.csv")
+
+# Copias de la planilla de ejemplo (73 filas) en el conjunto medido
+REPETICIONES = 1500
+
+# Pico admitido respecto del tamaño de los datos de entrada
+FACTOR_MAXIMO = 1.5
+
+def _memoria_arrow():
+    """Bytes reservados por pyarrow (las columnas de texto no pasan por tracemalloc)."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return 0
+    return pa.total_allocated_bytes()
+
+def test_pico_de_memoria_acotado():
+    df, _, _, _ = leer_csv_en_curso(PLANILLA)
+    olvidar_csv_en_curso()
+    # Mismo formato que reciben los reportes: datos formateados y compactados
+    df = compactar_dataframe(pd.concat([df] * REPETICIONES, ignore_index=True))
+    tamaño_entrada = df.memory_usage(deep=True).sum()
+
+    arrow_inicial = _memoria_arrow()
+    tracemalloc.start()
+    try:
+        df_completo, df_filtrado, _ = preparar_dataframe(df)
+        por_unidad = clasificar_datos_por_unidad(df_completo, df_filtrado)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    pico += max(_memoria_arrow() - arrow_inicial, 0)
+
+    assert sum(len(datos) for datos in por_unidad.values()) == len(df)
+    assert pico <= FACTOR_MAXIMO * tamaño_entrada, (
+        f"pico de {pico / 2**20:.1f} MB para {tamaño_entrada / 2**20:.1f} MB de entrada"
+    )
@@ -0,0 +1,18 @@
+"""Pruebas de la selección de columnas por modo (ingestion.schema.columnas_necesarias)."""
+
+import pytest
+
+from config import COLUMNAS_MATRICULA, EXPECTED_COLUMNS
+from ingestion.schema import columnas_necesarias
+
+@pytest.mark.parametrize("modo", ["tablas", "cumplimiento"])
+def test_matriculas_solo_si_se_piden(modo):
+    sin_matriculas = columnas_necesarias(modo)
+    con_matriculas = columnas_necesarias(modo, matriculas=True)
+
+    assert not set(COLUMNAS_MATRICULA) & set(sin_matriculas)
+    assert set(con_matriculas) == set(sin_matriculas) | set(COLUMNAS_MATRICULA)
+    assert list(con_matriculas) == [col for col in EXPECTED_COLUMNS if col in con_matriculas]
+
+def test_sin_modo_se_leen_todas():
+    assert columnas_necesarias() is None
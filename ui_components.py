@@ -6,6 +6,11 @@ import streamlit as st
 from datetime import datetime
 import pandas as pd
 
+from config import MESES, DIRECTORIO_CSV_EN_CURSO
+from utils import formatear_horas_para_mostrar
+from ingestion.compact import densificar_dataframe
+from ingestion.tail import listar_csv_en_curso
+from ingestion.dedup import obtener_indice_duplicados
 from ui_styles import mostrar_info, mostrar_exito, mostrar_error
 
 def mostrar_fecha_actual():
@@ -34,16 +39,38 @@ def mostrar_fecha_actual():
 
 def selector_archivo():
     """
-    Muestra el selector de archivos Excel.
+    Muestra el selector de archivos Excel o CSV.
     
     Returns:
-        file: Archivo subido o None.
+        file | list | str: Archivo subido o None. Si se eligió cargar varios archivos,
+            lista de archivos subidos (vacía si todavía no hay ninguno); si se
+            eligió seguir un CSV en disco, su nombre dentro de
+            DIRECTORIO_CSV_EN_CURSO (o None si no hay ninguno).
     """
     col1, col2 = st.columns([3, 1])
     with col1:
+        csv_en_curso = st.checkbox(
+            "Seguir un CSV en disco que se sigue completando",
+            value=False,
+            help="Para las exportaciones que crecen durante el día: en cada actualización solo se leen las filas nuevas"
+        )
+        if csv_en_curso:
+            # Solo se ofrecen los archivos del directorio de exportaciones
+            nombres = listar_csv_en_curso()
+            if not nombres:
+                mostrar_info(f"No hay archivos CSV en el directorio de exportaciones ({DIRECTORIO_CSV_EN_CURSO}).")
+                return None
+            return st.selectbox("Archivo CSV", nombres)
+        varios_archivos = st.checkbox(
+            "Cargar varios archivos (uno por dirección)",
+            value=False,
+            help="Une los archivos de todas las direcciones en un solo informe, indicando el archivo de origen de cada servicio"
+        )
         uploaded_file = st.file_uploader(
-            "Seleccione el archivo Excel con los datos de despliegues operativos", 
-            type=['xlsx', 'xls']
+            "Seleccione los archivos Excel o CSV con los datos de despliegues operativos" if varios_archivos
+            else "Seleccione el archivo Excel o CSV con los datos de despliegues operativos", 
+            type=['xlsx', 'xls', 'csv', 'tsv', 'txt'],
+            accept_multiple_files=varios_archivos
         )
     with col2:
         st.markdown("""<div class='sidebar-card'>
@@ -51,6 +78,7 @@ def selector_archivo():
         <ul>
             <li>Excel (.xlsx)</li>
             <li>Excel 97-2003 (.xls)</li>
+            <li>CSV / TSV (.csv, .tsv, .txt)</li>
         </ul>
         </div>""", unsafe_allow_html=True)
     
@@ -61,7 +89,7 @@ def opciones_organizacion():
     Muestra las opciones de organización del reporte.
     
     Returns:
-        tuple: (organizar_por_unidad, reporte_cumplimiento, mes_seleccionado, año_seleccionado)
+        tuple: (organizar_por_unidad, reporte_cumplimiento, mes_seleccionado, año_seleccionado, mes_completo)
     """
     col1, col2 = st.columns(2)
     
@@ -77,18 +105,20 @@ def opciones_organizacion():
             value=False, 
             help="Genera un reporte de cumplimiento de servicios"
         )
+        mes_completo = st.checkbox(
+            "Cargar mes completo (hojas 01-31)",
+            value=False,
+            help="Lee todas las hojas diarias del archivo y las une en un solo conjunto con la fecha de cada servicio"
+        )
     
     mes_seleccionado = None
     año_seleccionado = None
     
-    if reporte_cumplimiento:
+    if reporte_cumplimiento or mes_completo:
         with col2:
             st.markdown("### Periodo del reporte")
             # Lista de meses en español
-            meses = [
-                "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
-                "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"
-            ]
+            meses = MESES
             # Obtener el mes actual (1-12) para seleccionarlo por defecto
             mes_actual = datetime.now().month
             # Selector de mes (índice 0-11, por eso restamos 1 al mes actual)
@@ -114,15 +144,109 @@ def opciones_organizacion():
             <small>El reporte incluirá gráficos y tablas de resumen.</small>
             """)
     
-    return organizar_por_unidad, reporte_cumplimiento, mes_seleccionado, año_seleccionado
+    return organizar_por_unidad, reporte_cumplimiento, mes_seleccionado, año_seleccionado, mes_completo
+
+def opciones_duplicados():
+    """
+    Muestra la opción de tratamiento de los operativos repetidos.
+    
+    Returns:
+        str: "marcar" o "eliminar".
+    """
+    opciones = {
+        "Marcar duplicados": "marcar",
+        "Eliminar duplicados": "eliminar"
+    }
+    eleccion = st.radio(
+        "Filas duplicadas",
+        options=list(opciones),
+        horizontal=True,
+        help="Un operativo con la misma unidad, orden, nombre, horario, fecha y recursos que otra fila (o que un archivo cargado antes) se considera duplicado"
+    )
+    # Las cargas anteriores se recuerdan entre sesiones hasta vaciar el índice
+    if st.button("Olvidar archivos cargados antes", key="vaciar_indice_duplicados",
+                 help="Vacía el índice de cargas anteriores: solo se buscarán duplicados dentro de la carga actual y las siguientes"):
+        if obtener_indice_duplicados().vaciar():
+            mostrar_exito("Se vació el índice de archivos cargados antes.")
+        else:
+            mostrar_error("No se pudo vaciar el índice de archivos cargados antes.")
+    return opciones[eleccion]
+
+def opciones_conflictos():
+    """
+    Muestra la opción de analizar los conflictos de matrículas.
+    
+    Las columnas MATRICULA 1 a MATRICULA 10 solo se leen si se marca.
+    
+    Returns:
+        bool: True si se deben leer las matrículas y buscar sus conflictos.
+    """
+    return st.checkbox(
+        "Analizar conflictos de matrículas",
+        value=False,
+        help="Lee las columnas de matrículas y señala las asignadas a dos servicios que se superponen (vista previa y anexo opcional del PDF)"
+    )
+
+def mostrar_resultado_duplicados(cantidad, accion, recarga=False):
+    """
+    Informa cuántas filas duplicadas se encontraron en la carga.
+    
+    Args:
+        cantidad (int): Número de filas duplicadas.
+        accion (str): "marcar" o "eliminar".
+        recarga (bool, optional): True si toda la carga ya había llegado en
+            cargas anteriores. Defaults to False.
+    """
+    if recarga:
+        st.warning("Todas las filas de esta carga ya llegaron en cargas anteriores (¿archivo re-subido o corregido?). "
+                   "No se marcaron ni eliminaron como duplicadas; use \"Olvidar archivos cargados antes\" si ya no se necesitan.")
+    if not cantidad:
+        return
+    if accion == "eliminar":
+        mostrar_info(f"Se eliminaron {cantidad} filas duplicadas de operativos ya cargados.")
+    else:
+        st.warning(f"{cantidad} filas repiten operativos ya cargados (ver la regla DUPLICADO en el informe de calidad).")
+
+def crear_indicador_progreso(texto_inicial="Leyendo hojas diarias...", formato="Hoja {elemento} leída ({completadas}/{total})"):
+    """
+    Crea una barra de progreso para la lectura de las hojas diarias o de varios archivos.
+    
+    Args:
+        texto_inicial (str, optional): Texto mostrado antes de terminar el primer elemento.
+        formato (str, optional): Texto de avance con los campos {elemento},
+            {completadas} y {total}.
+    
+    Returns:
+        callable: Función progreso(elemento, completadas, total) que actualiza la barra.
+    """
+    barra = st.progress(0.0, text=texto_inicial)
+    
+    def progreso(elemento, completadas, total):
+        barra.progress(completadas / total, text=formato.format(elemento=elemento, completadas=completadas, total=total))
+        if completadas == total:
+            barra.empty()
+    
+    return progreso
 
-def mostrar_vista_previa_datos(df):
+def mostrar_vista_previa_datos(df, conflictos_matriculas=False):
     """
     Muestra una vista previa de los datos cargados.
     
+    Lo primero que se muestra es el informe de calidad; la tabla completa
+    queda dentro de un desplegable.
+    
     Args:
         df (pandas.DataFrame): DataFrame con los datos.
+        conflictos_matriculas (bool, optional): Si se muestran los conflictos
+            de matrículas. Defaults to False.
     """
+    # Informe de calidad de los datos
+    mostrar_informe_calidad(df)
+    
+    # Matrículas asignadas a servicios superpuestos
+    if conflictos_matriculas:
+        mostrar_conflictos_matriculas(df)
+    
     # Contenedor para las estadísticas con estilo mejorado
     st.markdown("""<div style='background-color: #092845; padding: 15px; border-radius: 5px; margin-bottom: 20px;'>
     <h4 style='color: #c9a227; margin-top: 0; margin-bottom: 15px;'>Estadísticas de los datos</h4>
@@ -148,11 +272,151 @@ def mostrar_vista_previa_datos(df):
         else:
             st.metric("Total personal", "N/A")
     
-    # Mostrar dataframe con opciones de filtrado
-    st.markdown("<h4 style='color: #c9a227; margin-top: 20px;'>Vista previa de los datos</h4>", unsafe_allow_html=True)
-    st.dataframe(df, height=300, use_container_width=True)
+    # Tabla completa dentro de un desplegable
+    with st.expander("Ver tabla completa de datos"):
+        st.dataframe(formatear_horas_para_mostrar(densificar_dataframe(df)), height=300, use_container_width=True)
+    
+    mostrar_informe_memoria(df)
 
-def seccion_generacion_pdf(df, organizar_por_unidad, reporte_cumplimiento, mes_seleccionado, año_seleccionado, PDF_FILENAME):
+def mostrar_informe_calidad(df, max_filas=200):
+    """
+    Muestra el resultado de las reglas de calidad y las filas que incumplen cada una.
+    
+    Args:
+        df (pandas.DataFrame): DataFrame con los datos.
+        max_filas (int, optional): Máximo de filas mostradas por regla. Defaults to 200.
+    """
+    from ingestion.quality import evaluar_reglas
+    
+    st.markdown("<h4 style='color: #c9a227; margin-top: 0;'>Calidad de los datos</h4>", unsafe_allow_html=True)
+    
+    resumen, filas = evaluar_reglas(df)
+    if resumen.empty:
+        mostrar_info("No hay columnas suficientes para validar la calidad de los datos.")
+        return
+    
+    afectadas = int(resumen['FILAS AFECTADAS'].iloc[-1])
+    if afectadas == 0:
+        mostrar_exito(f"Las {len(df)} filas cumplen todas las reglas de calidad.")
+    else:
+        st.warning(f"{afectadas} de {len(df)} filas incumplen al menos una regla de calidad.")
+    
+    st.dataframe(resumen, hide_index=True, use_container_width=True)
+    
+    # Filas que incumplen cada regla
+    for regla, indices in filas.items():
+        if len(indices) == 0:
+            continue
+        with st.expander(f"{regla}: {len(indices)} filas"):
+            if len(indices) > max_filas:
+                st.caption(f"Se muestran las primeras {max_filas} filas.")
+            st.dataframe(
+                formatear_horas_para_mostrar(densificar_dataframe(df.loc[indices[:max_filas]])),
+                use_container_width=True
+            )
+
+def mostrar_conflictos_matriculas(df, max_filas=200):
+    """
+    Muestra las matrículas asignadas a dos servicios que se superponen.
+    
+    Args:
+        df (pandas.DataFrame): DataFrame con los datos.
+        max_filas (int, optional): Máximo de conflictos mostrados. Defaults to 200.
+    """
+    from data_utils import obtener_dataset_preparado
+    from report_services.personnel_conflicts import hay_matriculas, obtener_conflictos, tabla_conflictos
+    
+    # Sin ninguna matrícula cargada no hay nada que informar
+    if not hay_matriculas(df):
+        return
+    
+    # Misma detección (memorizada) que el anexo del PDF
+    datos = obtener_dataset_preparado(df)
+    conflictos = obtener_conflictos(datos)
+    if conflictos.empty:
+        mostrar_exito("Ninguna matrícula está asignada a dos servicios superpuestos.")
+        return
+    
+    st.warning(f"{len(conflictos)} asignaciones de {conflictos['MATRICULA'].nunique()} matrículas se superponen con otro servicio de la misma matrícula.")
+    with st.expander(f"Conflictos de matrículas: {len(conflictos)}"):
+        if len(conflictos) > max_filas:
+            st.caption(f"Se muestran los primeros {max_filas} conflictos.")
+        st.dataframe(tabla_conflictos(datos.df_completo, conflictos.iloc[:max_filas]), hide_index=True, use_container_width=True)
+
+def mostrar_informe_memoria(df):
+    """
+    Muestra cuánta memoria ocupan los datos compactos frente a la representación sin compactar.
+    
+    Args:
+        df (pandas.DataFrame): DataFrame compacto con los datos.
+    """
+    from ingestion.compact import informe_memoria
+    
+    with st.expander("Uso de memoria"):
+        informe = informe_memoria(df)
+        total = informe.iloc[-1]
+        original_mb = total['BYTES ORIGINAL'] / (1024 * 1024)
+        compacto_mb = total['BYTES COMPACTO'] / (1024 * 1024)
+        st.markdown(f"Los datos ocupan **{compacto_mb:.2f} MB** (sin compactar: {original_mb:.2f} MB).")
+        st.dataframe(informe, use_container_width=True)
+
+def mostrar_resumen_lote(resumen):
+    """
+    Muestra el resumen consolidado de los archivos cargados en lote.
+    
+    Args:
+        resumen (pandas.DataFrame): Una fila por archivo con FILAS, COLUMNAS FALTANTES,
+            COLUMNAS ADICIONALES y ERROR.
+    """
+    if resumen is None or resumen.empty:
+        return
+    
+    con_diferencias = resumen[
+        (resumen['COLUMNAS FALTANTES'] != "") | (resumen['COLUMNAS ADICIONALES'] != "") | (resumen['ERROR'] != "")
+    ]
+    
+    titulo = f"Resumen de archivos cargados ({len(resumen)} archivos, {int(resumen['FILAS'].sum())} registros)"
+    with st.expander(titulo, expanded=not con_diferencias.empty):
+        if con_diferencias.empty:
+            st.markdown("Todos los archivos tienen las columnas esperadas.")
+        else:
+            st.markdown(f"**{len(con_diferencias)}** archivo(s) difieren del esquema esperado o no se pudieron leer.")
+        st.dataframe(resumen, use_container_width=True)
+
+def mostrar_csv_en_curso(filas_nuevas, agregados):
+    """
+    Muestra las filas leídas de un CSV en curso y los totales acumulados por unidad.
+    
+    Args:
+        filas_nuevas (int): Filas leídas en esta actualización.
+        agregados (pandas.DataFrame): Totales por unidad (SERVICIOS y recursos).
+    """
+    if filas_nuevas:
+        st.info(f"Se leyeron {filas_nuevas} fila(s) nuevas del archivo.")
+    else:
+        st.info("El archivo no tiene filas nuevas desde la última lectura.")
+    
+    if agregados is not None and not agregados.empty:
+        with st.expander(f"Totales acumulados por unidad ({int(agregados['SERVICIOS'].sum())} servicios)"):
+            st.dataframe(agregados, use_container_width=True)
+
+def mostrar_comparacion_motores(uploaded_file):
+    """
+    Muestra un panel para comparar el tiempo de lectura de cada motor de Excel.
+    
+    Args:
+        uploaded_file: Archivo Excel subido.
+    """
+    from ingestion import comparar_motores
+    
+    with st.expander("Comparar motores de lectura"):
+        st.markdown("Mide cuánto tarda cada motor disponible en leer la hoja principal de este archivo.")
+        if st.button("Comparar motores", key="comparar_motores"):
+            with st.spinner("Midiendo motores de lectura..."):
+                resultados = comparar_motores(uploaded_file)
+            st.dataframe(resultados, use_container_width=True)
+
+def seccion_generacion_pdf(df, organizar_por_unidad, reporte_cumplimiento, mes_seleccionado, año_seleccionado, PDF_FILENAME, conflictos_matriculas=False):
     """
     Muestra la sección para generar y descargar el PDF.
     
@@ -163,20 +427,34 @@ def seccion_generacion_pdf(df, organizar_por_unidad, reporte_cumplimiento, mes_s
         mes_seleccionado (str): Mes seleccionado.
         año_seleccionado (int): Año seleccionado.
         PDF_FILENAME (str): Nombre del archivo PDF.
+        conflictos_matriculas (bool, optional): Si se ofrece el anexo de
+            conflictos de matrículas. Defaults to False.
         
     Returns:
         bool: True si se generó el PDF, False en caso contrario.
     """
     from pdf_generator import generar_pdf_optimizado as generar_pdf
+    from data_utils import obtener_dataset_preparado
+    
+    from report_services.personnel_conflicts import hay_matriculas
     
     # Contenedor para centrar los botones
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
+        anexo_conflictos = False
+        if conflictos_matriculas and hay_matriculas(df):
+            anexo_conflictos = st.checkbox(
+                "Incluir anexo de conflictos de matrículas",
+                value=False,
+                help="Agrega al final del PDF las matrículas asignadas a dos servicios que se superponen"
+            )
+        
         if st.button("Generar PDF", key="generar_pdf"):
             # Preparar los parámetros para la generación del PDF
             params = {
                 "organizar_por_unidad": organizar_por_unidad,
-                "reporte_cumplimiento": reporte_cumplimiento
+                "reporte_cumplimiento": reporte_cumplimiento,
+                "anexo_conflictos": anexo_conflictos
             }
             
             # Si es un reporte de cumplimiento, añadir mes y año
@@ -184,8 +462,9 @@ def seccion_generacion_pdf(df, organizar_por_unidad, reporte_cumplimiento, mes_s
                 params["mes"] = mes_seleccionado
                 params["año"] = año_seleccionado
             
-            # Generar el PDF
-            pdf = generar_pdf(df, **params)
+            # Generar el PDF; los datos preparados de esta carga se reutilizan
+            # entre generaciones y tipos de reporte
+            pdf = generar_pdf(obtener_dataset_preparado(df), **params)
             
             # Proporcionar el PDF para descarga
             st.download_button(
@@ -2,6 +2,13 @@
 Configuración de unidades para la organización de tablas en el PDF.
 """
 
+import re
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+from ingestion.schema import normalizar_encabezado
+
 # Mapeo de unidades a sus nombres completos para los títulos de las tablas
 UNIDADES_NOMBRES = {
     "DIRECCIÓN I": "Dirección I - Zona Metropolitana",
@@ -22,6 +29,42 @@ UNIDADES_ORDEN = [
     "OTRAS"
 ]
 
+# Nombres alternativos de las unidades que se aceptan en los archivos
+# (se comparan sin acentos, mayúsculas ni espacios sobrantes)
+UNIDADES_ALIAS = {
+    "DIR I": "DIRECCIÓN I",
+    "DIRECCION 1": "DIRECCIÓN I",
+    "DIR II": "DIRECCIÓN II",
+    "DIRECCION 2": "DIRECCIÓN II",
+    "GRUPO ESPECIAL DE OPERACIONES": "GEO",
+    "DIRECCION III ESTE": "REGIONAL ESTE",
+    "DIRECCION III - REGIONAL ESTE": "REGIONAL ESTE",
+    "DIRECCION III NORTE": "REGIONAL NORTE",
+    "DIRECCION III - REGIONAL NORTE": "REGIONAL NORTE"
+}
+
+# Patrones (sobre el nombre normalizado) para las variantes que no están en
+# los alias, por ejemplo "DIR. I - ZONA METROPOLITANA" o "REG. NORTE"; se
+# prueban en orden y gana el primero que coincide
+UNIDADES_PATRONES = [
+    (r"^(DIRECCION|DIR\.?) ?(II|2)\b", "DIRECCIÓN II"),
+    (r"^(DIRECCION|DIR\.?) ?(I|1)\b", "DIRECCIÓN I"),
+    (r"^GEO\b", "GEO"),
+    (r"^(REGIONAL|REG\.?|(DIRECCION|DIR\.?) ?(III|3))\b.*\bESTE\b", "REGIONAL ESTE"),
+    (r"^(REGIONAL|REG\.?|(DIRECCION|DIR\.?) ?(III|3))\b.*\bNORTE\b", "REGIONAL NORTE")
+]
+
+def _compilar_indice_unidades():
+    """Construye el índice {nombre_normalizado: unidad}."""
+    indice = {normalizar_encabezado(unidad): unidad for unidad in UNIDADES_NOMBRES}
+    for alias, unidad in UNIDADES_ALIAS.items():
+        indice.setdefault(normalizar_encabezado(alias), unidad)
+    return indice
+
+# Índice y patrones compilados al importar
+INDICE_UNIDADES = _compilar_indice_unidades()
+_PATRONES_COMPILADOS = [(re.compile(patron), unidad) for patron, unidad in UNIDADES_PATRONES]
+
 # Función para obtener el nombre completo de una unidad
 def obtener_nombre_unidad(unidad):
     """
@@ -40,20 +83,51 @@ def obtener_nombre_unidad(unidad):
     # Si no está en el mapeo, considerarla como "OTRAS"
     return UNIDADES_NOMBRES["OTRAS"]
 
+@lru_cache(maxsize=1024)
+def _clasificar_normalizada(nombre):
+    """Clasifica un nombre de unidad ya normalizado (resultado memorizado)."""
+    if nombre in INDICE_UNIDADES:
+        return INDICE_UNIDADES[nombre]
+    for patron, unidad in _PATRONES_COMPILADOS:
+        if patron.search(nombre):
+            return unidad
+    return "OTRAS"
+
 # Función para clasificar una unidad
 def clasificar_unidad(unidad):
     """
     Clasifica una unidad según el mapeo definido.
     
+    El nombre se normaliza (acentos, mayúsculas y espacios) y se busca entre
+    las unidades y UNIDADES_ALIAS; si no está, se prueban UNIDADES_PATRONES.
+    
     Args:
         unidad: Nombre de la unidad a clasificar
         
     Returns:
         str: Categoría de la unidad (una de las definidas en UNIDADES_ORDEN)
     """
-    # Si la unidad está en el mapeo, devolverla
-    if unidad in UNIDADES_NOMBRES:
-        return unidad
+    # Si no hay unidad, considerarla como "OTRAS"
+    if unidad is None or (not isinstance(unidad, str) and pd.isna(unidad)):
+        return "OTRAS"
+    return _clasificar_normalizada(normalizar_encabezado(unidad))
+
+def clasificar_columna_unidades(unidades):
+    """
+    Clasifica una columna de unidades evaluando una sola vez cada valor distinto.
     
-    # Si no está en el mapeo, considerarla como "OTRAS"
-    return "OTRAS"
+    Args:
+        unidades (pandas.Series): Columna UNIDAD.
+        
+    Returns:
+        pandas.Categorical: Unidad clasificada de cada fila, con las categorías
+            en el orden de UNIDADES_ORDEN.
+    """
+    codigos, distintas = pd.factorize(unidades)
+    posicion = {unidad: i for i, unidad in enumerate(UNIDADES_ORDEN)}
+    # El último código corresponde a las filas sin unidad (código -1)
+    codigo_por_unidad = np.array(
+        [posicion[clasificar_unidad(unidad)] for unidad in distintas] + [posicion[clasificar_unidad(None)]],
+        dtype=np.int8
+    )
+    return pd.Categorical.from_codes(codigo_por_unidad[codigos], categories=UNIDADES_ORDEN)
@@ -3,8 +3,15 @@ Funciones de utilidad para la aplicación de conversión de Excel a PDF.
 """
 
 import pandas as pd
+import numpy as np
 import io
 from config import EXPECTED_COLUMNS, EXCEL_SHEETS
+from ingestion.workbook import abrir_libro, HOJAS_DIA
+from ingestion.xlsx_stream import TAMAÑO_BLOQUE
+from ingestion.csv_reader import detectar_formato_csv, leer_tabla_csv, TAMAÑO_MUESTRA
+from ingestion.schema import normalizar_encabezado, normalizar_columnas, resolver_encabezados, selector_columnas
+from ingestion.layout import detectar_fila_encabezado, rellenar_celdas_combinadas, leer_hoja_tolerante
+from ingestion.compact import compactar_dataframe, concatenar_compactos
 
 def normalizar_texto(texto):
     """
@@ -16,32 +23,22 @@ def normalizar_texto(texto):
     Returns:
         str: Texto normalizado
     """
-    if not isinstance(texto, str):
-        return str(texto)
-    
-    return texto.strip().replace('Ó', 'O').replace('ó', 'o').replace('Á', 'A').replace('á', 'a').upper()
+    return normalizar_encabezado(texto)
 
-def validar_csv(df):
+def validar_csv(df, columnas=None):
     """
     Valida que el DataFrame tenga las columnas esperadas.
     
     Args:
         df: DataFrame de pandas con los datos a validar
+        columnas: Columnas esperadas a exigir (si es None, todas las de EXPECTED_COLUMNS)
         
     Returns:
         tuple: (bool, str) - (es_valido, mensaje_error)
     """
-    # Normalizar nombres de columnas para comparación
-    columnas_normalizadas = {normalizar_texto(col): col for col in df.columns}
-    expected_normalizadas = [normalizar_texto(col) for col in EXPECTED_COLUMNS]
-    
-    # Verificar que todas las columnas esperadas estén presentes (comparando versiones normalizadas)
-    columnas_faltantes = []
-    for col_esperada in expected_normalizadas:
-        if col_esperada not in columnas_normalizadas:
-            # Buscar la versión original para mostrar en el mensaje de error
-            idx = expected_normalizadas.index(col_esperada)
-            columnas_faltantes.append(EXPECTED_COLUMNS[idx])
+    # Columnas esperadas reconocidas en el DataFrame (por nombre o alias)
+    presentes = {esperada for _, esperada in resolver_encabezados(tuple(df.columns))}
+    columnas_faltantes = [col for col in (EXPECTED_COLUMNS if columnas is None else columnas) if col not in presentes]
     
     if columnas_faltantes:
         return False, f"Faltan las siguientes columnas: {', '.join(columnas_faltantes)}"
@@ -56,66 +53,43 @@ def detectar_separador(archivo):
         archivo: Archivo CSV cargado por el usuario
         
     Returns:
-        str: Separador detectado (coma o tabulación)
+        str: Separador detectado (coma, punto y coma, tabulación o barra vertical)
     """
     # Guardar la posición actual del archivo
     pos = archivo.tell()
     
-    # Leer las primeras líneas del archivo
-    contenido = archivo.read(1024).decode('utf-8')
+    # Leer el comienzo del archivo (la codificación se detecta en la misma muestra)
+    muestra = archivo.read(TAMAÑO_MUESTRA)
     
     # Restaurar la posición del archivo
     archivo.seek(pos)
     
-    # Contar ocurrencias de separadores comunes
-    comas = contenido.count(',')
-    tabs = contenido.count('\t')
-    
-    # Determinar el separador más probable
-    if comas > tabs:
-        return ','
-    else:
-        return '\t'
+    _, separador = detectar_formato_csv(muestra)
+    return separador
 
-def leer_csv(archivo, separador=None):
+def leer_csv(archivo, separador=None, columnas=None):
     """
     Lee un archivo CSV y lo convierte en un DataFrame de pandas.
     
     Args:
         archivo: Archivo CSV cargado por el usuario
         separador: Separador de columnas en el CSV (si es None, se detecta automáticamente)
+        columnas: Columnas esperadas a leer (si es None, todas); el resto no se analiza
         
     Returns:
         tuple: (DataFrame, bool, str) - (datos, es_valido, mensaje_error)
     """
     try:
-        # Detectar separador si no se especifica
-        if separador is None:
-            separador = detectar_separador(archivo)
-        
-        # Leer el archivo CSV
-        df = pd.read_csv(archivo, sep=separador)
+        # Leer el archivo CSV (codificación y separador se detectan si no se indican)
+        usecols = selector_columnas(tuple(columnas)) if columnas is not None else None
+        df = leer_tabla_csv(archivo, separador=separador, usecols=usecols)
         
         # Renombrar columnas para que coincidan exactamente con las esperadas
-        # Esto ayuda a manejar diferencias en espacios y acentos
-        columnas_actuales = df.columns
-        columnas_normalizadas = {col: normalizar_texto(col) for col in columnas_actuales}
-        expected_normalizadas = {col: normalizar_texto(col) for col in EXPECTED_COLUMNS}
-        
-        # Crear mapeo de nombres actuales a nombres esperados
-        mapeo_columnas = {}
-        for col_actual, col_norm in columnas_normalizadas.items():
-            for col_esperada, esp_norm in expected_normalizadas.items():
-                if col_norm == esp_norm:
-                    mapeo_columnas[col_actual] = col_esperada
-                    break
-        
-        # Renombrar columnas si es necesario
-        if mapeo_columnas:
-            df = df.rename(columns=mapeo_columnas)
+        # (esquema compilado: acentos, espacios y alias resueltos una sola vez)
+        df = normalizar_columnas(df)
         
         # Validar el DataFrame
-        es_valido, mensaje_error = validar_csv(df)
+        es_valido, mensaje_error = validar_csv(df, columnas)
         
         return df, es_valido, mensaje_error
     
@@ -123,21 +97,22 @@ def leer_csv(archivo, separador=None):
         return None, False, f"Error al procesar el archivo: {str(e)}"
 
 
-def leer_excel(archivo, hoja=None):
+def leer_excel(archivo, hoja=None, columnas=None):
     """
     Lee un archivo Excel y lo convierte en un DataFrame de pandas.
     
     Args:
-        archivo: Archivo Excel cargado por el usuario
+        archivo: Archivo Excel cargado por el usuario o LibroExcel ya abierto
         hoja: Nombre de la hoja a leer (si es None, se lee la primera hoja)
+        columnas: Columnas esperadas a leer (si es None, todas); el resto no se analiza
         
     Returns:
         tuple: (DataFrame, bool, str) - (datos, es_valido, mensaje_error)
     """
     try:
-        # Obtener todas las hojas disponibles
-        xls = pd.ExcelFile(archivo)
-        hojas_disponibles = xls.sheet_names
+        # Abrir el libro una sola vez (o reutilizar la sesión recibida)
+        libro = abrir_libro(archivo)
+        hojas_disponibles = libro.hojas
         
         # Si no se especifica hoja, usar la hoja 'OPERATIVOS' o la primera disponible
         if hoja is None:
@@ -146,55 +121,130 @@ def leer_excel(archivo, hoja=None):
             else:
                 hoja = hojas_disponibles[0]  # Primera hoja disponible
         
-        # Leer la hoja especificada
-        df = pd.read_excel(archivo, sheet_name=hoja)
-        
-        # Renombrar columnas para que coincidan exactamente con las esperadas
-        # Esto ayuda a manejar diferencias en espacios y acentos
-        columnas_actuales = df.columns
-        columnas_normalizadas = {col: normalizar_texto(col) for col in columnas_actuales}
-        expected_normalizadas = {col: normalizar_texto(col) for col in EXPECTED_COLUMNS}
-        
-        # Crear mapeo de nombres actuales a nombres esperados
-        mapeo_columnas = {}
-        for col_actual, col_norm in columnas_normalizadas.items():
-            for col_esperada, esp_norm in expected_normalizadas.items():
-                if col_norm == esp_norm:
-                    mapeo_columnas[col_actual] = col_esperada
-                    break
-        
-        # Renombrar columnas si es necesario
-        if mapeo_columnas:
-            df = df.rename(columns=mapeo_columnas)
+        # Leer la hoja especificada con el mismo manejador del libro. El
+        # encabezado se busca entre las primeras filas (puede haber títulos
+        # encima), las columnas se normalizan según el esquema compilado y
+        # las celdas combinadas (UNIDAD) se completan hacia abajo
+        df = leer_hoja_tolerante(libro, hoja, columnas)
         
         # Si es una hoja de día (01-31), añadir una columna con la fecha
-        if hoja in [f"{i:02d}" for i in range(1, 32)]:
+        if hoja in HOJAS_DIA:
             # Extraer el día del nombre de la hoja
             dia = int(hoja)
             # Añadir columna de fecha (el mes y año se deben proporcionar externamente)
             df['DIA'] = dia
         
         # Formatear los datos según los tipos esperados
-        df = formatear_datos(df)
+        df = formatear_datos(df, columnas)
         
         # Para hojas diarias, no validamos estrictamente las columnas
-        if hoja in [f"{i:02d}" for i in range(1, 32)]:
+        if hoja in HOJAS_DIA:
             return df, True, ""
         else:
             # Validar el DataFrame para la hoja OPERATIVOS
-            es_valido, mensaje_error = validar_csv(df)
+            es_valido, mensaje_error = validar_csv(df, columnas)
             return df, es_valido, mensaje_error
     
     except Exception as e:
         return None, False, f"Error al procesar el archivo Excel: {str(e)}"
 
 
+def iterar_excel_streaming(archivo, hoja=None, tamaño_bloque=TAMAÑO_BLOQUE, columnas=None):
+    """
+    Lee una hoja xlsx de forma incremental y entrega bloques ya formateados.
+    
+    El XML de la hoja se analiza directamente dentro del zip, por lo que la
+    memoria usada no depende del número de filas ni de hojas del libro. Las
+    columnas se validan una vez con el encabezado y cada bloque se formatea
+    por separado.
+    
+    Args:
+        archivo: Archivo Excel (xlsx) cargado por el usuario o LibroExcel ya abierto
+        hoja: Nombre de la hoja a leer (si es None, 'OPERATIVOS' o la primera hoja)
+        tamaño_bloque: Número de filas por bloque
+        columnas: Columnas esperadas a leer (si es None, todas); las celdas del
+            resto no se convierten
+        
+    Yields:
+        tuple: (DataFrame, bool, str) - (bloque, es_valido, mensaje_error)
+    """
+    libro = abrir_libro(archivo)
+    lector = libro.lector_streaming
+    hojas_disponibles = lector.hojas
+    
+    if hoja is None:
+        hoja = 'OPERATIVOS' if 'OPERATIVOS' in hojas_disponibles else hojas_disponibles[0]
+    
+    es_hoja_dia = hoja in HOJAS_DIA
+    validado = False
+    es_valido, mensaje_error = True, ""
+    anteriores = None
+    fila_encabezado = detectar_fila_encabezado(libro, hoja)
+    
+    usecols = selector_columnas(tuple(columnas)) if columnas is not None else None
+    
+    for bloque in lector.iterar_bloques(hoja, tamaño_bloque=tamaño_bloque, fila_encabezado=fila_encabezado, usecols=usecols):
+        # Las celdas combinadas continúan con el último valor del bloque previo
+        bloque = rellenar_celdas_combinadas(normalizar_columnas(bloque), anteriores=anteriores)
+        if bloque.empty:
+            continue
+        anteriores = bloque.iloc[-1].to_dict()
+        if es_hoja_dia:
+            bloque['DIA'] = int(hoja)
+        bloque = formatear_datos(bloque, columnas)
+        
+        # Todos los bloques comparten columnas: basta validar el primero
+        if not validado and not es_hoja_dia:
+            es_valido, mensaje_error = validar_csv(bloque, columnas)
+        validado = True
+        
+        yield bloque, es_valido, mensaje_error
+
+def leer_excel_streaming(archivo, hoja=None, tamaño_bloque=TAMAÑO_BLOQUE, columnas=None):
+    """
+    Lee una hoja xlsx con el lector incremental y une los bloques formateados.
+    
+    Alternativa a leer_excel para libros grandes: evita crear un objeto por
+    celda y cada bloque se compacta en cuanto se formatea, de modo que el
+    pico de memoria lo fija el tamaño del bloque y no el de la hoja. Los
+    archivos .xls se leen con leer_excel.
+    
+    Args:
+        archivo: Archivo Excel cargado por el usuario o LibroExcel ya abierto
+        hoja: Nombre de la hoja a leer (si es None, 'OPERATIVOS' o la primera hoja)
+        tamaño_bloque: Número de filas por bloque
+        columnas: Columnas esperadas a leer (si es None, todas)
+        
+    Returns:
+        tuple: (DataFrame, bool, str) - (datos compactos, es_valido, mensaje_error)
+    """
+    try:
+        libro = abrir_libro(archivo)
+        if not libro.es_xlsx:
+            return leer_excel(libro, hoja, columnas)
+        
+        bloques = []
+        es_valido, mensaje_error = True, ""
+        for bloque, es_valido, mensaje_error in iterar_excel_streaming(libro, hoja, tamaño_bloque, columnas):
+            if not es_valido:
+                return None, False, mensaje_error
+            # Sin columnas dispersas por bloque: se deciden con la hoja completa
+            bloques.append(compactar_dataframe(bloque, dispersas=False))
+        
+        if not bloques:
+            return formatear_datos(pd.DataFrame(), columnas), es_valido, mensaje_error
+        
+        return concatenar_compactos(bloques), es_valido, mensaje_error
+    
+    except Exception as e:
+        return None, False, f"Error al procesar el archivo Excel: {str(e)}"
+
 def obtener_hojas_excel(archivo):
     """
     Obtiene la lista de hojas disponibles en un archivo Excel.
     
     Args:
-        archivo: Archivo Excel cargado por el usuario
+        archivo: Archivo Excel cargado por el usuario o LibroExcel ya abierto
         
     Returns:
         tuple: (list, bool, str) - (lista_hojas, es_valido, mensaje_error)
@@ -206,8 +256,7 @@ def obtener_hojas_excel(archivo):
             
         # Intentar leer el archivo Excel
         try:
-            xls = pd.ExcelFile(archivo)
-            hojas_disponibles = xls.sheet_names
+            hojas_disponibles = abrir_libro(archivo).hojas
             
             # Verificar que haya al menos una hoja
             if not hojas_disponibles:
@@ -221,49 +270,181 @@ def obtener_hojas_excel(archivo):
     except Exception as e:
         return [], False, f"Error inesperado al procesar el archivo: {str(e)}"
 
-def formatear_datos(df):
+# Menor número de serie de fecha de Excel que se acepta como hora con fecha
+# (1954-10-03); los números mayores a 2359 y menores que este no son horas
+SERIAL_EXCEL_MINIMO = 20000
+
+# Clave de DataFrame.attrs con las columnas de hora ya convertidas a minutos
+ATRIBUTO_HORAS_EN_MINUTOS = "horas_en_minutos"
+
+def convertir_horas_a_minutos(serie):
     """
-    Realiza formateo y limpieza de datos si es necesario.
+    Convierte una columna de horas a minutos desde la medianoche (0-1439).
+    
+    Acepta valores de hora de Excel (fracción del día o fecha y hora), objetos
+    datetime.time o datetime, textos "HH:MM"/"HH:MM:SS" y números HHMM (800,
+    2000). Los números que no encajan en ninguna forma quedan como NaN.
+    La conversión es vectorizada: no se llama a una función Python por celda.
+    
+    Args:
+        serie: Serie de pandas con las horas
+        
+    Returns:
+        Series: Minutos desde la medianoche (float, NaN si la hora falta o no es válida)
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return (serie.dt.hour * 60 + serie.dt.minute).astype('float64')
+    
+    if pd.api.types.is_timedelta64_dtype(serie):
+        return (serie.dt.total_seconds() // 60 % 1440).astype('float64')
+    
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        return _numeros_a_minutos(serie.astype('float64'))
+    
+    # Textos, datetime.time y datetime: hay pocas horas distintas, así que se
+    # analiza cada valor único una sola vez y el resultado se expande por código
+    codigos, unicos = pd.factorize(serie)
+    texto = pd.Series(unicos, dtype=object).astype(str)
+    partes = texto.str.extract(r'(\d{1,2}):(\d{2})', expand=True).astype('float64')
+    horas, minutos = partes[0], partes[1]
+    validos = (horas <= 24) & (minutos < 60)
+    minutos_texto = (horas * 60 + minutos).where(validos) % 1440
+
+    # Lo que no tiene formato de hora puede ser un número (fracción o minutos)
+    numeros = _numeros_a_minutos(pd.to_numeric(texto.where(partes[0].isna()), errors='coerce'))
+    minutos_unicos = np.append(minutos_texto.fillna(numeros).to_numpy(dtype='float64'), np.nan)
+    return pd.Series(minutos_unicos[codigos], index=serie.index, dtype='float64')
+
+def _numeros_a_minutos(numeros):
+    """
+    Interpreta números como hora de Excel o como hora escrita HHMM.
+    
+    - Entre 0 y 1: fracción del día de Excel (1.0 son las 24:00, es decir 00:00).
+    - Enteros de 2 a 2359 con minutos menores a 60: hora HHMM (800 son las 08:00).
+    - Desde SERIAL_EXCEL_MINIMO: fecha y hora de Excel; se toma la fracción del día.
+    
+    Cualquier otro número queda como NaN, para que las reglas de calidad lo
+    informen en lugar de convertirlo en una hora equivocada.
+    """
+    es_fraccion = (numeros >= 0) & (numeros <= 1)
+    es_hhmm = (numeros % 1 == 0) & (numeros >= 2) & (numeros <= 2359) & (numeros % 100 < 60)
+    es_fecha = numeros >= SERIAL_EXCEL_MINIMO
+    
+    fraccion = (numeros % 1 * 1440).round() % 1440
+    hhmm = numeros // 100 * 60 + numeros % 100
+    minutos = fraccion.where(es_fraccion | es_fecha, hhmm.where(es_hhmm))
+    # 1.0 (24:00) es la medianoche
+    return minutos.where(numeros != 1, 0.0).astype('float64')
+
+def minutos_a_hora(serie):
+    """
+    Convierte minutos desde la medianoche al texto "HH:MM" para mostrarlo.
+    
+    Las columnas que no son numéricas se devuelven sin cambios.
+    
+    Args:
+        serie: Serie de pandas con minutos desde la medianoche
+        
+    Returns:
+        Series: Horas en formato "HH:MM" ("" si el valor falta), como categoría:
+            el texto se forma una vez por cada hora distinta
+    """
+    if not pd.api.types.is_numeric_dtype(serie):
+        return serie
+    
+    codigos, unicos = pd.factorize(np.floor(serie.to_numpy(dtype='float64', na_value=np.nan)))
+    minutos = pd.Series(unicos).astype('int64')
+    texto = (minutos // 60).astype(str).str.zfill(2) + ':' + (minutos % 60).astype(str).str.zfill(2)
+    # Los faltantes (código -1) pasan a la última categoría, ""
+    codigos = np.where(codigos < 0, len(unicos), codigos)
+    return pd.Series(
+        pd.Categorical.from_codes(codigos, categories=pd.Index(texto.tolist() + [''], dtype=object)),
+        index=serie.index
+    )
+
+def formatear_horas_para_mostrar(df):
+    """
+    Devuelve el DataFrame con las columnas de hora en formato "HH:MM".
+    
+    Args:
+        df: DataFrame de pandas con las horas en minutos desde la medianoche
+        
+    Returns:
+        DataFrame: DataFrame con las horas como texto
+    """
+    from config import COLUMNAS_HORA
+    
+    horas = {col: minutos_a_hora(df[col]) for col in COLUMNAS_HORA if col in df.columns}
+    return df.assign(**horas) if horas else df
+
+def formatear_datos(df, columnas=None):
+    """
+    Realiza formateo y limpieza de datos en una sola pasada vectorizada.
+    
+    Las horas se convierten a minutos desde la medianoche, las columnas
+    numéricas se convierten en bloque a enteros y las columnas con múltiples
+    valores a texto. El DataFrame original no se modifica y formatear de
+    nuevo un resultado no cambia sus horas.
     
     Args:
         df: DataFrame de pandas con los datos a formatear
+        columnas: Columnas esperadas que debe tener el resultado (si es None,
+            todas las de EXPECTED_COLUMNS); las que falten se agregan vacías
         
     Returns:
         DataFrame: DataFrame formateado
     """
-    # Copia para no modificar el original
-    df_formateado = df.copy()
+    from config import NUMERIC_COLUMNS, MULTI_VALUE_COLUMNS, COLUMNAS_HORA
+    
+    # Copia superficial: las columnas se reemplazan sin tocar los datos originales
+    df_formateado = df.copy(deep=False)
     
     # Asegurar que todas las columnas esperadas existan (incluso si están vacías)
-    for col in EXPECTED_COLUMNS:
+    for col in (EXPECTED_COLUMNS if columnas is None else columnas):
         if col not in df_formateado.columns:
             df_formateado[col] = ""
     
-    # Convertir columnas numéricas a sus tipos correspondientes
-    from config import NUMERIC_COLUMNS, MULTI_VALUE_COLUMNS
-    
-    # Procesar columnas numéricas
-    for col in NUMERIC_COLUMNS:
+    # Horas: minutos desde la medianoche. Las columnas que ya se convirtieron
+    # (marcadas en attrs) no se vuelven a interpretar: 480 minutos no son "04:80"
+    convertidas = set(df_formateado.attrs.get(ATRIBUTO_HORAS_EN_MINUTOS, ()))
+    for col in COLUMNAS_HORA:
         if col in df_formateado.columns:
-            # Las columnas de hora se formatean para mostrar solo hora y minutos (HH:MM)
-            if col in ["HORA INICIO", "HORA FIN"]:
-                # Método simple: cortar la cadena para mostrar solo HH:MM
-                df_formateado[col] = df_formateado[col].astype(str).apply(lambda x: x[:5] if ':' in x else x)
+            if col in convertidas and pd.api.types.is_numeric_dtype(df_formateado[col]):
                 continue
-            
-            # La columna PORCENTAJE se maneja como decimal
-            if col == "PORCENTAJE":
-                df_formateado[col] = pd.to_numeric(df_formateado[col], errors='coerce').fillna(0)
-            # El resto de columnas numéricas se convierten a enteros
-            else:
-                df_formateado[col] = pd.to_numeric(df_formateado[col], errors='coerce').fillna(0).astype(int)
+            df_formateado[col] = convertir_horas_a_minutos(df_formateado[col])
+    df_formateado.attrs = {
+        **df_formateado.attrs,
+        ATRIBUTO_HORAS_EN_MINUTOS: [col for col in COLUMNAS_HORA if col in df_formateado.columns]
+    }
+    
+    # Columnas enteras: conversión en bloque sobre un único arreglo
+    enteras = [
+        col for col in NUMERIC_COLUMNS
+        if col not in COLUMNAS_HORA and col != "PORCENTAJE" and col in df_formateado.columns
+    ]
+    if enteras:
+        bloque = np.column_stack([
+            df_formateado[col].to_numpy(dtype='float64', na_value=np.nan)
+            if pd.api.types.is_numeric_dtype(df_formateado[col])
+            else pd.to_numeric(df_formateado[col], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+            for col in enteras
+        ])
+        np.nan_to_num(bloque, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+        df_formateado[enteras] = pd.DataFrame(bloque.astype('int64'), index=df_formateado.index, columns=enteras)
+    
+    # La columna PORCENTAJE se maneja como decimal
+    if "PORCENTAJE" in NUMERIC_COLUMNS and "PORCENTAJE" in df_formateado.columns:
+        df_formateado["PORCENTAJE"] = pd.to_numeric(df_formateado["PORCENTAJE"], errors='coerce').fillna(0)
     
-    # Procesar columnas con múltiples valores
+    # Procesar columnas con múltiples valores: texto, con los vacíos como ""
     for col in MULTI_VALUE_COLUMNS:
         if col in df_formateado.columns:
-            # Asegurar que los valores sean strings antes de cualquier procesamiento
-            df_formateado[col] = df_formateado[col].astype(str)
-            # Limpiar valores vacíos o 'nan'
-            df_formateado[col] = df_formateado[col].replace('nan', '').replace('None', '')
+            serie = df_formateado[col]
+            # Una columna solo de números con celdas vacías llega como float:
+            # los enteros se escriben sin ".0" ("15", no "15.0")
+            if pd.api.types.is_float_dtype(serie) and (serie.dropna() % 1 == 0).all():
+                serie = serie.astype('Int64')
+            texto = serie.astype(str).where(serie.notna(), '')
+            df_formateado[col] = texto.replace(['nan', 'None'], '')
     
     return df_formateado